@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+    Micro-benchmark of the per-object cost of Check, comparing the compiled
+    predicates to interpreting the attribute requirements on every object.
+
+    Run with: python benchmarks/check_compile.py
+"""
+import timeit
+
+from regcheck import Check, EvaluationAction
+
+
+class Event(object):
+    """
+    An object carrying the benchmarked attributes
+    """
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+
+def interpreted_check(required_type, obj_attributes, obj):
+    """
+    The interpreting implementation of Check.perform, used as the baseline
+    """
+    if required_type is not None and not isinstance(obj, required_type):
+        "Wrong type - expected: {}, got: {}".format(required_type, type(obj))
+        return False
+
+    for attribute, desired in obj_attributes.items():
+        if not hasattr(obj, attribute):
+            "Object doesn't have attribute {}".format(attribute)
+            return False
+
+        obj_attribute_val = getattr(obj, attribute)
+        if isinstance(desired, EvaluationAction):
+            if not desired.perform(obj_attribute_val, None):
+                return False
+        elif not obj_attribute_val == desired:
+            "Object attribute {} value not matched - expected: {}, got {}".format(attribute, desired, obj_attribute_val)
+            return False
+
+    return True
+
+
+def bench(attributes_count, number=200000):
+    """
+    :return: The per-object cost in nanoseconds of the interpreted and compiled checks
+    :rtype : tuple of (float, float)
+    """
+    attributes = dict(("attribute{}".format(index), index) for index in range(attributes_count))
+    obj = Event(**attributes)
+
+    predicate = Check(Event, **attributes).compile()
+    assert predicate(obj, None) and interpreted_check(Event, attributes, obj)
+
+    interpreted = min(timeit.repeat(lambda: interpreted_check(Event, attributes, obj), number=number, repeat=3))
+    compiled = min(timeit.repeat(lambda: predicate(obj, None), number=number, repeat=3))
+
+    return (interpreted / number * 1e9, compiled / number * 1e9)
+
+
+if __name__ == "__main__":
+    print("{:>10} {:>16} {:>16} {:>8}".format("attributes", "interpreted [ns]", "compiled [ns]", "speedup"))
+    for count in (1, 2, 4, 8, 16):
+        interpreted, compiled = bench(count)
+        print("{:>10} {:>16.0f} {:>16.0f} {:>7.1f}x".format(count, interpreted, compiled, interpreted / compiled))
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+    Runs the benchmark workloads, and compares them to the committed baseline.
+
+    Run with: python benchmarks/run.py [--filter NAME] [--save] [--tolerance 1.5] [--floor 0.05]
+
+    Timings are normalized by a fixed pure-python calibration loop, timed interleaved
+    with every workload, so a baseline recorded on one machine stays meaningful on
+    another (and on a machine whose load changes during the run). Every timed sample runs a
+    workload enough times to last MIN_SAMPLE_SECONDS, so sub-millisecond workloads
+    aren't dominated by the timer resolution. The exit code is 1 if a workload got
+    slower than the baseline by more than the tolerance, and by more than the floor
+    (in calibration units) - the noise of the shortest workloads exceeds any ratio.
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import time
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from workloads import WORKLOADS  # noqa: E402
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+# The minimal duration of a timed sample, short workloads are run several times per sample
+MIN_SAMPLE_SECONDS = 0.05
+
+
+def calibration_loop():
+    """
+    A fixed pure-python loop, the unit of the normalized timings
+    """
+    total = 0
+    for index in range(200000):
+        total += index % 7
+    return total
+
+
+def batch_size(run):
+    """
+    :return: The amount of runs of a timed sample of the function, so it lasts MIN_SAMPLE_SECONDS at least
+    :rtype : int
+    """
+    started = time.perf_counter()
+    run()
+    return max(1, int(math.ceil(MIN_SAMPLE_SECONDS / max(time.perf_counter() - started, 1e-9))))
+
+
+def measure(run, repeat):
+    """
+    Time a workload, alternating its samples with samples of the calibration loop so both are timed under the same load
+    :return: The best time of running the workload once, with the best time of running the calibration loop once, in seconds
+    :rtype : tuple of (float, float)
+    """
+    run_number, calibration_number = batch_size(run), batch_size(calibration_loop)
+
+    run_times, calibration_times = [], []
+    for _ in range(repeat):
+        run_times.append(timeit.timeit(run, number=run_number) / run_number)
+        calibration_times.append(timeit.timeit(calibration_loop, number=calibration_number) / calibration_number)
+
+    return min(run_times), min(calibration_times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the regcheck benchmarks")
+    parser.add_argument("--filter", default="", help="Only run workloads whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=7, help="The amount of timed samples of every workload (the best is kept)")
+    parser.add_argument("--save", action="store_true", help="Record the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="The slowdown factor reported as a regression")
+    parser.add_argument("--floor", type=float, default=0.05, help="The smallest slowdown reported as a regression, in calibration units")
+    arguments = parser.parse_args(argv)
+
+    baseline = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as baseline_file:
+            baseline = json.load(baseline_file)
+
+    calibrations = []
+    results = {}
+    regressions = []
+
+    print("{:<32} {:>12} {:>12} {:>10}".format("workload", "time [ms]", "normalized", "baseline"))
+    for workload in WORKLOADS:
+        if arguments.filter not in workload.name:
+            continue
+
+        for engine in workload.engines:
+            key = "{}/{}".format(workload.name, engine)
+            run_time, calibration = measure(workload.prepare(engine), arguments.repeat)
+            calibrations.append(calibration)
+            normalized = run_time / calibration
+            results[key] = round(normalized, 3)
+
+            expected = baseline.get("results", {}).get(key)
+            ratio = "" if expected is None else "{:.2f}x".format(normalized / expected)
+            print("{:<32} {:>12.2f} {:>12.3f} {:>10}".format(key, run_time * 1000, normalized, ratio))
+
+            if expected is not None and normalized > expected * arguments.tolerance and normalized - expected > arguments.floor:
+                regressions.append(key)
+
+    if arguments.save and results:
+        recorded = dict(baseline.get("results", {}))
+        recorded.update(results)
+        with open(BASELINE_PATH, "w") as baseline_file:
+            json.dump({"calibration_seconds": round(min(calibrations), 6), "results": recorded}, baseline_file, indent=4, sort_keys=True)
+            baseline_file.write("\n")
+
+    if regressions:
+        print("Regressions (slower than the baseline by more than {}x and {} calibration units): {}".format(
+            arguments.tolerance, arguments.floor, ", ".join(regressions)
+        ))
+        return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+"""
+    Synthetic object sequences for the benchmarks, generated from a fixed seed
+    so every run evaluates the same objects.
+"""
+import random
+
+
+class Event(object):
+    """
+    An object carrying the benchmarked attributes
+    """
+    def __init__(self, **kwargs):
+        for key, value in kwargs.items():
+            setattr(self, key, value)
+
+    def __repr__(self):
+        return "{}({})".format(type(self).__name__, ", ".join("{}={!r}".format(key, value) for key, value in sorted(vars(self).items())))
+
+
+class Start(Event):
+    pass
+
+
+class Tick(Event):
+    pass
+
+
+class Error(Event):
+    pass
+
+
+class End(Event):
+    pass
+
+
+def attributes(attributes_count, value=0):
+    """
+    :return: The attributes of a generated event, attribute0 ... attributeN all set to value
+    :rtype : dict
+    """
+    return dict(("attribute{}".format(index), value) for index in range(attributes_count))
+
+
+def generate_sequence(length, types=(Tick, ), weights=None, attributes_count=0, values=1, seed=0, prefix=(), suffix=()):
+    """
+    :param length: The amount of generated events
+    :type  length: int
+    :param types: The types of the generated events
+    :type  types: tuple of type
+    :param weights: The relative frequency of every type, None for uniform
+    :type  weights: tuple of float
+    :param attributes_count: The amount of attributes of every event
+    :type  attributes_count: int
+    :param values: The amount of distinct attribute values, drawn uniformly
+    :type  values: int
+    :param seed: The seed of the generator
+    :type  seed: int
+    :param prefix: Events placed before the generated ones
+    :type  prefix: tuple of Event
+    :param suffix: Events placed after the generated ones
+    :type  suffix: tuple of Event
+    :return: The generated sequence
+    :rtype : list of Event
+    """
+    rng = random.Random(seed)
+    sequence = list(prefix)
+
+    for _ in range(length):
+        event_type = rng.choices(types, weights)[0] if weights is not None else rng.choice(types)
+        sequence.append(event_type(**attributes(attributes_count, rng.randrange(values))))
+
+    sequence.extend(suffix)
+    return sequence
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+    The benchmarked workloads - realistic patterns over long sequences, and the
+    pathological patterns that make a naive evaluation blow up.
+
+    Every workload builds an evaluation for an engine, and times a single call
+    checking its sequences.
+"""
+from regcheck import (
+    ENGINE_BACKTRACKING, ENGINES, Check, Either, Evaluation, LambdaCheck, Range, RegexAsterix, RegexPlus, Variable
+)
+
+from sequences import End, Error, Event, Start, Tick, attributes, generate_sequence
+
+
+class Workload(object):
+    """
+    A benchmarked evaluation, with the sequences it checks
+    """
+    def __init__(self, name, description, build, sequences, engines=ENGINES, method="check"):
+        """
+        :param name: The unique name of the workload
+        :type  name: str
+        :param description: What the workload exercises
+        :type  description: str
+        :param build: Builds the evaluation for a given engine
+        :type  build: function
+        :param sequences: Builds the checked sequences
+        :type  sequences: function
+        :param engines: The engines the workload runs on
+        :type  engines: tuple of str
+        :param method: The evaluation method called with every sequence
+        :type  method: str
+        """
+        self.name = name
+        self.description = description
+        self._build = build
+        self._sequences = sequences
+        self.engines = engines
+        self._method = method
+
+    def prepare(self, engine):
+        """
+        :param engine: The evaluation engine
+        :type  engine: str
+        :return: A callable running the workload once (building the evaluation and sequences is not timed)
+        :rtype : function
+        """
+        evaluation = self._build(engine)
+        sequences = self._sequences()
+        method = getattr(evaluation, self._method)
+
+        def run():
+            return [method(sequence) if self._method == "check" else list(method(sequence)) for sequence in sequences]
+
+        # Warm up the lazily built parts of the evaluation (machine, dfa states)
+        run()
+        return run
+
+
+def _is_even(obj, variables_frame):
+    return 0 == obj.attribute0 % 2
+
+
+def _is_small(obj, variables_frame):
+    return obj.attribute0 < 3
+
+
+def _nested_ranges(depth):
+    description = Check(Tick)
+    for _ in range(depth):
+        description = Range(0, None, Range(1, 2, description))
+    return description
+
+
+def _variables_pattern():
+    value = Variable()
+    return (Check(Start, attribute0=value.set()), RegexAsterix(Check(Tick, attribute0=value.set())), Check(End, attribute0=value.get()))
+
+
+WORKLOADS = [
+    Workload(
+        "flat_long", "A single range over a long flat sequence",
+        lambda engine: Evaluation(Check(Start), RegexAsterix(Check(Tick)), Check(End), engine=engine),
+        lambda: [generate_sequence(20000, prefix=(Start(), ), suffix=(End(), ))]
+    ),
+    Workload(
+        "flat_mixed", "Interleaved event types, many short sequences",
+        lambda engine: Evaluation(RegexAsterix(Check(Tick)), RegexPlus(Check(Error), RegexAsterix(Check(Tick))), engine=engine),
+        lambda: [generate_sequence(200, (Tick, Error), (9, 1), seed=seed) for seed in range(50)]
+    ),
+    Workload(
+        "nested_ranges", "Deeply nested ranges of a varying amount of repetitions, failing at the last object",
+        lambda engine: Evaluation(_nested_ranges(6), Check(End), engine=engine, prefilter=False),
+        lambda: [generate_sequence(300, suffix=(Tick(), ))]
+    ),
+    Workload(
+        "variables", "Setting a variable on every object, exercising the variable frames",
+        lambda engine: Evaluation(*_variables_pattern(), engine=engine),
+        lambda: [generate_sequence(2000, attributes_count=1, values=3, prefix=(Start(attribute0=1), ), suffix=(End(attribute0=seed), ), seed=seed)
+                 for seed in range(3)],
+        engines=(ENGINE_BACKTRACKING, )
+    ),
+    Workload(
+        "many_attributes", "Checks of 16 attributes each",
+        lambda engine: Evaluation(RegexPlus(Check(Tick, **attributes(16))), Check(End, **attributes(16)), engine=engine),
+        lambda: [generate_sequence(5000, attributes_count=16, suffix=(End(**attributes(16)), ))]
+    ),
+    Workload(
+        "lambda_checks", "Pure and impure LambdaChecks",
+        lambda engine: Evaluation(
+            RegexAsterix(LambdaCheck(_is_even, pure=True), LambdaCheck(_is_small)), RegexAsterix(Check(Tick)), engine=engine
+        ),
+        lambda: [generate_sequence(4000, attributes_count=1, values=2, seed=1)]
+    ),
+    Workload(
+        "alternatives", "Either over many event types, dispatched by type",
+        lambda engine: Evaluation(RegexAsterix(Either(*[Check(event_type) for event_type in _EVENT_TYPES])), Check(End), engine=engine),
+        lambda: [generate_sequence(10000, _EVENT_TYPES, suffix=(End(), ))]
+    ),
+    Workload(
+        "adjacent_ranges", "Worst-case backtracking input - adjacent unbounded ranges of the same check, never satisfied",
+        lambda engine: Evaluation(
+            RegexAsterix(Check(Tick)), RegexAsterix(Check(Tick)), RegexAsterix(Check(Tick)), Check(End), engine=engine, prefilter=False
+        ),
+        lambda: [generate_sequence(400)]
+    ),
+    Workload(
+        "nested_variables", "Worst-case backtracking input - nested ranges told apart by a variable, never satisfied",
+        lambda engine: Evaluation(_nested_variables(), engine=engine, prefilter=False),
+        lambda: [generate_sequence(14, attributes_count=1, values=1, suffix=(Tick(attribute0=1), ))],
+        engines=(ENGINE_BACKTRACKING, )
+    ),
+    Workload(
+        "search", "Finding all the matches in a long sequence",
+        lambda engine: Evaluation(Check(Error), RegexAsterix(Check(Tick)), Check(Error), engine=engine),
+        lambda: [generate_sequence(5000, (Tick, Error), (19, 1), seed=2)],
+        engines=ENGINES[1:], method="finditer"
+    ),
+]
+
+
+# Synthetic event types for the alternatives workload
+_EVENT_TYPES = tuple(type("Event{}".format(index), (Event, ), {}) for index in range(32))
+
+
+def _nested_variables():
+    value = Variable()
+    return RegexAsterix(RegexPlus(Check(Tick, attribute0=value.set())), Check(Tick, attribute0=value.get()))
@@ -9,3 +9,5 @@ except DistributionNotFound:
     __version__ = "unknown"
 finally:
     del get_distribution, DistributionNotFound
+
+from .regcheck import *  # noqa: F401,F403
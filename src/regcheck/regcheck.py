@@ -21,30 +21,260 @@ LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
 OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
-import copy
+import array
+import collections
+import concurrent.futures
+import gc
+import itertools
+import operator
+import os
+import pickle
+import struct
+import sys
+import threading
+import time
 
 
-# Used to store the last evaluation error reason during evaluation time
-# TODO: Change this method for parralelism
-G_LAST_EVALUATION_ERROR = None
+# Used to store the last evaluation failure record during evaluation time (separately for every thread)
+G_EVALUATION_THREAD_STATE = threading.local()
 
+# The evaluation failure codes
+FAILURE_WRONG_TYPE = "wrong_type"
+FAILURE_MISSING_ATTRIBUTE = "missing_attribute"
+FAILURE_ATTRIBUTE_MISMATCH = "attribute_mismatch"
+FAILURE_UNSET_VARIABLE = "unset_variable"
+FAILURE_VARIABLE_MISMATCH = "variable_mismatch"
+FAILURE_SEQUENCE_LENGTH = "sequence_length"
+FAILURE_MISSING_TYPE = "missing_type"
 
-def _set_last_failure_error(reason):
+
+# The available sequence evaluation engines
+ENGINE_BACKTRACKING = "backtracking"
+ENGINE_NFA = "nfa"
+ENGINE_DFA = "dfa"
+ENGINES = (ENGINE_BACKTRACKING, ENGINE_NFA, ENGINE_DFA)
+
+# The default engine - backtracking, unless the pattern has counting ranges and no variables (see EvaluationMachine._resolve_engine)
+ENGINE_AUTO = "auto"
+
+# The default bound of cached lazy DFA states
+DFA_MAX_STATES = 10000
+
+# The default amount of compiled machines kept by the process-wide MachineCache
+MACHINE_CACHE_SIZE = 128
+
+# The binary format of dumped evaluations (see Evaluation.dump)
+MACHINE_FILE_MAGIC = b"RGCM"
+MACHINE_FILE_VERSION = 1
+
+# Magic, version, table typecode, table byte order, table length, pickled state length
+_MACHINE_FILE_HEADER = struct.Struct("<4sHcc2xQQ")
+
+# The kinds of the states in a flattened graph table, and the amount of fields every state takes
+STATE_KIND_ACTION = 0
+STATE_KIND_RANGE = 1
+STATE_KIND_EITHER = 2
+STATE_TABLE_FIELDS = 15
+
+# The evaluation budgets of EvaluationMachine.check, see EvaluationBudgetExceeded
+BUDGET_STEPS = "max_steps"
+BUDGET_BRANCHES = "max_branches"
+BUDGET_DEADLINE = "deadline"
+
+# The amount of evaluation steps between two reads of the clock, when evaluating with a deadline
+DEADLINE_CHECK_INTERVAL = 256
+
+# The repetition modes of a range: greedy ranges prefer repeating, lazy ones prefer leaving,
+# and possessive ones never leave while the next object may start another repetition
+RANGE_GREEDY = "greedy"
+RANGE_LAZY = "lazy"
+RANGE_POSSESSIVE = "possessive"
+RANGE_MODES = (RANGE_GREEDY, RANGE_LAZY, RANGE_POSSESSIVE)
+
+# Passed to non-action states as the evaluated object once the sequence ended (told apart from None objects)
+G_END_OF_SEQUENCE = object()
+
+# Ranges of a single consuming action repeated at least this many times track their repetitions as counting sets
+COUNTING_MIN_BOUND = 8
+
+# The rewrites the pattern optimizer can apply, see PatternOptimizer
+OPTIMIZE_COLLAPSE_SINGLE_REPEATS = "collapse_single_repeats"
+OPTIMIZE_FLATTEN_RANGES = "flatten_ranges"
+OPTIMIZE_MERGE_RANGES = "merge_ranges"
+OPTIMIZE_DEDUPLICATE_CHECKS = "deduplicate_checks"
+OPTIMIZE_HOIST_PREFIXES = "hoist_prefixes"
+OPTIMIZATION_PASSES = (
+	OPTIMIZE_COLLAPSE_SINGLE_REPEATS, OPTIMIZE_FLATTEN_RANGES, OPTIMIZE_MERGE_RANGES, OPTIMIZE_DEDUPLICATE_CHECKS, OPTIMIZE_HOIST_PREFIXES
+)
+
+# Worst-case complexity classes of checking a sequence, in its length (see PatternAnalysis)
+COMPLEXITY_LINEAR = "linear"
+COMPLEXITY_POLYNOMIAL = "polynomial"
+COMPLEXITY_EXPONENTIAL = "exponential"
+
+# Kinds of ambiguous constructs found by the pattern analysis
+AMBIGUITY_NESTED_RANGES = "nested_ranges"
+AMBIGUITY_ADJACENT_RANGES = "adjacent_ranges"
+AMBIGUITY_OVERLAPPING_ALTERNATIVES = "overlapping_alternatives"
+
+
+def _set_last_failure_error(code, node, attribute, expected, actual):
 	"""
-	:param reason: The last evaluation failure reason
-	:type  reason: str
+	Record the last evaluation failure, without formatting it
+	(most failures are never reported, only rendered by EvaluationFailure when requested)
+	:param code: The kind of the failure (one of the FAILURE_ codes)
+	:type  code: str
+	:param node: The description or node that failed
+	:type  node: any
+	:param attribute: The name of the failed attribute, None for the object itself
+	:type  attribute: str
+	:param expected: The required value
+	:type  expected: any
+	:param actual: The evaluated value
+	:type  actual: any
 	"""
-	global G_LAST_EVALUATION_ERROR
-	G_LAST_EVALUATION_ERROR = reason
+	G_EVALUATION_THREAD_STATE.last_failure = (code, node, attribute, expected, actual)
 
 
 def _get_last_failure_error():
 	"""
-	:return: The last evaluation failure reason
-	:rtype : str
+	:return: The last evaluation failure record of the current thread
+	:rtype : tuple of (str, any, str, any, any)
+	"""
+	return getattr(G_EVALUATION_THREAD_STATE, "last_failure", None)
+
+
+def _clear_last_failure_error():
+	"""
+	Forget the last evaluation failure record of the current thread
+	"""
+	G_EVALUATION_THREAD_STATE.last_failure = None
+
+
+class EvaluationFailure(object):
+	"""
+	A structured evaluation failure reason, rendered to text on demand
+	"""
+	__slots__ = ("code", "node", "attribute", "expected", "actual")
+
+	def __init__(self, code, node, attribute, expected, actual):
+		"""
+		:param code: The kind of the failure (one of the FAILURE_ codes)
+		:type  code: str
+		:param node: The description or node that failed
+		:type  node: any
+		:param attribute: The name of the failed attribute, None for the object itself
+		:type  attribute: str
+		:param expected: The required value
+		:type  expected: any
+		:param actual: The evaluated value
+		:type  actual: any
+		"""
+		self.code = code
+		self.node = node
+		self.attribute = attribute
+		self.expected = expected
+		self.actual = actual
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "EvaluationFailure({}, {})".format(self.code, self.node)
+
+	def __str__(self):
+		"""
+		:return: The human readable failure reason
+		:rtype : str
+		"""
+		return self.render()
+
+	def render(self):
+		"""
+		:return: The human readable failure reason
+		:rtype : str
+		"""
+		if self.code == FAILURE_WRONG_TYPE:
+			return "Wrong type - expected: {}, got: {}".format(self.expected, type(self.actual))
+		if self.code == FAILURE_MISSING_ATTRIBUTE:
+			return "Object doesn't have attribute {}".format(self.attribute)
+		if self.code == FAILURE_ATTRIBUTE_MISMATCH:
+			return "Object attribute {} value not matched - expected: {}, got {}".format(self.attribute, self.expected, self.actual)
+		if self.code == FAILURE_UNSET_VARIABLE:
+			return "Variable {} was not set".format(self.attribute)
+		if self.code == FAILURE_VARIABLE_MISMATCH:
+			return "Wrong object value - expected: {}={}, got: {}".format(self.attribute, self.expected, self.actual)
+		if self.code == FAILURE_SEQUENCE_LENGTH:
+			return "Sequence length not met - expected: {} to {}, got: {}".format(self.expected[0], self.expected[1], self.actual)
+		if self.code == FAILURE_MISSING_TYPE:
+			return "Not enough objects of type {} - expected: {}, got: {}".format(self.attribute, self.expected, self.actual)
+
+		return "Unknown failure {}".format(self.code)
+
+
+class EvaluationBudgetExceeded(Exception):
+	"""
+	Raised when checking a sequence exceeds one of its budgets, aborting the evaluation
+	(carries the progress made until then)
+	"""
+	def __init__(self, budget, limit, max_index, steps, branches):
+		"""
+		:param budget: The exceeded budget (one of the BUDGET_ kinds)
+		:type  budget: str
+		:param limit: The value of the exceeded budget
+		:type  limit: float
+		:param max_index: The maximal sequence index reached by the evaluation
+		:type  max_index: int
+		:param steps: The amount of evaluation steps taken
+		:type  steps: int
+		:param branches: The peak amount of pending branches (live threads for the nfa and dfa engines)
+		:type  branches: int
+		"""
+		# All the arguments are kept in args, so the exception pickles back from worker processes
+		super(EvaluationBudgetExceeded, self).__init__(budget, limit, max_index, steps, branches)
+		self.budget = budget
+		self.limit = limit
+		self.max_index = max_index
+		self.steps = steps
+		self.branches = branches
+
+	def __str__(self):
+		"""
+		:return: The human readable reason of the abort
+		:rtype : str
+		"""
+		return "Evaluation exceeded its {} budget ({}) after {} steps, reaching index {} with up to {} branches".format(
+			self.budget, self.limit, self.steps, self.max_index, self.branches
+		)
+
+
+def _slots_state(obj):
+	"""
+	:param obj: An object of slotted classes (or of their subclasses, that may have a __dict__)
+	:type  obj: object
+	:return: The values of all the set slots and attributes of the object
+	:rtype : dict
+	"""
+	state = {}
+	for cls in type(obj).__mro__:
+		for name in cls.__dict__.get("__slots__", ()):
+			if hasattr(obj, name):
+				state[name] = getattr(obj, name)
+
+	state.update(getattr(obj, "__dict__", {}))
+	return state
+
+
+def _set_slots_state(obj, state):
 	"""
-	global G_LAST_EVALUATION_ERROR
-	return G_LAST_EVALUATION_ERROR
+	:param obj: An object of slotted classes
+	:type  obj: object
+	:param state: A state returned by _slots_state
+	:type  state: dict
+	"""
+	for name, value in state.items():
+		setattr(obj, name, value)
 
 
 class RegexDescription(object):
@@ -52,14 +282,51 @@ class RegexDescription(object):
 	A class used to designate a class as a regex descriptor
 	(classes that the user uses to describe the regex)
 	"""
+	__slots__ = ()
+
+	def __getstate__(self):
+		"""
+		:return: The picklable state of the description
+		:rtype : dict
+		"""
+		return _slots_state(self)
+
+	def __setstate__(self, state):
+		"""
+		:param state: A state returned by __getstate__
+		:type  state: dict
+		"""
+		_set_slots_state(self, state)
+
 	def __init__(self):
 		pass
 
+	def structure_key(self):
+		"""
+		:return: A key that is equal for descriptions that evaluate objects the same way
+		:rtype : tuple
+		:note  : Descriptions can't be compared by default, so the key is unique to the instance
+		"""
+		return (type(self), id(self))
+
+
+def _value_structure_key(value):
+	"""
+	:param value: A value referenced by a regex description
+	:type  value: any
+	:return: The structure key of regex descriptions, the value with its type otherwise
+	:rtype : any
+	:note  : Values are keyed with their type, since equal values of different types (1 and True) are reported differently
+	"""
+	return value.structure_key() if isinstance(value, RegexDescription) else (type(value), value)
+
 
 class EvaluationAction(RegexDescription):
 	"""
 	An action that can be taken in reference to an object during evaluation-time
 	"""
+	__slots__ = ("_consuming", )
+
 	def __init__(self, consuming=True):
 		"""
 		:param consuming: Wether this evaluation action should consume the object it's evaluating
@@ -74,6 +341,14 @@ class EvaluationAction(RegexDescription):
 		"""
 		return self._consuming
 
+	def is_pure(self):
+		"""
+		:return: Wether the action outcome depends only on the evaluated object (no side effects or variables)
+		:rtype : bool
+		:note  : Outcomes of pure actions may be cached per sequence position
+		"""
+		return False
+
 	def perform(self, obj, variables_frame=None):
 		"""
 		:param obj: The object with wich we perform the action
@@ -85,11 +360,22 @@ class EvaluationAction(RegexDescription):
 		"""
 		raise NotImplementedError()
 
+	def compile(self, diagnostics=True):
+		"""
+		:param diagnostics: Wether the callable should record failure reasons
+		:type  diagnostics: bool
+		:return: A callable performing the action, taking an object and a variables frame
+		:rtype : function
+		"""
+		return self.perform
+
 
 class Check(EvaluationAction):
 	"""
 	Check an object and its attributes
 	"""
+	__slots__ = ("_type", "_obj_attributes", "_predicates")
+
 	def __init__(self, __regcheck_required_type=None, **obj_attributes):
 		"""
 		:param __regcheck_required_type: The type of the object you wish to get
@@ -101,6 +387,8 @@ class Check(EvaluationAction):
 		super(Check, self).__init__()
 		self._type = __regcheck_required_type
 		self._obj_attributes = obj_attributes
+		# Compiled predicates by diagnostics flag, None until first compiled
+		self._predicates = None
 
 	def __repr__(self):
 		"""
@@ -112,6 +400,35 @@ class Check(EvaluationAction):
 			attributes=", ".join(map(lambda atr: "{}={}".format(atr[0], atr[1]), self._obj_attributes.items()))
 		)
 
+	def __getstate__(self):
+		"""
+		:return: The picklable state of the check (compiled predicates are closures, rebuilt on first use)
+		:rtype : dict
+		"""
+		state = _slots_state(self)
+		state["_predicates"] = None
+		return state
+
+	def structure_key(self):
+		"""
+		:return: A key that is equal for checks with the same type and attribute requirements
+		:rtype : tuple
+		"""
+		return (type(self), self._type, tuple(sorted(
+			(attribute, _value_structure_key(desired)) for attribute, desired in self._obj_attributes.items()
+		)))
+
+	def is_pure(self):
+		"""
+		:return: Wether the action outcome depends only on the evaluated object (no side effects or variables)
+		:rtype : bool
+		:note  : Subclasses overriding perform may use the variables frame, so they aren't pure unless they say so
+		"""
+		if type(self).perform is not Check.perform:
+			return False
+
+		return all(desired.is_pure() for desired in self._obj_attributes.values() if isinstance(desired, EvaluationAction))
+
 	def perform(self, obj, variables_frame=None):
 		"""
 		:param obj: The object to be evaluated
@@ -121,44 +438,150 @@ class Check(EvaluationAction):
 		:return: Wether the object evaluation action succeeded
 		:rtype : bool
 		"""
+		return self._get_predicate(True)(obj, variables_frame)
+
+	def compile(self, diagnostics=True):
+		"""
+		:param diagnostics: Wether the callable should record failure reasons
+		:type  diagnostics: bool
+		:return: A callable performing the action, taking an object and a variables frame
+		:rtype : function
+		:note  : Subclasses overriding perform are performed as is
+		"""
+		if type(self).perform is not Check.perform:
+			return self.perform
+
+		return self._get_predicate(diagnostics)
+
+	def _get_predicate(self, diagnostics):
+		"""
+		:param diagnostics: Wether the predicate should record failure reasons
+		:type  diagnostics: bool
+		:return: The compiled predicate of the check, built on first use
+		:rtype : function
+		"""
+		if self._predicates is None:
+			self._predicates = {}
+
+		predicate = self._predicates.get(diagnostics)
+		if predicate is None:
+			predicate = self._predicates[diagnostics] = self._compile_predicate(diagnostics)
+
+		return predicate
+
+	def _compile_predicate(self, diagnostics):
+		"""
+		Specialise the check into a closure, done once instead of interpreting the attributes on every object
+		(plain attribute values are fetched with a single attrgetter and compared as one tuple)
+		:param diagnostics: Wether the predicate should record failure reasons
+		:type  diagnostics: bool
+		:return: A callable performing the check, taking an object and a variables frame
+		:rtype : function
+		"""
+		required_type = self._type
+		report_failure = self._report_failure if diagnostics else lambda obj: False
+
+		plain_attributes = [(attribute, desired) for attribute, desired in self._obj_attributes.items() if not isinstance(desired, EvaluationAction)]
+		nested_actions = tuple(
+			(attribute, desired.compile(diagnostics)) for attribute, desired in self._obj_attributes.items() if isinstance(desired, EvaluationAction)
+		)
+
+		if 0 == len(plain_attributes):
+			get_values = None
+			expected_values = None
+		else:
+			get_values = operator.attrgetter(*[attribute for attribute, _ in plain_attributes])
+			expected_values = plain_attributes[0][1] if 1 == len(plain_attributes) else tuple(desired for _, desired in plain_attributes)
+
+		def check_attributes(obj, variables_frame):
+			if get_values is not None:
+				try:
+					if not get_values(obj) == expected_values:
+						return report_failure(obj)
+				except AttributeError:
+					return report_failure(obj)
+
+			for attribute, nested_predicate in nested_actions:
+				try:
+					obj_attribute_val = getattr(obj, attribute)
+				except AttributeError:
+					return report_failure(obj)
+
+				if not nested_predicate(obj_attribute_val, variables_frame):
+					return False
+
+			return True
+
+		if required_type is None:
+			if get_values is None and 0 == len(nested_actions):
+				return lambda obj, variables_frame: True
+
+			return check_attributes
+
+		if get_values is None and 0 == len(nested_actions):
+			def check_type(obj, variables_frame):
+				if type(obj) is required_type or isinstance(obj, required_type):
+					return True
+
+				return report_failure(obj)
+
+			return check_type
+
+		def check_type_and_attributes(obj, variables_frame):
+			if type(obj) is not required_type and not isinstance(obj, required_type):
+				return report_failure(obj)
+
+			return check_attributes(obj, variables_frame)
+
+		return check_type_and_attributes
+
+	def _report_failure(self, obj):
+		"""
+		Document the reason an object failed the check
+		(only called on failures, so the successful path never formats messages)
+		:param obj: The object that failed the type or plain attributes requirements
+		:type  obj: any
+		:return: False, the check outcome
+		:rtype : bool
+		"""
 		if self._type is not None and not isinstance(obj, self._type):
-			_set_last_failure_error("Wrong type - expected: {}, got: {}".format(self._type, type(obj)))
+			_set_last_failure_error(FAILURE_WRONG_TYPE, self, None, self._type, obj)
 			return False
 
-		# Check all specified 
-		for attribute, desired in self._obj_attributes.iteritems():
+		for attribute, desired in self._obj_attributes.items():
 
 			# Get the object attribute value
 			if not hasattr(obj, attribute):
-				_set_last_failure_error("Object doesn't have attribute {}".format(attribute))
+				_set_last_failure_error(FAILURE_MISSING_ATTRIBUTE, self, attribute, None, obj)
 				return False
 
-			obj_attribute_val = getattr(obj, attribute)
+			if isinstance(desired, EvaluationAction): continue
 
-			# Check the desired value against the attribute value
-			if isinstance(desired, EvaluationAction):
-				if not desired.perform(obj_attribute_val, variables_frame):
-					return False
-			else:
-				if not obj_attribute_val == desired:
-					_set_last_failure_error("Object attribute {} value not matched - expected: {}, got {}".format(attribute, desired, obj_attribute_val))
-					return False
+			obj_attribute_val = getattr(obj, attribute)
+			if not obj_attribute_val == desired:
+				_set_last_failure_error(FAILURE_ATTRIBUTE_MISMATCH, self, attribute, desired, obj_attribute_val)
+				return False
 
-		return True
+		return False
 
 
 class LambdaCheck(Check):
     """
     Check an object according to a supplied lambda
     """
-    def __init__(self, check_lambda):
+    __slots__ = ("_check_lambda", "_pure")
+
+    def __init__(self, check_lambda, pure=False):
         """
         :param check_lambda: The lambda used to check a given object
         :note  check_lambda: The lambda should take an object ot test and a variables frame
         :type  check_lambda: function
+        :param pure: Wether the lambda result depends only on the object (allowing its results to be cached)
+        :type  pure: bool
         """
         super(LambdaCheck, self).__init__()
         self._check_lambda = check_lambda
+        self._pure = pure
 
     def __repr__(self):
         """
@@ -167,6 +590,35 @@ class LambdaCheck(Check):
         """
         return "LambdaCheck({checklambda})".format(checklambda=self._check_lambda)
 
+    def __getstate__(self):
+        """
+        :return: The picklable state of the check
+        :rtype : dict
+        :raise pickle.PicklingError: If the lambda can't be pickled (not importable, like lambdas and local functions)
+        """
+        try:
+            pickle.dumps(self._check_lambda)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise pickle.PicklingError(
+                "LambdaCheck functions must be importable (defined at a module level) to be pickled, got {}: {}".format(self._check_lambda, e)
+            )
+
+        return super(LambdaCheck, self).__getstate__()
+
+    def structure_key(self):
+        """
+        :return: A key that is equal for checks using the same lambda, with the same purity
+        :rtype : tuple
+        """
+        return (type(self), self._check_lambda, self._pure)
+
+    def is_pure(self):
+        """
+        :return: Wether the action outcome depends only on the evaluated object (no side effects or variables)
+        :rtype : bool
+        """
+        return self._pure
+
     def perform(self, obj, variables_frame=None):
         """
         :param obj: The object to be evaluated
@@ -178,12 +630,25 @@ class LambdaCheck(Check):
         """
         return self._check_lambda(obj, variables_frame)
 
+    def compile(self, diagnostics=True):
+        """
+        :param diagnostics: Wether the callable should record failure reasons
+        :type  diagnostics: bool
+        :return: A callable performing the action, taking an object and a variables frame
+        :rtype : function
+        """
+        return self._check_lambda
+
 
 class Range(RegexDescription):
 	"""
 	Specify a sequence of checks that can repeat multiple times
+	Large ranges of a single consuming check are tracked as counting sets by the nfa and dfa engines, whose cost
+	doesn't grow with the bounds - the backtracking engine keeps a counter per branch, and may explore a branch per count
 	"""
-	def __init__(self, min_count, max_count, *regex_descriptions):
+	__slots__ = ("_min_count", "_max_count", "_regex_descriptions", "_mode")
+
+	def __init__(self, min_count, max_count, *regex_descriptions, mode=RANGE_GREEDY):
 		"""
 		:param min_count: The minimum amount of repeats of the underlying check sequence
 		:type  min_count: int
@@ -191,17 +656,40 @@ class Range(RegexDescription):
 		:type  max_count: int
 		:param regex_descriptions: The underlying regex elements that can be repeated
 		:type  regex_descriptions: list of RegexDescription
+		:param mode: The repetition mode, one of RANGE_MODES
+		:type  mode: str
+		:note  mode: Possessive ranges never give back a repetition, and should repeat a single consuming check without variables
 		"""
 		self._min_count = min_count
 		self._max_count = max_count
 		self._regex_descriptions = regex_descriptions
+		self._mode = mode
 
 		if 0 == len(regex_descriptions):
 			raise ValueError("Can't have an empty range")
 
-		if self._min_count > self._max_count:
+		if self._max_count is not None and self._min_count > self._max_count:
 			raise ValueError("min count must be smaller then max count")
 
+		if mode not in RANGE_MODES:
+			raise ValueError("Unknown range mode {}, expected one of: {}".format(mode, ", ".join(RANGE_MODES)))
+
+		if mode == RANGE_POSSESSIVE and (
+			1 != len(regex_descriptions) or not isinstance(regex_descriptions[0], EvaluationAction) or
+			not regex_descriptions[0].is_consuming() or uses_variables(regex_descriptions)
+		):
+			raise ValueError("A possessive range should repeat a single consuming check without variables")
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "Range({}, {}, {}{})".format(
+			self._min_count, self._max_count, ", ".join(map(repr, self._regex_descriptions)),
+			"" if self._mode == RANGE_GREEDY else ", mode={!r}".format(self._mode)
+		)
+
 	def get_sub_elements(self):
 		"""
 		:return: The Range sub elements
@@ -209,18 +697,36 @@ class Range(RegexDescription):
 		"""
 		return self._regex_descriptions
 
+	def get_mode(self):
+		"""
+		:return: The repetition mode of the range, one of RANGE_MODES
+		:rtype : str
+		"""
+		return self._mode
+
+	def structure_key(self):
+		"""
+		:return: A key that is equal for ranges with the same bounds, mode and sub elements
+		:rtype : tuple
+		"""
+		return (Range, self._min_count, self._max_count, self._mode, tuple(_value_structure_key(sub) for sub in self._regex_descriptions))
+
 
 class RegexPlus(Range):
 	"""
 	Specify a sequence that should occur one or more times
 	(shorthand for Range with min=1, max=None)
 	"""
-	def __init__(self, *regex_descriptions):
+	__slots__ = ()
+
+	def __init__(self, *regex_descriptions, mode=RANGE_GREEDY):
 		"""
 		:param regex_descriptions: The underlying regex elements that can be repeated
 		:type  regex_descriptions: list of RegexDescription
+		:param mode: The repetition mode, one of RANGE_MODES
+		:type  mode: str
 		"""
-		super(RegexPlus, self).__init__(1, None, *regex_descriptions)
+		super(RegexPlus, self).__init__(1, None, *regex_descriptions, mode=mode)
 
 
 class RegexAsterix(Range):
@@ -228,19 +734,26 @@ class RegexAsterix(Range):
 	Specify a sequence that should occur zero or more times
 	(shorthand for Range with min=0, max=None)
 	"""
-	def __init__(self, *regex_descriptions):
+	__slots__ = ()
+
+	def __init__(self, *regex_descriptions, mode=RANGE_GREEDY):
 		"""
 		:param regex_descriptions: The underlying regex elements that can be repeated
 		:type  regex_descriptions: list of RegexDescription
+		:param mode: The repetition mode, one of RANGE_MODES
+		:type  mode: str
 		"""
-		super(RegexAsterix, self).__init__(0, None, *regex_descriptions)
+		super(RegexAsterix, self).__init__(0, None, *regex_descriptions, mode=mode)
 
 
 class Possible(Range):
 	"""
 	Specify a check that may or may not be satisfied
 	(shorthand for Range with min=0, max=1 with the same check)
+	The keyword arguments are attribute requirements, use Range(0, 1, Check(...), mode=...) for other repetition modes
 	"""
+	__slots__ = ()
+
 	def __init__(self, __regcheck_required_type=None, **obj_attributes):
 		"""
 		:param __regcheck_required_type: The type of the object you wish to get
@@ -258,6 +771,8 @@ class Repeat(Range):
 	Specify a sequence that should repeat a certain amount of times
 	(shorthand for Range with min=count, max=count)
 	"""
+	__slots__ = ()
+
 	def __init__(self, count, *regex_descriptions):
 		"""
 		:param count: The amount of times the underlying sequence should repeat
@@ -268,11 +783,60 @@ class Repeat(Range):
 		super(Repeat, self).__init__(count, count, *regex_descriptions)
 
 
+class Either(RegexDescription):
+	"""
+	Specify alternative sequences, one of which should be satisfied
+	(alternatives are preferred in the given order)
+	"""
+	__slots__ = ("_alternatives", )
+
+	def __init__(self, *alternatives):
+		"""
+		:param alternatives: The alternatives, each a regex element or a list of regex elements
+		:type  alternatives: list of RegexDescription or list of list of RegexDescription
+		"""
+		self._alternatives = tuple(
+			(alternative, ) if isinstance(alternative, RegexDescription) else tuple(alternative) for alternative in alternatives
+		)
+
+		if 0 == len(self._alternatives):
+			raise ValueError("Can't have an either without alternatives")
+
+		if any(0 == len(alternative) for alternative in self._alternatives):
+			raise ValueError("Can't have an empty alternative")
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "Either({})".format(", ".join(
+			repr(alternative[0]) if 1 == len(alternative) else "[{}]".format(", ".join(map(repr, alternative)))
+			for alternative in self._alternatives
+		))
+
+	def get_alternatives(self):
+		"""
+		:return: The alternatives, each a sequence of regex elements
+		:rtype : tuple of tuple of RegexDescription
+		"""
+		return self._alternatives
+
+	def structure_key(self):
+		"""
+		:return: A key that is equal for eithers with the same alternatives, in the same order
+		:rtype : tuple
+		"""
+		return (Either, tuple(tuple(_value_structure_key(sub) for sub in alternative) for alternative in self._alternatives))
+
+
 class Variable(object):
 	"""
 	A regex evaluation-time variable
 	(created, modified and evaluated during the evaluation of a sequence)
 	"""
+	__slots__ = ("_name", )
+
 	def __init__(self, name=None):
 		"""
 		:param name: The name used to reference the variable
@@ -312,13 +876,27 @@ class Variable(object):
 
 class VariablesFrame(object):
 	"""
-	A collection of variables
-	(used to hold variable values in different evaluation branches)
+	A persistent collection of variables
+	(used to hold variable values in different evaluation branches - setting a variable creates a new frame,
+	sharing the unchanged variables with the original one, the stored values themselves are never copied)
 	"""
-	def __init__(self):
+	__slots__ = ("_variables", "_changes", "_changes_count", "_pending_changes")
+
+	# The amount of chained changes after which they are flattened into a single lookup dictionary
+	MAX_CHAINED_CHANGES = 8
+
+	def __init__(self, variables=None, changes=None, changes_count=0):
 		"""
+		:param variables: The flattened variable values, by variable name (never modified once given)
+		:type  variables: dict
+		:param changes: The variable changes made on top of variables, as a linked (name, value, next) chain
+		:type  changes: tuple
+		:param changes_count: The amount of chained changes
+		:type  changes_count: int
 		"""
-		self._variables = dict()
+		self._variables = variables if variables is not None else dict()
+		self._changes = changes
+		self._changes_count = changes_count
 		self._pending_changes = []
 
 	def __repr__(self):
@@ -326,7 +904,43 @@ class VariablesFrame(object):
 		:return: Textual representation of the object
 		:rtype : str
 		"""
-		return self._variables.__repr__()
+		return self._flattened().__repr__()
+
+	def _flattened(self):
+		"""
+		:return: All the variable values of the frame, by variable name
+		:rtype : dict
+		"""
+		chained_changes = []
+		change = self._changes
+		while change is not None:
+			chained_changes.append(change)
+			change = change[2]
+
+		variables = dict(self._variables)
+		for name, value, _ in reversed(chained_changes):
+			variables[name] = value
+
+		return variables
+
+	def _lookup(self, name):
+		"""
+		:param name: The name of the queried variable
+		:type  name: str
+		:return: Wether the variable is set, with its value
+		:rtype : tuple of (bool, any)
+		"""
+		change = self._changes
+		while change is not None:
+			if change[0] == name:
+				return True, change[1]
+
+			change = change[2]
+
+		if name in self._variables:
+			return True, self._variables[name]
+
+		return False, None
 
 	def has_variable(self, variable):
 		"""
@@ -336,7 +950,7 @@ class VariablesFrame(object):
 		:return: Wether the given variable is inside the frame
 		:rtype : bool
 		"""
-		return variable.get_name() in self._variables
+		return self._lookup(variable.get_name())[0]
 
 	def get_var_value(self, variable):
 		"""
@@ -345,7 +959,27 @@ class VariablesFrame(object):
 		:return: The value stored in the given variable
 		:rtype : any
 		"""
-		return self._variables[variable.get_name()]
+		found, value = self._lookup(variable.get_name())
+		if not found:
+			raise KeyError(variable.get_name())
+
+		return value
+
+	def set_var_value(self, variable, value):
+		"""
+		:param variable: The variable to set
+		:type  variable: Variable
+		:param value: The value of the variable
+		:type  value: any
+		:return: A new frame holding the given value, this frame is left unchanged
+		:rtype : VariablesFrame
+		"""
+		changes = (variable.get_name(), value, self._changes)
+		if self._changes_count < self.MAX_CHAINED_CHANGES:
+			return VariablesFrame(self._variables, changes, self._changes_count + 1)
+
+		# Keep lookups short, the flattened dictionary is a shallow copy so values are still shared
+		return VariablesFrame(VariablesFrame(self._variables, changes)._flattened())
 
 	def request_var_change(self, variable, value):
 		"""
@@ -363,14 +997,25 @@ class VariablesFrame(object):
 		"""
 		return len(self._pending_changes)
 
-	def apply_changes(self):
+	def commit_changes(self):
 		"""
-		Apply all of the frame pending changes (update variables)
+		Take all of the frame pending changes, leaving the frame itself unchanged
+		:return: A frame with the pending changes applied (this frame if there are none)
+		:rtype : VariablesFrame
 		"""
+		frame = self
 		for variable, updated_value in self._pending_changes:
-			self._variables[variable.get_name()] = updated_value
+			frame = frame.set_var_value(variable, updated_value)
 
 		self._pending_changes = []
+		return frame
+
+	def apply_changes(self):
+		"""
+		Apply all of the frame pending changes (update variables)
+		"""
+		frame = self.commit_changes()
+		self._variables, self._changes, self._changes_count = frame._variables, frame._changes, frame._changes_count
 
 
 class SetVariable(EvaluationAction):
@@ -378,6 +1023,8 @@ class SetVariable(EvaluationAction):
 	An action representing a change to a variable
 	(doesn't consume the object it acts on)
 	"""
+	__slots__ = ("_variable", )
+
 	def __init__(self, variable, consume_object=False):
 		"""
 		:param variable: The variable to set
@@ -395,6 +1042,13 @@ class SetVariable(EvaluationAction):
 		"""
 		return "SetVariable({})".format(self._variable)
 
+	def structure_key(self):
+		"""
+		:return: A key that is equal for actions setting the same variable
+		:rtype : tuple
+		"""
+		return (type(self), self._variable.get_name(), self._consuming)
+
 	def perform(self, obj, variables_frame=None):
 		"""
 		:param obj: The object to be evaluated
@@ -412,11 +1066,14 @@ class VariableCheck(Check):
 	"""
 	Checks that an object is equal to an evaluation-time variable
 	"""
+	__slots__ = ("_variable", )
+
 	def __init__(self, variable):
 		"""
 		:param variable: The variable to check against
 		:type  variable: Variable
 		"""
+		super(VariableCheck, self).__init__()
 		self._variable = variable
 
 	def __repr__(self):
@@ -426,6 +1083,20 @@ class VariableCheck(Check):
 		"""
 		return "VariableCheck({})".format(self._variable)
 
+	def structure_key(self):
+		"""
+		:return: A key that is equal for checks against the same variable
+		:rtype : tuple
+		"""
+		return (type(self), self._variable.get_name())
+
+	def is_pure(self):
+		"""
+		:return: Wether the action outcome depends only on the evaluated object (no side effects or variables)
+		:rtype : bool
+		"""
+		return False
+
 	def perform(self, obj, variables_frame):
 		"""
 		:param obj: The object to be evaluated
@@ -435,379 +1106,4246 @@ class VariableCheck(Check):
 		:return: Wether the object evaluation action succeeded
 		:rtype : bool
 		"""
-		# Check variable existence in the frame
-		if not variables_frame.has_variable(self._variable): return False
-
-		# Check variable value
-		variable_value = variables_frame.get_var_value(self._variable)
-		if obj != variable_value:
-			_set_last_failure_error("Wrong object value - expected: {}, got: {}".format(self._variable.get_name(), variable_value, obj))
-			return False
-		else:
-			return True
+		return self._check_variable(obj, variables_frame, True)
 
-
-class EvaluationNode(object):
-	"""
-	An interface for regex machine evaluation nodes
-	(states in the state machine)
-	"""
-	def __init__(self, forward_node=None):
+	def compile(self, diagnostics=True):
 		"""
-		:param forward_node: The next node in the state machine
-		:type  forward_node: EvaluationNode
+		:param diagnostics: Wether the callable should record failure reasons
+		:type  diagnostics: bool
+		:return: A callable performing the action, taking an object and a variables frame
+		:rtype : function
 		"""
-		self._forward_node = forward_node
+		if diagnostics:
+			return self.perform
+
+		return lambda obj, variables_frame: self._check_variable(obj, variables_frame, False)
 
-	def set_forward_node(self, forward_node):
+	def _check_variable(self, obj, variables_frame, diagnostics):
 		"""
-		:param forward_node: The next node in the state machine
-		:type  forward_node: EvaluationNode
+		:param obj: The object to be evaluated
+		:type  obj: any
+		:param variables_frame: The frame holding the evaluation variables
+		:type  variables_frame: VariablesFrame
+		:param diagnostics: Wether to record the failure reason
+		:type  diagnostics: bool
+		:return: Wether the object evaluation action succeeded
+		:rtype : bool
+		"""
+		# Check variable existence in the frame
+		if not variables_frame.has_variable(self._variable):
+			if diagnostics: _set_last_failure_error(FAILURE_UNSET_VARIABLE, self, self._variable.get_name(), None, obj)
+			return False
+
+		# Check variable value
+		variable_value = variables_frame.get_var_value(self._variable)
+		if obj != variable_value:
+			if diagnostics: _set_last_failure_error(FAILURE_VARIABLE_MISMATCH, self, self._variable.get_name(), variable_value, obj)
+			return False
+		else:
+			return True
+
+
+class PredicateMemo(object):
+	"""
+	Caches the outcomes of pure actions, per sequence position, during a single evaluation
+	(backtracking branches re-evaluate the same actions on the same objects)
+	"""
+	def __init__(self):
+		"""
+		"""
+		self._outcomes = {}
+		self._position = 0
+		self._hits = 0
+		self._misses = 0
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "PredicateMemo(hits={}, misses={})".format(self._hits, self._misses)
+
+	def seek(self, position):
+		"""
+		:param position: The sequence index of the objects evaluated next
+		:type  position: int
+		"""
+		self._position = position
+
+	def perform(self, action, predicate, obj, variables_frame):
+		"""
+		:param action: The performed action
+		:type  action: EvaluationAction
+		:param predicate: The compiled callable performing the action (see ActionState.get_predicate)
+		:type  predicate: function
+		:param obj: The object at the current position
+		:type  obj: any
+		:param variables_frame: The frame holding the evaluation variables
+		:type  variables_frame: VariablesFrame
+		:return: Wether the object evaluation action succeeded
+		:rtype : bool
+		"""
+		if not action.is_pure():
+			return predicate(obj, variables_frame)
+
+		key = (id(action), self._position)
+		outcome = self._outcomes.get(key)
+		if outcome is None:
+			self._misses += 1
+			outcome = self._outcomes[key] = bool(predicate(obj, variables_frame))
+		else:
+			self._hits += 1
+
+		return outcome
+
+	def get_hits(self):
+		"""
+		:return: The amount of outcomes served from the cache
+		:rtype : int
+		"""
+		return self._hits
+
+	def get_misses(self):
+		"""
+		:return: The amount of outcomes computed by performing the action
+		:rtype : int
+		"""
+		return self._misses
+
+	def hit_rate(self):
+		"""
+		:return: The fraction of pure action performs served from the cache
+		:rtype : float
+		"""
+		total = self._hits + self._misses
+		return 0.0 if total == 0 else float(self._hits) / total
+
+
+def uses_variables(regex_descriptions):
+	"""
+	Check wether evaluation-time variables are referenced by the given descriptions
+	:param regex_descriptions: The descriptions to inspect (including nested ones)
+	:type  regex_descriptions: list of RegexDescription
+	:return: Wether any of the descriptions sets or checks a Variable
+	:rtype : bool
+	"""
+	for description in regex_descriptions:
+		if isinstance(description, (SetVariable, VariableCheck)):
+			return True
+
+		if isinstance(description, Range) and uses_variables(description.get_sub_elements()):
+			return True
+
+		if isinstance(description, Either) and any(uses_variables(alternative) for alternative in description.get_alternatives()):
+			return True
+
+		if isinstance(description, Check):
+			nested_actions = [desired for desired in description._obj_attributes.values() if isinstance(desired, EvaluationAction)]
+			if uses_variables(nested_actions):
+				return True
+
+	return False
+
+
+def _is_structural(regex_descriptions):
+	"""
+	:param regex_descriptions: The descriptions to inspect (including nested ones)
+	:type  regex_descriptions: list of RegexDescription
+	:return: Wether all the descriptions are of the library types, whose structure key covers everything they evaluate
+	:rtype : bool
+	:note  : Subclasses may evaluate objects using state their structure key doesn't include
+	"""
+	for description in regex_descriptions:
+		if type(description).__module__ != __name__:
+			return False
+
+		if isinstance(description, Range) and not _is_structural(description.get_sub_elements()):
+			return False
+
+		if isinstance(description, Either) and not all(_is_structural(alternative) for alternative in description.get_alternatives()):
+			return False
+
+		if isinstance(description, Check) and not isinstance(description, VariableCheck):
+			nested_descriptions = [desired for desired in description._obj_attributes.values() if isinstance(desired, RegexDescription)]
+			if not _is_structural(nested_descriptions):
+				return False
+
+	return True
+
+
+def _same_structure(regex_descriptions, other_regex_descriptions):
+	"""
+	:param regex_descriptions: A sequence of regex elements
+	:type  regex_descriptions: list of RegexDescription
+	:param other_regex_descriptions: Another sequence of regex elements
+	:type  other_regex_descriptions: list of RegexDescription
+	:return: Wether both sequences evaluate objects the same way
+	:rtype : bool
+	"""
+	if len(regex_descriptions) != len(other_regex_descriptions):
+		return False
+
+	if not (_is_structural(regex_descriptions) and _is_structural(other_regex_descriptions)):
+		return all(description is other_description for description, other_description in zip(regex_descriptions, other_regex_descriptions))
+
+	try:
+		return all(
+			description is other_description or description.structure_key() == other_description.structure_key()
+			for description, other_description in zip(regex_descriptions, other_regex_descriptions)
+		)
+	except Exception:
+		# Attribute values that can't be compared
+		return False
+
+
+def _nested_range_bounds(outer_min, outer_max, inner_min, inner_max):
+	"""
+	:return: The (min, max) bounds of a single range equivalent to the given nested ranges,
+	         None if the possible total repetition counts aren't contiguous
+	:rtype : tuple of (int, int)
+	"""
+	if 0 == outer_max or 0 == inner_max:
+		return None
+
+	def multiply(count, other_count):
+		return None if count is None or other_count is None else count * other_count
+
+	if outer_min != outer_max:
+		# k outer repetitions cover [k * inner_min, k * inner_max], these intervals must touch for every k,
+		# the gap between them only shrinks as k grows (past k=0)
+		for outer_count in set([outer_min, max(outer_min, 1)]):
+			if outer_max is not None and outer_count >= outer_max:
+				continue
+
+			if inner_max is not None and (outer_count + 1) * inner_min > outer_count * inner_max + 1:
+				return None
+
+			if inner_max is None and 0 == outer_count and inner_min > 1:
+				return None
+
+	return (outer_min * inner_min, multiply(outer_max, inner_max))
+
+
+class OptimizationReport(object):
+	"""
+	The rewrites applied by a PatternOptimizer
+	"""
+	def __init__(self):
+		"""
+		"""
+		self._rewrites = []
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "OptimizationReport({})".format(", ".join(
+			"{}={}".format(optimization_pass, self.count(optimization_pass)) for optimization_pass in OPTIMIZATION_PASSES
+		))
+
+	def __str__(self):
+		"""
+		:return: A line for every rewrite
+		:rtype : str
+		"""
+		return "\n".join("{}: {} -> {}".format(optimization_pass, before, after) for optimization_pass, before, after in self._rewrites)
+
+	def add(self, optimization_pass, before, after):
+		"""
+		:param optimization_pass: The pass that made the rewrite (one of OPTIMIZATION_PASSES)
+		:type  optimization_pass: str
+		:param before: The rewritten regex elements
+		:type  before: any
+		:param after: The regex elements they were rewritten into
+		:type  after: any
+		"""
+		self._rewrites.append((optimization_pass, before, after))
+
+	def get_rewrites(self):
+		"""
+		:return: The applied rewrites, in order
+		:rtype : list of tuple of (str, any, any)
+		"""
+		return list(self._rewrites)
+
+	def count(self, optimization_pass=None):
+		"""
+		:param optimization_pass: The pass whose rewrites are counted, None for all the passes
+		:type  optimization_pass: str
+		:return: The amount of applied rewrites
+		:rtype : int
+		"""
+		return len([rewrite for rewrite in self._rewrites if optimization_pass is None or rewrite[0] == optimization_pass])
+
+
+class PatternOptimizer(object):
+	"""
+	Rewrites regex descriptions into equivalent ones that are cheaper to evaluate
+	(the given descriptions are left untouched, rewritten ranges are new instances)
+	"""
+	def __init__(self, passes=OPTIMIZATION_PASSES):
+		"""
+		:param passes: The enabled rewrites
+		:type  passes: iterable of str
+		"""
+		self._passes = frozenset(passes)
+
+		unknown_passes = self._passes.difference(OPTIMIZATION_PASSES)
+		if 0 != len(unknown_passes):
+			raise ValueError("Unknown optimization passes {}, expected any of: {}".format(
+				", ".join(sorted(unknown_passes)), ", ".join(OPTIMIZATION_PASSES)
+			))
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "PatternOptimizer({})".format(", ".join(sorted(self._passes)))
+
+	def optimize(self, regex_descriptions):
+		"""
+		:param regex_descriptions: The regex elements to optimize
+		:type  regex_descriptions: list of RegexDescription
+		:return: The optimized regex elements, with a report of the applied rewrites
+		:rtype : tuple of (tuple of RegexDescription, OptimizationReport)
+		"""
+		report = OptimizationReport()
+		descriptions = tuple(regex_descriptions)
+
+		# A rewrite may enable others (a collapsed range exposing two mergeable neighbours), repeat until nothing changes
+		rewrites_count = -1
+		while rewrites_count != report.count():
+			rewrites_count = report.count()
+			descriptions = self._rewrite_sequence(descriptions, report)
+
+		if OPTIMIZE_DEDUPLICATE_CHECKS in self._passes:
+			descriptions = self._deduplicate_sequence(descriptions, {}, report)
+
+		return descriptions, report
+
+	def _rewrite_sequence(self, regex_descriptions, report):
+		"""
+		:param regex_descriptions: A sequence of regex elements
+		:type  regex_descriptions: tuple of RegexDescription
+		:param report: Collects the applied rewrites
+		:type  report: OptimizationReport
+		:return: The rewritten sequence
+		:rtype : tuple of RegexDescription
+		"""
+		rewritten = []
+		for description in regex_descriptions:
+			if isinstance(description, Either):
+				description = self._rewrite_either(description, report)
+
+				if OPTIMIZE_HOIST_PREFIXES in self._passes:
+					prefix, hoisted = self._hoist_prefix(description)
+					if 0 != len(prefix):
+						report.add(OPTIMIZE_HOIST_PREFIXES, description, prefix + (hoisted, ))
+						rewritten.extend(prefix)
+						description = hoisted
+
+			if isinstance(description, Range):
+				description = self._rewrite_range(description, report)
+
+				if OPTIMIZE_COLLAPSE_SINGLE_REPEATS in self._passes and 1 == description._min_count == description._max_count:
+					report.add(OPTIMIZE_COLLAPSE_SINGLE_REPEATS, description, description.get_sub_elements())
+					rewritten.extend(description.get_sub_elements())
+					continue
+
+				# Possessive ranges don't give back repetitions to the next range, merging them would
+				if OPTIMIZE_MERGE_RANGES in self._passes and 0 != len(rewritten) and isinstance(rewritten[-1], Range) and \
+						rewritten[-1]._mode == description._mode != RANGE_POSSESSIVE and \
+						_same_structure(rewritten[-1].get_sub_elements(), description.get_sub_elements()):
+					previous = rewritten[-1]
+					max_count = None if previous._max_count is None or description._max_count is None else previous._max_count + description._max_count
+					rewritten[-1] = Range(previous._min_count + description._min_count, max_count, *previous.get_sub_elements(), mode=previous._mode)
+					report.add(OPTIMIZE_MERGE_RANGES, (previous, description), rewritten[-1])
+					continue
+
+			rewritten.append(description)
+
+		return tuple(rewritten)
+
+	def _rewrite_range(self, range_description, report):
+		"""
+		:param range_description: A range element
+		:type  range_description: Range
+		:param report: Collects the applied rewrites
+		:type  report: OptimizationReport
+		:return: The rewritten range (the given one if nothing was rewritten)
+		:rtype : Range
+		"""
+		sub_elements = self._rewrite_sequence(range_description.get_sub_elements(), report)
+
+		if OPTIMIZE_FLATTEN_RANGES in self._passes and 1 == len(sub_elements) and isinstance(sub_elements[0], Range) and \
+				range_description._mode == sub_elements[0]._mode == RANGE_GREEDY:
+			inner = sub_elements[0]
+			bounds = _nested_range_bounds(range_description._min_count, range_description._max_count, inner._min_count, inner._max_count)
+			if bounds is not None:
+				flattened = Range(bounds[0], bounds[1], *inner.get_sub_elements())
+				report.add(OPTIMIZE_FLATTEN_RANGES, range_description, flattened)
+				return flattened
+
+		return self._with_sub_elements(range_description, sub_elements)
+
+	def _rewrite_either(self, either_description, report):
+		"""
+		:param either_description: An either element
+		:type  either_description: Either
+		:param report: Collects the applied rewrites
+		:type  report: OptimizationReport
+		:return: The either with its alternatives rewritten (the given one if nothing was rewritten)
+		:rtype : Either
+		"""
+		return self._with_alternatives(either_description, [
+			self._rewrite_sequence(alternative, report) for alternative in either_description.get_alternatives()
+		])
+
+	@staticmethod
+	def _hoist_prefix(either_description):
+		"""
+		Split the leading elements shared by all the alternatives out of an either, so they are evaluated once
+		(every alternative must keep at least one element, an emptied alternative would change the preference order)
+		:param either_description: An either element
+		:type  either_description: Either
+		:return: The shared leading elements, with the either of the rest of the alternatives
+		:rtype : tuple of (tuple of RegexDescription, Either)
+		"""
+		alternatives = either_description.get_alternatives()
+		if 1 == len(alternatives):
+			return (), either_description
+
+		prefix_length = 0
+		shortest_length = min(len(alternative) for alternative in alternatives)
+		while prefix_length < shortest_length - 1 and all(
+			_same_structure(alternatives[0][prefix_length:prefix_length + 1], alternative[prefix_length:prefix_length + 1])
+			for alternative in alternatives[1:]
+		):
+			prefix_length += 1
+
+		if 0 == prefix_length:
+			return (), either_description
+
+		return alternatives[0][:prefix_length], Either(*[alternative[prefix_length:] for alternative in alternatives])
+
+	def _deduplicate_sequence(self, regex_descriptions, checks, report):
+		"""
+		:param regex_descriptions: A sequence of regex elements
+		:type  regex_descriptions: tuple of RegexDescription
+		:param checks: The first check of every structure key met so far
+		:type  checks: dict
+		:param report: Collects the applied rewrites
+		:type  report: OptimizationReport
+		:return: The sequence, with every check replaced by the first check structurally identical to it
+		:rtype : tuple of RegexDescription
+		"""
+		deduplicated = []
+		for description in regex_descriptions:
+			if isinstance(description, Range):
+				description = self._with_sub_elements(description, self._deduplicate_sequence(description.get_sub_elements(), checks, report))
+
+			elif isinstance(description, Either):
+				description = self._with_alternatives(description, [
+					self._deduplicate_sequence(alternative, checks, report) for alternative in description.get_alternatives()
+				])
+
+			elif isinstance(description, Check) and _is_structural((description, )):
+				try:
+					shared = checks.setdefault(description.structure_key(), description)
+				except TypeError:
+					# Unhashable attribute values, can't be compared structurally
+					shared = description
+
+				if shared is not description:
+					report.add(OPTIMIZE_DEDUPLICATE_CHECKS, description, shared)
+					description = shared
+
+			deduplicated.append(description)
+
+		return tuple(deduplicated)
+
+	@staticmethod
+	def _with_sub_elements(range_description, sub_elements):
+		"""
+		:return: The given range if its sub elements are the given ones, otherwise a copy of it with the given sub elements
+		:rtype : Range
+		"""
+		if all(sub is original for sub, original in zip(sub_elements, range_description.get_sub_elements())) and \
+				len(sub_elements) == len(range_description.get_sub_elements()):
+			return range_description
+
+		return Range(range_description._min_count, range_description._max_count, *sub_elements, mode=range_description._mode)
+
+	@staticmethod
+	def _with_alternatives(either_description, alternatives):
+		"""
+		:return: The given either if its alternatives are the given ones, otherwise a copy of it with the given alternatives
+		:rtype : Either
+		"""
+		if all(
+			len(alternative) == len(original) and all(sub is original_sub for sub, original_sub in zip(alternative, original))
+			for alternative, original in zip(alternatives, either_description.get_alternatives())
+		):
+			return either_description
+
+		return Either(*alternatives)
+
+
+def _consuming_actions(regex_description):
+	"""
+	:param regex_description: A regex element
+	:type  regex_description: RegexDescription
+	:return: All the actions consuming objects inside the element
+	:rtype : list of EvaluationAction
+	"""
+	if isinstance(regex_description, Range):
+		return [action for sub in regex_description.get_sub_elements() for action in _consuming_actions(sub)]
+
+	if isinstance(regex_description, Either):
+		return [action for alternative in regex_description.get_alternatives() for sub in alternative for action in _consuming_actions(sub)]
+
+	return [regex_description] if regex_description.is_consuming() else []
+
+
+def _is_nullable(regex_description):
+	"""
+	:param regex_description: A regex element
+	:type  regex_description: RegexDescription
+	:return: Wether the element may be satisfied without consuming any object
+	:rtype : bool
+	"""
+	if isinstance(regex_description, Range):
+		return 0 == regex_description._min_count or all(_is_nullable(sub) for sub in regex_description.get_sub_elements())
+
+	if isinstance(regex_description, Either):
+		return any(all(_is_nullable(sub) for sub in alternative) for alternative in regex_description.get_alternatives())
+
+	return not regex_description.is_consuming()
+
+
+def _dispatch_type(action):
+	"""
+	:param action: A consuming action
+	:type  action: EvaluationAction
+	:return: The type an object is required to be an instance of to satisfy the action,
+	         None if unknown or if instances of other types may satisfy it (abstract base classes)
+	:rtype : type
+	"""
+	if not isinstance(action, Check) or type(action).perform is not Check.perform or action._type is None:
+		return None
+
+	# Types of a custom metaclass may accept instances of types that don't have them in their MRO
+	return action._type if type(action._type) is type else None
+
+
+def _first_types(regex_descriptions):
+	"""
+	:param regex_descriptions: A sequence of regex elements
+	:type  regex_descriptions: list of RegexDescription
+	:return: The types the first object consumed by the elements is required to be an instance of (one of),
+	         None if it may be of any type, or the elements may be satisfied without consuming any object
+	:rtype : set of type
+	"""
+	first_types = set()
+	for description in regex_descriptions:
+		if isinstance(description, Range):
+			sub_types = _first_types(description.get_sub_elements())
+			if sub_types is None:
+				return None
+
+			first_types.update(sub_types)
+
+		elif isinstance(description, Either):
+			for alternative in description.get_alternatives():
+				alternative_types = _first_types(alternative)
+				if alternative_types is None:
+					return None
+
+				first_types.update(alternative_types)
+
+		elif not description.is_consuming():
+			# Non-consuming actions don't decide the type of the consumed object
+			continue
+
+		elif _dispatch_type(description) is not None:
+			first_types.add(_dispatch_type(description))
+
+		else:
+			return None
+
+		if not _is_nullable(description):
+			return first_types
+
+	return None
+
+
+def _checks_may_overlap(action, other_action):
+	"""
+	:param action: A consuming action
+	:type  action: EvaluationAction
+	:param other_action: Another consuming action
+	:type  other_action: EvaluationAction
+	:return: Wether some object may satisfy both actions
+	:rtype : bool
+	:note  : Conservative, only plain checks of unrelated types or different attribute values are known to be disjoint
+	"""
+	for check in (action, other_action):
+		if not isinstance(check, Check) or type(check).perform is not Check.perform:
+			return True
+
+	if action._type is not None and other_action._type is not None and \
+			not issubclass(action._type, other_action._type) and not issubclass(other_action._type, action._type):
+		return False
+
+	for attribute, desired in action._obj_attributes.items():
+		if attribute not in other_action._obj_attributes: continue
+
+		other_desired = other_action._obj_attributes[attribute]
+		if isinstance(desired, EvaluationAction) or isinstance(other_desired, EvaluationAction): continue
+
+		try:
+			if desired != other_desired:
+				return False
+		except Exception:
+			# Attribute values that can't be compared
+			continue
+
+	return True
+
+
+def _elements_may_overlap(regex_descriptions, other_regex_descriptions):
+	"""
+	:return: Wether an object may be consumed by both the given elements and the other given elements
+	:rtype : bool
+	"""
+	actions = [action for description in regex_descriptions for action in _consuming_actions(description)]
+	other_actions = [action for description in other_regex_descriptions for action in _consuming_actions(description)]
+	return any(_checks_may_overlap(action, other_action) for action in actions for other_action in other_actions)
+
+
+def _is_varying_range(regex_description):
+	"""
+	:param regex_description: A regex element
+	:type  regex_description: RegexDescription
+	:return: Wether the element is a range repeated an unbounded or large varying amount of times
+	         (smaller ranges split a run of objects in a constant amount of ways)
+	:rtype : bool
+	"""
+	if not isinstance(regex_description, Range):
+		return False
+
+	return regex_description._max_count is None or regex_description._max_count - regex_description._min_count >= COUNTING_MIN_BOUND
+
+
+def _has_range_counter(regex_description):
+	"""
+	:param regex_description: A regex element
+	:type  regex_description: RegexDescription
+	:return: Wether the element is a range whose repetition counter takes several values in the branches
+	         (unbounded ranges stop counting once reaching their minimum)
+	:rtype : bool
+	"""
+	if not isinstance(regex_description, Range):
+		return False
+
+	largest_count = regex_description._min_count if regex_description._max_count is None else regex_description._max_count
+	return 1 < largest_count
+
+
+class PatternAnalysis(object):
+	"""
+	The ambiguous constructs of a pattern, and the worst-case complexity they cause
+	Ambiguous patterns may satisfy the same sequence in many ways, all tried by a backtracking search before it fails:
+	- Nested ranges of a varying amount of repetitions, such as RegexAsterix(RegexPlus(Check())) (exponential)
+	- Adjacent unbounded or largely bounded ranges of overlapping checks, such as RegexAsterix(Check()), RegexAsterix(Check()) (polynomial)
+	- Repeated alternatives of overlapping checks, such as RegexAsterix(Either(Check(), Check(A))) (exponential if unbounded)
+	"""
+	def __init__(self, regex_descriptions, engine=ENGINE_BACKTRACKING):
+		"""
+		:param regex_descriptions: The analyzed regex elements
+		:type  regex_descriptions: list of RegexDescription
+		:param engine: The engine checking the sequences
+		:type  engine: str
+		"""
+		# A list of (kind, complexity, degree, descriptions) tuples
+		self._issues = []
+		self._analyze_sequence(tuple(regex_descriptions))
+
+		self._ambiguity, self._degree = COMPLEXITY_LINEAR, 1
+		for _, complexity, degree, _ in self._issues:
+			if complexity == COMPLEXITY_EXPONENTIAL:
+				self._ambiguity, self._degree = COMPLEXITY_EXPONENTIAL, None
+				break
+
+			self._ambiguity, self._degree = COMPLEXITY_POLYNOMIAL, max(self._degree, degree)
+
+		# The nfa and dfa engines merge identical branches, as does the backtracking engine unless variable
+		# frames or range counters tell the branches apart - the work per object is then bounded by the machine size
+		variables = uses_variables(regex_descriptions)
+		if engine == ENGINE_BACKTRACKING and (variables or any(
+			_has_range_counter(description) for _, _, _, descriptions in self._issues for description in descriptions
+		)):
+			self._complexity = self._ambiguity
+		else:
+			self._complexity = COMPLEXITY_LINEAR
+
+		# Patterns using variables are checked by the backtracking engine whichever engine is requested
+		self._recommended_engine = ENGINE_NFA if self._complexity != COMPLEXITY_LINEAR and not variables else None
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "PatternAnalysis(complexity={}, ambiguity={}, issues={})".format(self.get_complexity(), self.get_ambiguity(), len(self._issues))
+
+	def _analyze_sequence(self, regex_descriptions):
+		"""
+		Record the ambiguous constructs of a sequence of regex elements, including nested ones
+		:param regex_descriptions: A sequence of regex elements
+		:type  regex_descriptions: tuple of RegexDescription
+		"""
+		for index, description in enumerate(regex_descriptions):
+			if isinstance(description, Range):
+				self._analyze_range(description)
+
+			elif isinstance(description, Either):
+				for alternative in description.get_alternatives():
+					self._analyze_sequence(alternative)
+
+		# Chains of unbounded (or largely bounded) ranges whose checks overlap, with nothing but optional elements
+		# between them, may split a run of objects between them in O(n ^ (chain length - 1)) ways
+		index = 0
+		while index < len(regex_descriptions):
+			chain = [regex_descriptions[index]]
+			last_index = index
+			# Possessive ranges never split a run of objects with the next range
+			if _is_varying_range(chain[0]) and chain[0]._mode != RANGE_POSSESSIVE:
+				for next_index in range(index + 1, len(regex_descriptions)):
+					description = regex_descriptions[next_index]
+					if _is_varying_range(description) and chain[-1]._mode != RANGE_POSSESSIVE and \
+							_elements_may_overlap([chain[-1]], [description]):
+						chain.append(description)
+						last_index = next_index
+					elif not _is_nullable(description):
+						break
+
+			if 1 < len(chain):
+				self._issues.append((AMBIGUITY_ADJACENT_RANGES, COMPLEXITY_POLYNOMIAL, len(chain), tuple(chain)))
+
+			index = max(last_index, index + 1)
+
+	def _analyze_range(self, range_description):
+		"""
+		Record the ambiguous constructs of a range and its sub elements
+		:param range_description: A range element
+		:type  range_description: Range
+		"""
+		sub_elements = range_description.get_sub_elements()
+		self._analyze_sequence(sub_elements)
+
+		if range_description._max_count is not None and range_description._max_count <= 1:
+			return
+
+		# A repeated inner range of a varying amount of repetitions may split the same objects between its
+		# own repetitions and those of the outer range, unless the rest of the outer range tells them apart
+		for index, sub in enumerate(sub_elements):
+			if isinstance(sub, Either):
+				self._analyze_repeated_either(range_description, sub)
+				continue
+
+			if not isinstance(sub, Range) or sub._min_count == sub._max_count or sub._mode == RANGE_POSSESSIVE:
+				continue
+
+			rest = sub_elements[:index] + sub_elements[index + 1:]
+			if not all(_is_nullable(description) for description in rest) and not _elements_may_overlap([sub], rest):
+				continue
+
+			if range_description._max_count is None:
+				self._issues.append((AMBIGUITY_NESTED_RANGES, COMPLEXITY_EXPONENTIAL, None, (range_description, sub)))
+			else:
+				self._issues.append((AMBIGUITY_NESTED_RANGES, COMPLEXITY_POLYNOMIAL, range_description._max_count, (range_description, sub)))
+
+	def _analyze_repeated_either(self, range_description, either_description):
+		"""
+		Record a repeated either whose alternatives may consume the same objects
+		(every repetition may then take either alternative, trying up to 2 ^ repetitions combinations)
+		:param range_description: The repeating range element
+		:type  range_description: Range
+		:param either_description: An either element of the range
+		:type  either_description: Either
+		"""
+		alternatives = either_description.get_alternatives()
+		if not any(
+			_elements_may_overlap(alternative, other_alternative)
+			for index, alternative in enumerate(alternatives) for other_alternative in alternatives[index + 1:]
+		):
+			return
+
+		if range_description._max_count is None:
+			self._issues.append((AMBIGUITY_OVERLAPPING_ALTERNATIVES, COMPLEXITY_EXPONENTIAL, None, (range_description, either_description)))
+		else:
+			self._issues.append((
+				AMBIGUITY_OVERLAPPING_ALTERNATIVES, COMPLEXITY_POLYNOMIAL, range_description._max_count, (range_description, either_description)
+			))
+
+	def get_complexity(self):
+		"""
+		:return: The worst-case complexity of checking a sequence with the analyzed engine (one of the COMPLEXITY_ classes)
+		:rtype : str
+		"""
+		return self._complexity
+
+	def get_ambiguity(self):
+		"""
+		:return: The worst-case complexity of a backtracking search that doesn't merge identical branches
+		:rtype : str
+		"""
+		return self._ambiguity
+
+	def get_degree(self):
+		"""
+		:return: The polynomial degree of the ambiguity (O(n ^ degree)), None for an exponential ambiguity
+		:rtype : int
+		"""
+		return self._degree
+
+	def get_issues(self):
+		"""
+		:return: The ambiguous constructs, as (kind, complexity, degree, offending descriptions) tuples
+		:rtype : list of tuple of (str, str, int, tuple of RegexDescription)
+		"""
+		return list(self._issues)
+
+	def is_safe(self):
+		"""
+		:return: Wether checking a sequence is linear in its length with the analyzed engine
+		:rtype : bool
+		"""
+		return self._complexity == COMPLEXITY_LINEAR
+
+	def get_recommended_engine(self):
+		"""
+		:return: An engine checking sequences in linear time when the analyzed one doesn't, None otherwise
+		:rtype : str
+		"""
+		return self._recommended_engine
+
+
+def _add_bounds(bounds, other_bounds):
+	"""
+	:return: The (min, max) amount of objects consumed by two consecutive parts of a sequence (None for no maximum)
+	:rtype : tuple of (int, int)
+	"""
+	return (bounds[0] + other_bounds[0], None if bounds[1] is None or other_bounds[1] is None else bounds[1] + other_bounds[1])
+
+
+class MachineState(object):
+	"""
+	A static state of a compiled evaluation machine
+	(holds no per-branch data - the repetition counters of every range are kept
+	by the branch itself, so a single graph is shared by all branches)
+	"""
+	__slots__ = ("_index", "_forward_state", "_enclosing_state", "_entry_bounds")
+
+	def __init__(self, index, forward_state=None):
+		"""
+		:param index: The identifier of the state inside its graph
+		:type  index: int
+		:param forward_state: The next state in the graph
+		:type  forward_state: MachineState
+		"""
+		self._index = index
+		self._forward_state = forward_state
+
+		# The objects consumed from entering the state until reaching its enclosing range state again (see remaining_bounds)
+		self._enclosing_state = None
+		self._entry_bounds = (0, None)
+
+	def __getstate__(self):
+		"""
+		:return: The picklable state of the state
+		:rtype : dict
+		"""
+		return _slots_state(self)
+
+	def __setstate__(self, state):
+		"""
+		:param state: A state returned by __getstate__
+		:type  state: dict
+		"""
+		_set_slots_state(self, state)
+
+	def copy(self):
+		"""
+		:return: A copy of the state, linked to the same states as this one until relinked (see relink)
+		:rtype : MachineState
+		"""
+		state = type(self).__new__(type(self))
+		self._copy_fields(state)
+		return state
+
+	def _copy_fields(self, state):
+		"""
+		:param state: A state of the same type, taking the fields of this one
+		:type  state: MachineState
+		"""
+		state._index = self._index
+		state._forward_state = self._forward_state
+		state._enclosing_state = self._enclosing_state
+		state._entry_bounds = self._entry_bounds
+
+	def relink(self, states):
+		"""
+		Link the state to the states of the same indexes in another graph (of copies of the linked states)
+		:param states: The states of the other graph, by index
+		:type  states: list of MachineState
+		"""
+		if self._forward_state is not None:
+			self._forward_state = states[self._forward_state._index]
+
+		if self._enclosing_state is not None:
+			self._enclosing_state = states[self._enclosing_state._index]
+
+	def get_index(self):
+		"""
+		:return: The identifier of the state inside its graph
+		:rtype : int
+		"""
+		return self._index
+
+	def set_forward_state(self, forward_state):
+		"""
+		:param forward_state: The next state in the graph
+		:type  forward_state: MachineState
+		"""
+		self._forward_state = forward_state
+
+	def get_forward_state(self):
+		"""
+		:return: The next state in the graph
+		:rtype : MachineState
+		"""
+		return self._forward_state
+
+	def is_consuming(self):
+		"""
+		:return: Wether leaving this state consumes the evaluated object
+		:rtype : bool
+		"""
+		return False
+
+	def is_counting(self):
+		"""
+		:return: Wether threads standing on this state should be merged by their counting sets
+		:rtype : bool
+		"""
+		return False
+
+	def set_entry_bounds(self, enclosing_state, entry_bounds):
+		"""
+		:param enclosing_state: The innermost range state repeating this state, None for states that aren't repeated
+		:type  enclosing_state: RangeState
+		:param entry_bounds: The minimal and maximal amount of objects consumed from entering this state
+		                     until reaching the enclosing state again (or the final state)
+		:type  entry_bounds: tuple of (int, int)
+		"""
+		self._enclosing_state = enclosing_state
+		self._entry_bounds = entry_bounds
+
+	def get_enclosing_state(self):
+		"""
+		:return: The innermost range state repeating this state, None for states that aren't repeated
+		:rtype : RangeState
+		"""
+		return self._enclosing_state
+
+	def get_entry_bounds(self):
+		"""
+		:return: The minimal and maximal amount of objects consumed from entering this state
+		         until reaching its enclosing range state again (None for no maximum)
+		:rtype : tuple of (int, int)
+		"""
+		return self._entry_bounds
+
+	def link_final_state(self, appended_state, appended_bounds):
+		"""
+		Lead the transitions of the state to the final state into states appended after it
+		:param appended_state: The first appended state, replacing the final state
+		:type  appended_state: MachineState
+		:param appended_bounds: The minimal and maximal amount of objects consumed from entering the appended states
+		                        until reaching the final state
+		:type  appended_bounds: tuple of (int, int)
+		"""
+		if self._forward_state is None:
+			self._forward_state = appended_state
+
+		# Only the bounds of states that aren't repeated are counted up to the final state
+		if self._enclosing_state is None:
+			self._entry_bounds = _add_bounds(self._entry_bounds, appended_bounds)
+
+	def remaining_bounds(self, counters):
+		"""
+		:param counters: The range repetition counters of a branch standing on this state
+		:type  counters: tuple
+		:return: The minimal and maximal amount of objects the branch may consume until reaching the final state
+		         (None for no maximum)
+		:rtype : tuple of (int, int)
+		"""
+		min_remaining, max_remaining = self._entry_bounds
+		if self._enclosing_state is None:
+			return min_remaining, max_remaining
+
+		enclosing_min, enclosing_max = self._enclosing_state.remaining_bounds(counters)
+		return min_remaining + enclosing_min, None if max_remaining is None or enclosing_max is None else max_remaining + enclosing_max
+
+	def transitions(self, counters, obj, variables_frame):
+		"""
+		Get all the possible next states, ordered by preference
+		:param counters: The range repetition counters of the evaluated branch
+		:type  counters: tuple of int
+		:param obj: The object to be evaluated
+		:type  obj: any
+		:param variables_frame: The variables frame of the evaluated branch
+		:type  variables_frame: VariablesFrame
+		:return: The next states with their counters and wether the object was consumed
+		:rtype : list of tuple of (MachineState, tuple of int, bool)
+		"""
+		raise NotImplementedError()
+
+	def epsilon_transitions(self, counters):
+		"""
+		Get all the possible next states of a non-action state, for any evaluated object
+		:param counters: The range repetition counters of the evaluated thread
+		:type  counters: tuple of int
+		:return: The next states with their counters and wether the object was consumed
+		:rtype : list of tuple of (MachineState, tuple of int, bool)
+		"""
+		return self.transitions(counters, G_END_OF_SEQUENCE, None)
+
+
+class ActionState(MachineState):
+	"""
+	A machine state performing an underlying EvaluationAction
+	"""
+	__slots__ = ("_action", "_diagnostics", "_predicate")
+
+	def __init__(self, index, action, forward_state=None, diagnostics=True):
+		"""
+		:param index: The identifier of the state inside its graph
+		:type  index: int
+		:param action: The action performed on the evaluated object
+		:type  action: EvaluationAction
+		:param forward_state: The next state in the graph
+		:type  forward_state: MachineState
+		:param diagnostics: Wether failure reasons should be recorded
+		:type  diagnostics: bool
+		"""
+		super(ActionState, self).__init__(index, forward_state)
+		self._action = action
+		self._diagnostics = diagnostics
+		self._predicate = action.compile(diagnostics)
+
+	def __getstate__(self):
+		"""
+		:return: The picklable state of the state (the predicate is compiled again on unpickling)
+		:rtype : dict
+		"""
+		state = _slots_state(self)
+		del state["_predicate"]
+		return state
+
+	def __setstate__(self, state):
+		"""
+		:param state: A state returned by __getstate__
+		:type  state: dict
+		"""
+		_set_slots_state(self, state)
+		self._predicate = self._action.compile(self._diagnostics)
+
+	def _copy_fields(self, state):
+		"""
+		:param state: A state of the same type, taking the fields of this one
+		:type  state: MachineState
+		"""
+		super(ActionState, self)._copy_fields(state)
+		state._action = self._action
+		state._diagnostics = self._diagnostics
+		state._predicate = self._predicate
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "ActionState({}, {})".format(self._index, self._action)
+
+	def get_action(self):
+		"""
+		:return: The action performed on the evaluated object
+		:rtype : EvaluationAction
+		"""
+		return self._action
+
+	def get_predicate(self):
+		"""
+		:return: The compiled callable performing the action
+		:rtype : function
+		"""
+		return self._predicate
+
+	def is_consuming(self):
+		"""
+		:return: Wether leaving this state consumes the evaluated object
+		:rtype : bool
+		"""
+		return self._action.is_consuming()
+
+	def transitions(self, counters, obj, variables_frame):
+		"""
+		Get all the possible next states, ordered by preference
+		:param counters: The range repetition counters of the evaluated branch
+		:type  counters: tuple of int
+		:param obj: The object to be evaluated
+		:type  obj: any
+		:param variables_frame: The variables frame of the evaluated branch
+		:type  variables_frame: VariablesFrame
+		:return: The next states with their counters and wether the object was consumed
+		:rtype : list of tuple of (MachineState, tuple of int, bool)
+		"""
+		if not self._predicate(obj, variables_frame):
+			return []
+
+		return [(self._forward_state, counters, self._action.is_consuming())]
+
+
+def _merge_count_sets(count_set, other_count_set):
+	"""
+	:param count_set: Repetition counts, as sorted disjoint (low, high) inclusive intervals
+	:type  count_set: tuple of tuple of (int, int)
+	:param other_count_set: Repetition counts, as sorted disjoint (low, high) inclusive intervals
+	:type  other_count_set: tuple of tuple of (int, int)
+	:return: The union of the given counts, as sorted disjoint (low, high) inclusive intervals
+	:rtype : tuple of tuple of (int, int)
+	"""
+	merged = []
+	for low, high in sorted(count_set + other_count_set):
+		if 0 != len(merged) and low <= merged[-1][1] + 1:
+			if high > merged[-1][1]:
+				merged[-1] = (merged[-1][0], high)
+		else:
+			merged.append((low, high))
+
+	return tuple(merged)
+
+
+def _merge_counting_threads(threads):
+	"""
+	Merge the threads of the same tag standing on the same counting range state, differing only by their counting set
+	(the merged thread takes the place of the first one, keeping the threads preference order)
+	:param threads: Deduplicated threads
+	:type  threads: iterable of tuple of (MachineState, tuple, any)
+	:return: The merged threads
+	:rtype : list of tuple of (MachineState, tuple, any)
+	"""
+	merged_threads = []
+	positions = {}
+	for state, counters, tag in threads:
+		if state is None or not state.is_counting():
+			merged_threads.append((state, counters, tag))
+			continue
+
+		key = (state, state.merge_key(counters), tag)
+		position = positions.get(key)
+		if position is None:
+			positions[key] = len(merged_threads)
+			merged_threads.append((state, counters, tag))
+		else:
+			merged_threads[position] = (state, state.merge_counters(merged_threads[position][1], counters), tag)
+
+	return merged_threads
+
+
+class RangeState(MachineState):
+	"""
+	A machine state deciding between another repetition of a range and leaving it
+	(the amount of started repetitions is kept in the branch counters, at the range slot)
+	A counting range keeps a set of repetition counts at its slot instead, as sorted (low, high) intervals,
+	so threads that only differ by their count are merged and large bounds cost the same as small ones
+	The slot of a range is its nesting depth - sibling ranges share it, since a range resets its slot on leaving
+	"""
+	__slots__ = ("_slot", "_min_count", "_max_count", "_inner_state", "_counting", "_mode", "_repetition_bounds", "_exit_bounds")
+
+	def __init__(self, index, slot, min_count, max_count, inner_state=None, forward_state=None, counting=False, mode=RANGE_GREEDY):
+		"""
+		:param index: The identifier of the state inside its graph
+		:type  index: int
+		:param slot: The index of the range repetition counter in the branch counters (the amount of enclosing ranges)
+		:type  slot: int
+		:param min_count: The minimum amount of repeats of the inner states
+		:type  min_count: int
+		:param max_count: The maximum amount of repeats of the inner states
+		:type  max_count: int
+		:note  max_count: None for an unbounded range
+		:param inner_state: The first state of the repeated sequence, eventually leading back to this state
+		:type  inner_state: MachineState
+		:param forward_state: The state representing the regex-element after the range
+		:type  forward_state: MachineState
+		:param counting: Wether the range repetitions are tracked as a counting set
+		:type  counting: bool
+		:param mode: The repetition mode, one of RANGE_MODES
+		:type  mode: str
+		:note  mode: The inner state of a possessive range must be a single consuming action state
+		"""
+		super(RangeState, self).__init__(index, forward_state)
+		self._slot = slot
+		self._min_count = min_count
+		self._max_count = max_count
+		self._inner_state = inner_state
+		self._counting = counting
+		self._mode = mode
+
+		# The objects consumed by a single repetition, and from leaving the range until reaching the enclosing state
+		self._repetition_bounds = (0, None)
+		self._exit_bounds = (0, None)
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "RangeState({}, min={}, max={}{}{})".format(
+			self._index, self._min_count, self._max_count, ", counting" if self._counting else "",
+			"" if self._mode == RANGE_GREEDY else ", " + self._mode
+		)
+
+	def is_counting(self):
+		"""
+		:return: Wether threads standing on this state should be merged by their counting sets
+		:rtype : bool
+		"""
+		return self._counting
+
+	def is_possessive(self):
+		"""
+		:return: Wether the state transitions depend on the next object (a DFA can't be built over it)
+		:rtype : bool
+		"""
+		return self._mode == RANGE_POSSESSIVE
+
+	def set_repetition_bounds(self, repetition_bounds, exit_bounds):
+		"""
+		:param repetition_bounds: The minimal and maximal amount of objects consumed by a single repetition
+		:type  repetition_bounds: tuple of (int, int)
+		:param exit_bounds: The minimal and maximal amount of objects consumed from leaving the range
+		                    until reaching the enclosing state (or the final state)
+		:type  exit_bounds: tuple of (int, int)
+		"""
+		self._repetition_bounds = repetition_bounds
+		self._exit_bounds = exit_bounds
+
+	def link_final_state(self, appended_state, appended_bounds):
+		"""
+		Lead the transitions of the state to the final state into states appended after it
+		:param appended_state: The first appended state, replacing the final state
+		:type  appended_state: MachineState
+		:param appended_bounds: The minimal and maximal amount of objects consumed from entering the appended states
+		                        until reaching the final state
+		:type  appended_bounds: tuple of (int, int)
+		"""
+		if self._enclosing_state is None:
+			self._exit_bounds = _add_bounds(self._exit_bounds, appended_bounds)
+
+		super(RangeState, self).link_final_state(appended_state, appended_bounds)
+
+	def remaining_bounds(self, counters):
+		"""
+		:param counters: The range repetition counters of a branch standing on this state
+		:type  counters: tuple
+		:return: The minimal and maximal amount of objects the branch may consume until reaching the final state
+		         (None for no maximum)
+		:rtype : tuple of (int, int)
+		"""
+		count = self._get_count(counters)
+		if self._counting:
+			lowest_count, highest_count = count[0][0], count[-1][1]
+		else:
+			lowest_count = highest_count = count
+
+		repetition_min, repetition_max = self._repetition_bounds
+		min_remaining = max(0, self._min_count - highest_count) * repetition_min + self._exit_bounds[0]
+
+		repetitions_left = None if self._max_count is None else max(0, self._max_count - lowest_count)
+		if 0 == repetitions_left or 0 == repetition_max:
+			max_remaining = self._exit_bounds[1]
+		elif repetitions_left is None or repetition_max is None or self._exit_bounds[1] is None:
+			max_remaining = None
+		else:
+			max_remaining = repetitions_left * repetition_max + self._exit_bounds[1]
+
+		if self._enclosing_state is None:
+			return min_remaining, max_remaining
+
+		enclosing_min, enclosing_max = self._enclosing_state.remaining_bounds(counters)
+		return min_remaining + enclosing_min, None if max_remaining is None or enclosing_max is None else max_remaining + enclosing_max
+
+	def _get_count(self, counters):
+		"""
+		:param counters: The range repetition counters of a branch standing on this state
+		:type  counters: tuple
+		:return: The repetitions count of the branch (the counting set of a counting range)
+		:rtype : int or tuple of tuple of (int, int)
+		"""
+		count = counters[self._slot]
+		# A slot left by a sibling range holds 0, counting ranges included
+		if self._counting and 0 == count:
+			return ((0, 0),)
+
+		return count
+
+	def merge_key(self, counters):
+		"""
+		:param counters: The range repetition counters of a thread standing on this state
+		:type  counters: tuple
+		:return: The counters without the range slot, equal for threads that may be merged
+		:rtype : tuple
+		"""
+		return self._with_count(counters, None)
+
+	def merge_counters(self, counters, other_counters):
+		"""
+		:param counters: The range repetition counters of a thread standing on this state
+		:type  counters: tuple
+		:param other_counters: The counters of another thread, with the same merge key
+		:type  other_counters: tuple
+		:return: The counters of a thread standing for both threads
+		:rtype : tuple
+		"""
+		return self._with_count(counters, _merge_count_sets(self._get_count(counters), self._get_count(other_counters)))
+
+	def set_inner_state(self, inner_state):
+		"""
+		:param inner_state: The first state of the repeated sequence
+		:type  inner_state: MachineState
+		"""
+		self._inner_state = inner_state
+
+	def _copy_fields(self, state):
+		"""
+		:param state: A state of the same type, taking the fields of this one
+		:type  state: MachineState
+		"""
+		super(RangeState, self)._copy_fields(state)
+		state._slot = self._slot
+		state._min_count = self._min_count
+		state._max_count = self._max_count
+		state._inner_state = self._inner_state
+		state._counting = self._counting
+		state._mode = self._mode
+		state._repetition_bounds = self._repetition_bounds
+		state._exit_bounds = self._exit_bounds
+
+	def relink(self, states):
+		"""
+		Link the state to the states of the same indexes in another graph (of copies of the linked states)
+		:param states: The states of the other graph, by index
+		:type  states: list of MachineState
+		"""
+		super(RangeState, self).relink(states)
+		self._inner_state = states[self._inner_state._index]
+
+	def get_inner_state(self):
+		"""
+		:return: The first state of the repeated sequence
+		:rtype : MachineState
+		"""
+		return self._inner_state
+
+	def transitions(self, counters, obj, variables_frame):
+		"""
+		Get all the possible next states, ordered by preference
+		:param counters: The range repetition counters of the evaluated branch
+		:type  counters: tuple of int
+		:param obj: The object to be evaluated
+		:type  obj: any
+		:param variables_frame: The variables frame of the evaluated branch
+		:type  variables_frame: VariablesFrame
+		:return: The next states with their counters and wether the object was consumed
+		:rtype : list of tuple of (MachineState, tuple of int, bool)
+		"""
+		if self._counting:
+			next_states = self._counting_transitions(counters)
+		else:
+			next_states = self._count_transitions(counters)
+
+		if 2 == len(next_states):
+			if self._mode == RANGE_LAZY:
+				next_states.reverse()
+
+			# A possessive range only leaves once the next object can't start another repetition
+			elif self._mode == RANGE_POSSESSIVE and obj is not G_END_OF_SEQUENCE and self._inner_state.get_predicate()(obj, variables_frame):
+				del next_states[1]
+
+		return next_states
+
+	def _count_transitions(self, counters):
+		"""
+		Get all the possible next states, by the repetitions count of the branch, ordered by the greedy preference
+		:param counters: The range repetition counters of the evaluated branch
+		:type  counters: tuple of int
+		:return: The next states with their counters and wether the object was consumed
+		:rtype : list of tuple of (MachineState, tuple of int, bool)
+		"""
+		next_states = []
+		count = self._get_count(counters)
+
+		if self._max_count is None or count < self._max_count:
+			# Once an unbounded range passed its minimum the exact count no longer matters,
+			# saturating it keeps the amount of distinct branch states finite
+			next_count = count if self._max_count is None and count >= self._min_count else count + 1
+			next_states.append((self._inner_state, self._with_count(counters, next_count), False))
+
+		if count >= self._min_count:
+			# Reset the counter on leaving, so the range is re-entered from a clean state
+			next_states.append((self._forward_state, self._with_count(counters, 0), False))
+
+		return next_states
+
+	def _counting_transitions(self, counters):
+		"""
+		Get all the possible next states for a counting range, moving all the tracked counts at once, ordered by the greedy preference
+		:param counters: The range repetition counters of the evaluated branch
+		:type  counters: tuple
+		:return: The next states with their counters and wether the object was consumed
+		:rtype : list of tuple of (MachineState, tuple, bool)
+		"""
+		next_states = []
+		count_set = self._get_count(counters)
+
+		if self._max_count is None:
+			# Saturate the counts past the minimum, like non-counting unbounded ranges
+			next_count_set = tuple(
+				(low if low >= self._min_count else low + 1, high if high >= self._min_count else high + 1) for low, high in count_set
+			)
+			next_count_set = _merge_count_sets(next_count_set, ())
+		else:
+			next_count_set = tuple((low + 1, min(high, self._max_count - 1) + 1) for low, high in count_set if low < self._max_count)
+
+		if 0 != len(next_count_set):
+			next_states.append((self._inner_state, self._with_count(counters, next_count_set), False))
+
+		if count_set[-1][1] >= self._min_count:
+			next_states.append((self._forward_state, self._with_count(counters, 0), False))
+
+		return next_states
+
+	def _with_count(self, counters, count):
+		"""
+		:return: The given counters, with the range slot replaced by count
+		:rtype : tuple of int
+		"""
+		return counters[:self._slot] + (count,) + counters[self._slot + 1:]
+
+
+class EitherState(MachineState):
+	"""
+	A machine state deciding between the alternatives of an either
+	The alternatives are indexed by the types their first consumed object is required to be an instance of,
+	so only the alternatives that may accept the evaluated object are followed
+	"""
+	__slots__ = ("_alternative_states", "_typed_alternatives", "_untyped_alternatives", "_dispatch_cache")
+
+	def __init__(self, index, forward_state=None):
+		"""
+		:param index: The identifier of the state inside its graph
+		:type  index: int
+		:param forward_state: The state representing the regex-element after the either
+		:type  forward_state: MachineState
+		"""
+		super(EitherState, self).__init__(index, forward_state)
+		self._alternative_states = ()
+		self._typed_alternatives = {}
+		self._untyped_alternatives = ()
+		self._dispatch_cache = {}
+
+	def __getstate__(self):
+		"""
+		:return: The picklable state of the state (the dispatch cache is rebuilt on demand)
+		:rtype : dict
+		"""
+		state = _slots_state(self)
+		state["_dispatch_cache"] = {}
+		return state
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "EitherState({}, alternatives={})".format(self._index, len(self._alternative_states))
+
+	def set_alternatives(self, alternative_states, first_types):
+		"""
+		:param alternative_states: The first state of every alternative, ordered by preference
+		:type  alternative_states: list of MachineState
+		:param first_types: The types the first object consumed by every alternative is required to be an instance of (one of),
+		                    None for alternatives that may start with any object
+		:type  first_types: list of set of type
+		"""
+		self._alternative_states = tuple(alternative_states)
+		self._typed_alternatives = {}
+		untyped_alternatives = []
+
+		for alternative_index, alternative_types in enumerate(first_types):
+			if alternative_types is None:
+				untyped_alternatives.append(alternative_index)
+				continue
+
+			for required_type in alternative_types:
+				self._typed_alternatives.setdefault(required_type, []).append(alternative_index)
+
+		self._untyped_alternatives = tuple(untyped_alternatives)
+		self._dispatch_cache = {}
+
+	def _copy_fields(self, state):
+		"""
+		:param state: A state of the same type, taking the fields of this one
+		:type  state: MachineState
+		"""
+		super(EitherState, self)._copy_fields(state)
+		state._alternative_states = self._alternative_states
+		state._typed_alternatives = self._typed_alternatives
+		state._untyped_alternatives = self._untyped_alternatives
+		state._dispatch_cache = {}
+
+	def relink(self, states):
+		"""
+		Link the state to the states of the same indexes in another graph (of copies of the linked states)
+		:param states: The states of the other graph, by index
+		:type  states: list of MachineState
+		"""
+		super(EitherState, self).relink(states)
+		self._alternative_states = tuple(states[alternative_state._index] for alternative_state in self._alternative_states)
+
+	def get_alternative_states(self):
+		"""
+		:return: The first state of every alternative, ordered by preference
+		:rtype : tuple of MachineState
+		"""
+		return self._alternative_states
+
+	def get_first_types(self):
+		"""
+		:return: The types the first object consumed by every alternative is required to be an instance of (one of),
+		         None for alternatives that may start with any object (see set_alternatives)
+		:rtype : list of set of type
+		"""
+		first_types = [None if index in self._untyped_alternatives else set() for index in range(len(self._alternative_states))]
+		for required_type, alternative_indexes in self._typed_alternatives.items():
+			for alternative_index in alternative_indexes:
+				first_types[alternative_index].add(required_type)
+
+		return first_types
+
+	def candidate_alternatives(self, obj):
+		"""
+		:param obj: The object to be evaluated
+		:type  obj: any
+		:return: The indexes of the alternatives that may accept the object, ordered by preference
+		:rtype : tuple of int
+		"""
+		obj_type = type(obj)
+		obj_class = obj.__class__
+		# Objects claiming another type by their __class__ (mocks, proxies) are dispatched like isinstance, without caching
+		candidates = self._dispatch_cache.get(obj_type) if obj_class is obj_type else None
+		if candidates is None:
+			indexes = set(self._untyped_alternatives)
+			for required_type, alternative_indexes in self._typed_alternatives.items():
+				if issubclass(obj_type, required_type) or issubclass(obj_class, required_type):
+					indexes.update(alternative_indexes)
+
+			candidates = tuple(sorted(indexes))
+			if obj_class is obj_type:
+				self._dispatch_cache[obj_type] = candidates
+
+		return candidates
+
+	def transitions(self, counters, obj, variables_frame):
+		"""
+		Get all the possible next states, ordered by preference
+		:param counters: The range repetition counters of the evaluated branch
+		:type  counters: tuple of int
+		:param obj: The object to be evaluated
+		:type  obj: any
+		:param variables_frame: The variables frame of the evaluated branch
+		:type  variables_frame: VariablesFrame
+		:return: The next states with their counters and wether the object was consumed
+		:rtype : list of tuple of (MachineState, tuple of int, bool)
+		"""
+		return [(self._alternative_states[index], counters, False) for index in self.candidate_alternatives(obj)]
+
+	def epsilon_transitions(self, counters):
+		"""
+		Get all the possible next states, for any evaluated object
+		:param counters: The range repetition counters of the evaluated thread
+		:type  counters: tuple of int
+		:return: The next states with their counters and wether the object was consumed
+		:rtype : list of tuple of (MachineState, tuple of int, bool)
+		"""
+		return [(alternative_state, counters, False) for alternative_state in self._alternative_states]
+
+
+class _StateReference(object):
+	"""
+	A pickled reference to a state of a StateGraph, by its index
+	"""
+	__slots__ = ("index", )
+
+	def __init__(self, index):
+		"""
+		:param index: The index of the referenced state
+		:type  index: int
+		"""
+		self.index = index
+
+	@staticmethod
+	def wrap(value):
+		"""
+		:param value: An attribute value of a pickled state
+		:type  value: any
+		:return: A reference to the value if it is a state (or a tuple of states), otherwise the value itself
+		:rtype : any
+		"""
+		if isinstance(value, tuple) and 0 != len(value) and all(isinstance(sub, MachineState) for sub in value):
+			return tuple(_StateReference(sub.get_index()) for sub in value)
+
+		return _StateReference(value.get_index()) if isinstance(value, MachineState) else value
+
+
+class StateGraph(object):
+	"""
+	A static graph of machine states, compiled once from the regex descriptions
+	(None is used to represent the final state)
+	"""
+	def __init__(self, regex_descriptions=None, share_actions=False, diagnostics=True):
+		"""
+		:param regex_descriptions: The description of all the machine regex elements
+		:type  regex_descriptions: list of RegexDescription
+		:note  regex_descriptions: None for an empty graph, filled using add_root
+		:param share_actions: Wether structurally identical actions should be merged into a single instance
+		:type  share_actions: bool
+		:param diagnostics: Wether the graph actions should record failure reasons
+		:type  diagnostics: bool
+		"""
+		self._diagnostics = diagnostics
+		self._states = []
+		self._start_threads = []
+		self._initial_counters = []
+		self._counting = False
+		self._shared_actions = {} if share_actions else None
+
+		if regex_descriptions is not None:
+			self.add_root(regex_descriptions)
+
+	def __getstate__(self):
+		"""
+		The states are pickled as a flat list, referencing each other by index
+		(pickling the linked states as is recurses once per state, failing on large graphs)
+		:return: The picklable state of the graph
+		:rtype : dict
+		"""
+		state = self.__dict__.copy()
+		state["_states"] = [
+			(type(machine_state), dict((name, _StateReference.wrap(value)) for name, value in machine_state.__getstate__().items()))
+			for machine_state in self._states
+		]
+		state["_start_threads"] = [(_StateReference.wrap(start_state), counters, tag) for start_state, counters, tag in self._start_threads]
+		return state
+
+	def __setstate__(self, state):
+		"""
+		:param state: A state returned by __getstate__
+		:type  state: dict
+		"""
+		flat_states = state.pop("_states")
+		self.__dict__.update(state)
+
+		self._states = [state_type.__new__(state_type) for state_type, _ in flat_states]
+		for machine_state, (_, machine_state_dict) in zip(self._states, flat_states):
+			machine_state.__setstate__(dict((name, self._resolve(value)) for name, value in machine_state_dict.items()))
+
+		self._start_threads = [(self._resolve(start_state), counters, tag) for start_state, counters, tag in self._start_threads]
+
+	def _resolve(self, value):
+		"""
+		:param value: A pickled attribute value
+		:type  value: any
+		:return: The referenced state if value is a state reference (or a tuple of them), otherwise the value itself
+		:rtype : any
+		"""
+		if isinstance(value, tuple) and 0 != len(value) and all(isinstance(sub, _StateReference) for sub in value):
+			return tuple(self._states[sub.index] for sub in value)
+
+		return self._states[value.index] if isinstance(value, _StateReference) else value
+
+	def to_table(self):
+		"""
+		Flatten the graph into integers, for the binary machine format (see Evaluation.dump)
+		Every state takes STATE_TABLE_FIELDS fields - its forward state, enclosing state, entry bounds and kind,
+		followed by the fields of its kind - referencing states by index and other objects by their index in the returned state
+		(None references and unbounded counts are -1). The alternative states of the either states follow the states
+		:return: The table, with a picklable state of the rest of the graph
+		:rtype : tuple of (list of int, dict)
+		"""
+		objects = []
+		object_indexes = {}
+
+		def object_index(obj):
+			index = object_indexes.get(id(obj))
+			if index is None:
+				index = object_indexes[id(obj)] = len(objects)
+				objects.append(obj)
+
+			return index
+
+		def reference(machine_state):
+			return -1 if machine_state is None else machine_state.get_index()
+
+		def count(value):
+			return -1 if value is None else value
+
+		table = []
+		alternatives = []
+		for machine_state in self._states:
+			entry_min, entry_max = machine_state.get_entry_bounds()
+			fields = [reference(machine_state.get_forward_state()), reference(machine_state.get_enclosing_state()), entry_min, count(entry_max)]
+
+			if isinstance(machine_state, ActionState):
+				fields += [STATE_KIND_ACTION, object_index(machine_state.get_action())]
+			elif isinstance(machine_state, RangeState):
+				(repetition_min, repetition_max), (exit_min, exit_max) = machine_state._repetition_bounds, machine_state._exit_bounds
+				fields += [
+					STATE_KIND_RANGE, machine_state._slot, machine_state._min_count, count(machine_state._max_count),
+					reference(machine_state.get_inner_state()), int(machine_state.is_counting()), RANGE_MODES.index(machine_state._mode),
+					repetition_min, count(repetition_max), exit_min, count(exit_max)
+				]
+			else:
+				alternative_states = machine_state.get_alternative_states()
+				fields += [STATE_KIND_EITHER, len(alternatives), len(alternative_states), object_index(machine_state.get_first_types())]
+				alternatives.extend(map(reference, alternative_states))
+
+			table.extend(fields)
+			table.extend([0] * (STATE_TABLE_FIELDS - len(fields)))
+
+		state = self.__dict__.copy()
+		del state["_states"]
+		state["states_count"] = len(self._states)
+		state["_start_threads"] = [(reference(start_state), counters, tag) for start_state, counters, tag in self._start_threads]
+		state["objects"] = objects
+		return table + alternatives, state
+
+	@staticmethod
+	def from_table(table, state):
+		"""
+		:param table: A table returned by to_table
+		:type  table: sequence of int
+		:param state: The state returned with the table
+		:type  state: dict
+		:return: The flattened graph
+		:rtype : StateGraph
+		"""
+		state = dict(state)
+		objects = state.pop("objects")
+		states_count = state.pop("states_count")
+		start_threads = state.pop("_start_threads")
+		alternatives_offset = states_count * STATE_TABLE_FIELDS
+
+		graph = StateGraph.__new__(StateGraph)
+		graph.__dict__.update(state)
+		graph._states = []
+
+		def count(value):
+			return None if -1 == value else value
+
+		# The states are created first, then linked to each other
+		rows = [table[index * STATE_TABLE_FIELDS:(index + 1) * STATE_TABLE_FIELDS] for index in range(states_count)]
+		for index, row in enumerate(rows):
+			kind = row[4]
+			if kind == STATE_KIND_ACTION:
+				graph._states.append(ActionState(index, objects[row[5]], diagnostics=graph._diagnostics))
+			elif kind == STATE_KIND_RANGE:
+				graph._states.append(RangeState(index, row[5], row[6], count(row[7]), counting=bool(row[9]), mode=RANGE_MODES[row[10]]))
+			elif kind == STATE_KIND_EITHER:
+				graph._states.append(EitherState(index))
+			else:
+				raise ValueError("Unknown state kind {} in a machine table".format(kind))
+
+		def resolve(index):
+			return None if -1 == index else graph._states[index]
+
+		for machine_state, row in zip(graph._states, rows):
+			machine_state.set_forward_state(resolve(row[0]))
+			machine_state.set_entry_bounds(resolve(row[1]), (row[2], count(row[3])))
+
+			if row[4] == STATE_KIND_RANGE:
+				machine_state.set_inner_state(resolve(row[8]))
+				machine_state.set_repetition_bounds((row[11], count(row[12])), (row[13], count(row[14])))
+			elif row[4] == STATE_KIND_EITHER:
+				alternatives = table[alternatives_offset + row[5]:alternatives_offset + row[5] + row[6]]
+				machine_state.set_alternatives([resolve(index) for index in alternatives], objects[row[7]])
+
+		graph._start_threads = [(resolve(start_state), counters, tag) for start_state, counters, tag in start_threads]
+		return graph
+
+	def add_root(self, regex_descriptions, tag=None):
+		"""
+		Build an additional, independent sequence of states, starting its own evaluation threads
+		:param regex_descriptions: The description of the sequence regex elements
+		:type  regex_descriptions: list of RegexDescription
+		:param tag: The tag of the threads started from the built sequence
+		:type  tag: any
+		"""
+		# Every root keeps its own counters, so threads of different roots never share slots
+		self._initial_counters = []
+		start_state = self._build_states(regex_descriptions, None, None)
+		self._start_threads.append((start_state, tuple(self._initial_counters), tag))
+
+	def copy(self):
+		"""
+		:return: A graph of copies of the states, sharing their actions (and extended without changing this one)
+		:rtype : StateGraph
+		"""
+		graph = StateGraph.__new__(StateGraph)
+		graph.__dict__.update(self.__dict__)
+		graph._states = [state.copy() for state in self._states]
+		for state in graph._states:
+			state.relink(graph._states)
+
+		graph._start_threads = [
+			(None if start_state is None else graph._states[start_state.get_index()], counters, tag)
+			for start_state, counters, tag in self._start_threads
+		]
+		graph._initial_counters = list(self._initial_counters)
+		if self._shared_actions is not None:
+			graph._shared_actions = dict(self._shared_actions)
+
+		return graph
+
+	def extend(self, regex_descriptions):
+		"""
+		Append regex elements to the sequence of the only root, building states only for them
+		(the final transitions of the existing states lead to the appended states instead,
+		and the bounds they count up to the final state grow by those of the appended elements)
+		:param regex_descriptions: The appended regex elements
+		:type  regex_descriptions: list of RegexDescription
+		:raise ValueError: If the graph has more than a single root
+		"""
+		if 1 != len(self._start_threads):
+			raise ValueError("Only graphs of a single root can be extended")
+
+		start_state, counters, tag = self._start_threads[0]
+		built_states_count = len(self._states)
+		counting = self._counting
+
+		# The appended ranges share the counter slots of the existing ones, adding the deeper ones
+		self._initial_counters = list(counters)
+		try:
+			appended_state = self._build_states(regex_descriptions, None, None)
+		except Exception:
+			del self._states[built_states_count:]
+			self._counting = counting
+			raise
+
+		if appended_state is not None:
+			appended_bounds = appended_state.get_entry_bounds()
+			for state in itertools.islice(self._states, built_states_count):
+				state.link_final_state(appended_state, appended_bounds)
+
+			if start_state is None:
+				start_state = appended_state
+
+		self._start_threads[0] = (start_state, tuple(self._initial_counters), tag)
+
+	def _build_states(self, regex_descriptions, forward_state, enclosing_state):
+		"""
+		:param regex_descriptions: A sequence of regex elements
+		:type  regex_descriptions: list of RegexDescription
+		:param forward_state: The state following the sequence
+		:type  forward_state: MachineState
+		:param enclosing_state: The innermost range state repeating the sequence, None for the root sequence
+		:type  enclosing_state: RangeState
+		:return: The first state of the built sequence
+		:rtype : MachineState
+		"""
+		state = forward_state
+		for description in reversed(regex_descriptions):
+			state = self._build_state(description, state, enclosing_state)
+
+		return state
+
+	def _build_state(self, regex_description, forward_state, enclosing_state):
+		"""
+		:param regex_description: The description of the built state
+		:type  regex_description: RegexDescription
+		:param forward_state: The state following the built one
+		:type  forward_state: MachineState
+		:param enclosing_state: The innermost range state repeating the built state, None if it isn't repeated
+		:type  enclosing_state: RangeState
+		:return: The entry state of the given description
+		:rtype : MachineState
+		"""
+		forward_bounds = (0, 0) if forward_state is None or forward_state is enclosing_state else forward_state.get_entry_bounds()
+
+		if isinstance(regex_description, EvaluationAction):
+			if self._shared_actions is not None:
+				regex_description = self._shared_action(regex_description)
+
+			state = ActionState(len(self._states), regex_description, forward_state, self._diagnostics)
+			consumed = 1 if regex_description.is_consuming() else 0
+			state.set_entry_bounds(enclosing_state, (consumed + forward_bounds[0], None if forward_bounds[1] is None else consumed + forward_bounds[1]))
+			self._states.append(state)
+			return state
+
+		if isinstance(regex_description, Range):
+			# Only the enclosing ranges of a branch hold counts, so a range takes the slot of its nesting depth
+			# (the counters grow with the nesting of the ranges, not with their amount)
+			slot = 0 if enclosing_state is None else enclosing_state._slot + 1
+			state = RangeState(
+				len(self._states), slot,
+				regex_description._min_count, regex_description._max_count,
+				forward_state=forward_state, counting=self._is_counting_range(regex_description), mode=regex_description._mode
+			)
+			self._states.append(state)
+			if slot == len(self._initial_counters):
+				self._initial_counters.append(0)
+			self._counting = self._counting or state.is_counting()
+
+			state.set_inner_state(self._build_states(regex_description.get_sub_elements(), state, state))
+
+			repetition_min, repetition_max = state.get_inner_state().get_entry_bounds()
+			state.set_repetition_bounds((repetition_min, repetition_max), forward_bounds)
+
+			if 0 == repetition_max or 0 == regex_description._max_count:
+				entry_max = forward_bounds[1]
+			elif repetition_max is None or regex_description._max_count is None or forward_bounds[1] is None:
+				entry_max = None
+			else:
+				entry_max = regex_description._max_count * repetition_max + forward_bounds[1]
+
+			state.set_entry_bounds(enclosing_state, (regex_description._min_count * repetition_min + forward_bounds[0], entry_max))
+			return state
+
+		if isinstance(regex_description, Either):
+			state = EitherState(len(self._states), forward_state)
+			self._states.append(state)
+
+			alternatives = regex_description.get_alternatives()
+			alternative_states = [self._build_states(alternative, forward_state, enclosing_state) for alternative in alternatives]
+			state.set_alternatives(alternative_states, [_first_types(alternative) for alternative in alternatives])
+
+			# Every alternative is built towards the either forward state, its entry bounds already include the rest
+			alternative_bounds = [alternative_state.get_entry_bounds() for alternative_state in alternative_states]
+			entry_max = None if any(bounds[1] is None for bounds in alternative_bounds) else max(bounds[1] for bounds in alternative_bounds)
+			state.set_entry_bounds(enclosing_state, (min(bounds[0] for bounds in alternative_bounds), entry_max))
+			return state
+
+		raise TypeError("node builder needs to get a regex description")
+
+	@staticmethod
+	def _is_counting_range(regex_description):
+		"""
+		:param regex_description: A range description
+		:type  regex_description: Range
+		:return: Wether the range repetitions should be tracked as a counting set
+		:rtype : bool
+		"""
+		sub_elements = regex_description.get_sub_elements()
+		if 1 != len(sub_elements) or not isinstance(sub_elements[0], EvaluationAction) or not sub_elements[0].is_consuming():
+			return False
+
+		# A possessive range branch never holds more than a single count
+		if regex_description._mode == RANGE_POSSESSIVE:
+			return False
+
+		largest_count = regex_description._min_count if regex_description._max_count is None else regex_description._max_count
+		return largest_count >= COUNTING_MIN_BOUND
+
+	def _shared_action(self, action):
+		"""
+		:param action: An action of a built state
+		:type  action: EvaluationAction
+		:return: The first built action structurally identical to the given one
+		:rtype : EvaluationAction
+		"""
+		# Subclasses may evaluate objects using state their structure key doesn't include
+		if not _is_structural((action, )):
+			return action
+
+		key = action.structure_key()
+		try:
+			return self._shared_actions.setdefault(key, action)
+		except TypeError:
+			# Unhashable attribute values, can't be compared structurally
+			return action
+
+	def get_start_state(self):
+		"""
+		:return: The state every evaluation of the first root starts from
+		:rtype : MachineState
+		"""
+		return self._start_threads[0][0]
+
+	def get_start_threads(self):
+		"""
+		:return: The initial thread of every root
+		:rtype : list of tuple of (MachineState, tuple of int, any)
+		"""
+		return list(self._start_threads)
+
+	def get_states(self):
+		"""
+		:return: All the graph states, ordered by their index
+		:rtype : list of MachineState
+		"""
+		return self._states
+
+	def initial_counters(self):
+		"""
+		:return: The range repetition counters of a fresh branch of the first root
+		:rtype : tuple of int
+		"""
+		return self._start_threads[0][1]
+
+	def to_dot(self, stats=None):
+		"""
+		:param stats: Evaluation stats annotating the states with their evaluation counts, None for no annotations
+		:type  stats: EvaluationStats
+		:return: The graph in the Graphviz DOT format
+		:rtype : str
+		"""
+		state_counts = {} if stats is None else stats.get_state_counts()
+		predicate_times = {} if stats is None else stats.get_predicate_times()
+
+		def node(state):
+			return "final" if state is None else "s{}".format(state.get_index())
+
+		def quote(*text_lines):
+			return '"{}"'.format("\\n".join(line.replace("\\", "\\\\").replace('"', '\\"') for line in text_lines))
+
+		lines = ["digraph regcheck {", "\trankdir=LR;", '\tfinal [shape=doublecircle, label="final"];']
+		for root_index, (start_state, _, tag) in enumerate(self._start_threads):
+			lines.append("\tstart{} [shape=point];".format(root_index))
+			lines.append("\tstart{} -> {}{};".format(root_index, node(start_state), "" if tag is None else " [label={}]".format(quote(str(tag)))))
+
+		for state in self._states:
+			if isinstance(state, ActionState):
+				label, shape = [repr(state.get_action())], "box"
+				edges = [(state.get_forward_state(), None)]
+			elif isinstance(state, RangeState):
+				label, shape = [repr(state)], "diamond"
+				edges = [(state.get_inner_state(), "repeat"), (state.get_forward_state(), "leave")]
+			else:
+				label, shape = [repr(state)], "diamond"
+				edges = [(alternative_state, str(index)) for index, alternative_state in enumerate(state.get_alternative_states())]
+
+			if state.get_index() in state_counts:
+				label.append("hits: {}".format(state_counts[state.get_index()]))
+			if state.get_index() in predicate_times:
+				label.append("time: {:.6f}s".format(predicate_times[state.get_index()]))
+
+			lines.append("\t{} [shape={}, label={}];".format(node(state), shape, quote(*label)))
+			for next_state, edge_label in edges:
+				lines.append("\t{} -> {}{};".format(node(state), node(next_state), "" if edge_label is None else " [label={}]".format(quote(edge_label))))
+
+		lines.append("}")
+		return "\n".join(lines)
+
+	def is_consuming_only(self):
+		"""
+		:return: Wether every action state of the graph consumes the object it evaluates
+		:rtype : bool
+		"""
+		return all(state.is_consuming() for state in self._states if isinstance(state, ActionState))
+
+	def has_counting_ranges(self):
+		"""
+		:return: Wether some range of the graph tracks its repetitions as a counting set (see RangeState.is_counting)
+		:rtype : bool
+		"""
+		return self._counting
+
+	def is_deterministic_closure(self):
+		"""
+		:return: Wether the graph can be walked by a DFA - its actions all consume their objects,
+		         and its range transitions don't depend on the next object (possessive ranges)
+		:rtype : bool
+		"""
+		return self.is_consuming_only() and not any(isinstance(state, RangeState) and state.is_possessive() for state in self._states)
+
+	def epsilon_closure(self, threads):
+		"""
+		Follow all the range transitions of the given threads, without evaluating any object
+		:param threads: The threads to expand
+		:type  threads: iterable of tuple of (MachineState, tuple of int, any)
+		:note  threads: Only valid for graphs whose action states are all consuming
+		:return: The reached action threads, with the tags of the threads that reached the final state
+		:rtype : tuple of (list, frozenset)
+		"""
+		action_threads = []
+		matched_tags = set()
+		seen = set()
+
+		# Expanded in preference order like advance, so the action threads are ordered as a simulation evaluates them
+		stack = list(reversed(list(threads)))
+		while 0 != len(stack):
+			state, counters, tag = stack.pop()
+
+			if state is None:
+				matched_tags.add(tag)
+				continue
+
+			if (state, counters) in seen: continue
+			seen.add((state, counters))
+
+			if isinstance(state, ActionState):
+				action_threads.append((state, counters, tag))
+			else:
+				stack.extend(reversed([(next_state, next_counters, tag) for next_state, next_counters, _ in state.epsilon_transitions(counters)]))
+
+		return action_threads, frozenset(matched_tags)
+
+	def advance(self, threads, obj, variables_frame, at_end=False, stop_on_match=False, context=None):
+		"""
+		Advance a set of live threads by a single object
+		(follows every non-consuming transition, deduplicating identical state/counters pairs)
+		:param threads: The live threads, ordered by preference
+		:type  threads: list of tuple of (MachineState, tuple of int, any)
+		:note  threads: The last element of every thread is an opaque tag, carried over to its successors
+		:param obj: The evaluated object
+		:type  obj: any
+		:param variables_frame: The variables frame shared by all threads
+		:type  variables_frame: VariablesFrame
+		:param at_end: Wether the sequence ended (no object left to consume)
+		:type  at_end: bool
+		:param stop_on_match: Wether to drop all the threads less preferred than the first one to match
+		:type  stop_on_match: bool
+		:param context: A traced evaluation recording the evaluated states (at its max_index), None for no tracing
+		:type  context: EvaluationContext
+		:return: The threads left after consuming the object, with the tags of the threads that matched before it
+		:rtype : tuple of (list, list)
+		"""
+		next_threads = []
+		matched_tags = []
+		seen = set()
+		next_seen = set()
+
+		# Non-action states peek at the object about to be consumed, if any
+		next_object = G_END_OF_SEQUENCE if at_end else obj
+
+		stack = list(reversed(threads))
+		while 0 != len(stack):
+			state, counters, tag = stack.pop()
+
+			if state is None:
+				matched_tags.append(tag)
+				if stop_on_match: break
+				continue
+
+			key = (state, counters)
+			if key in seen: continue
+			seen.add(key)
+
+			if at_end and state.is_consuming(): continue
+
+			if context is None:
+				transitions = state.transitions(counters, obj if isinstance(state, ActionState) else next_object, variables_frame)
+			else:
+				transitions = self._traced_transitions(context, state, counters, obj if isinstance(state, ActionState) else next_object, variables_frame)
+
+			epsilon_threads = []
+			for next_state, next_counters, consumed in transitions:
+				if not consumed:
+					epsilon_threads.append((next_state, next_counters, tag))
+				elif (next_state, next_counters) not in next_seen:
+					next_seen.add((next_state, next_counters))
+					next_threads.append((next_state, next_counters, tag))
+
+			stack.extend(reversed(epsilon_threads))
+
+		if self._counting:
+			next_threads = _merge_counting_threads(next_threads)
+
+		return next_threads, matched_tags
+
+	@staticmethod
+	def _traced_transitions(context, state, counters, obj, variables_frame):
+		"""
+		Get the transitions of a state, recording its evaluation in the given traced evaluation
+		:return: The next states with their counters and wether the object was consumed
+		:rtype : list of tuple of (MachineState, tuple, bool)
+		"""
+		context.visit(state, context.max_index, counters)
+		if context.stats is None:
+			return state.transitions(counters, obj, variables_frame)
+
+		started = time.perf_counter()
+		transitions = state.transitions(counters, obj, variables_frame)
+		if isinstance(state, ActionState):
+			context.stats.record_predicate_time(state, time.perf_counter() - started)
+
+		context.stats.record_branches(state, len(transitions))
+		return transitions
+
+
+class DFAState(object):
+	"""
+	A lazily built deterministic state, standing for a set of graph threads
+	"""
+	__slots__ = ("_threads", "_action_threads", "_matched_tags", "_actions", "_predicates", "_thread_action_indexes", "_transitions", "_action_types", "_candidate_actions")
+
+	def __init__(self, graph, threads):
+		"""
+		:param graph: The graph the threads belong to
+		:type  graph: StateGraph
+		:param threads: The (state, counters, tag) threads represented by this state
+		:type  threads: frozenset of tuple of (MachineState, tuple of int, any)
+		"""
+		self._threads = threads
+		self._action_threads, self._matched_tags = graph.epsilon_closure(threads)
+
+		# Every distinct action is evaluated once per object, its outcome shared by all the threads waiting on it
+		actions = []
+		action_indexes = {}
+		action_states = {}
+		for state, _, _ in self._action_threads:
+			if id(state.get_action()) not in action_indexes:
+				action_indexes[id(state.get_action())] = len(actions)
+				action_states[id(state.get_action())] = state
+				actions.append(state.get_action())
+
+		self._actions = tuple(actions)
+		self._predicates = tuple(action_states[id(action)].get_predicate() for action in actions)
+		self._thread_action_indexes = tuple(action_indexes[id(state.get_action())] for state, _, _ in self._action_threads)
+		self._transitions = {}
+
+		# Type checks are skipped for objects whose type doesn't have the checked type in its MRO
+		self._action_types = tuple(_dispatch_type(action) for action in actions)
+		self._candidate_actions = {}
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "DFAState(threads={}, accepting={})".format(len(self._threads), self.is_accepting())
+
+	def get_threads(self):
+		"""
+		:return: The (state, counters, tag) threads represented by this state
+		:rtype : frozenset of tuple of (MachineState, tuple of int, any)
+		"""
+		return self._threads
+
+	def get_action_threads(self):
+		"""
+		:return: The threads of this state standing on action states, after following all the range transitions
+		:rtype : list of tuple of (ActionState, tuple of int, any)
+		"""
+		return self._action_threads
+
+	def is_accepting(self):
+		"""
+		:return: Wether the sequence may end in this state
+		:rtype : bool
+		"""
+		return 0 != len(self._matched_tags)
+
+	def get_matched_tags(self):
+		"""
+		:return: The tags of the threads satisfied if the sequence ends in this state
+		:rtype : frozenset
+		"""
+		return self._matched_tags
+
+	def is_dead(self):
+		"""
+		:return: Wether no object can be consumed from this state
+		:rtype : bool
+		"""
+		return 0 == len(self._action_threads)
+
+	def evaluate(self, obj, variables_frame, dispatch=True):
+		"""
+		:param obj: The object to be evaluated
+		:type  obj: any
+		:param variables_frame: The frame passed to the evaluated actions
+		:type  variables_frame: VariablesFrame
+		:param dispatch: Wether type checks the object type can't satisfy are skipped (as failed)
+		:type  dispatch: bool
+		:return: The outcome of every distinct action of this state on the given object
+		:rtype : tuple of bool
+		"""
+		obj_type = type(obj)
+		obj_class = obj.__class__
+		if not dispatch:
+			candidates = range(len(self._predicates))
+		else:
+			# Objects claiming another type by their __class__ (mocks, proxies) are dispatched like isinstance, without caching
+			candidates = self._candidate_actions.get(obj_type) if obj_class is obj_type else None
+
+		if candidates is None:
+			candidates = tuple(
+				index for index, action_type in enumerate(self._action_types)
+				if action_type is None or issubclass(obj_type, action_type) or issubclass(obj_class, action_type)
+			)
+			if obj_class is obj_type:
+				self._candidate_actions[obj_type] = candidates
+
+		if len(candidates) == len(self._predicates):
+			return tuple(bool(predicate(obj, variables_frame)) for predicate in self._predicates)
+
+		outcomes = [False] * len(self._predicates)
+		for index in candidates:
+			outcomes[index] = bool(self._predicates[index](obj, variables_frame))
+
+		return tuple(outcomes)
+
+	def record_failure(self, obj, variables_frame):
+		"""
+		Record the failure reason of the last thread whose action fails on the object, like evaluating the threads one
+		by one would (the type checks skipped by the dispatch are evaluated as well)
+		:param obj: The evaluated object
+		:type  obj: any
+		:param variables_frame: The frame passed to the evaluated actions
+		:type  variables_frame: VariablesFrame
+		"""
+		for action_index in reversed(self._thread_action_indexes):
+			if not self._predicates[action_index](obj, variables_frame):
+				return
+
+	def get_transition(self, outcomes):
+		"""
+		:param outcomes: The actions outcomes of an evaluated object
+		:type  outcomes: tuple of bool
+		:return: The cached next state for the given outcomes, None if not built yet
+		:rtype : DFAState
+		"""
+		return self._transitions.get(outcomes)
+
+	def set_transition(self, outcomes, next_state):
+		"""
+		:param outcomes: The actions outcomes of an evaluated object
+		:type  outcomes: tuple of bool
+		:param next_state: The state reached on the given outcomes
+		:type  next_state: DFAState
+		"""
+		self._transitions[outcomes] = next_state
+
+	def next_threads(self, outcomes):
+		"""
+		:param outcomes: The actions outcomes of an evaluated object
+		:type  outcomes: tuple of bool
+		:return: The threads left after consuming an object with the given outcomes
+		:rtype : frozenset of tuple of (MachineState, tuple of int, any)
+		"""
+		return frozenset(_merge_counting_threads(
+			(state.get_forward_state(), counters, tag)
+			for (state, counters, tag), action_index in zip(self._action_threads, self._thread_action_indexes)
+			if outcomes[action_index]
+		))
+
+
+class LazyDFA(object):
+	"""
+	A deterministic automaton built on demand from a state graph
+	(only valid for graphs whose actions all consume their objects and use no variables)
+	"""
+	def __init__(self, graph, max_states=DFA_MAX_STATES):
+		"""
+		:param graph: The graph simulated by the automaton
+		:type  graph: StateGraph
+		:param max_states: The maximal amount of cached states, before the cache is evicted
+		:type  max_states: int
+		"""
+		self._graph = graph
+		self._max_states = max_states
+		self._evictions = 0
+
+		# Guards building new states, which may happen from multiple evaluating threads
+		self._lock = threading.Lock()
+		self._reset()
+
+	def __getstate__(self):
+		"""
+		:return: The picklable state of the automaton (the cached states are dropped, rebuilt on demand)
+		:rtype : dict
+		"""
+		return {"_graph": self._graph, "_max_states": self._max_states, "_evictions": self._evictions}
+
+	def __setstate__(self, state):
+		"""
+		:param state: A state returned by __getstate__
+		:type  state: dict
+		"""
+		self.__dict__.update(state)
+		self._lock = threading.Lock()
+		self._reset()
+
+	def _reset(self):
+		"""
+		Drop all the cached states
+		"""
+		self._states = {}
+		self._start_state = self._get_state(frozenset(self._graph.get_start_threads()))
+
+	def _get_state(self, threads):
+		"""
+		:param threads: The (state, counters, tag) threads of the requested state
+		:type  threads: frozenset of tuple of (MachineState, tuple of int, any)
+		:return: The cached state representing the given threads
+		:rtype : DFAState
+		"""
+		dfa_state = self._states.get(threads)
+		if dfa_state is None:
+			dfa_state = DFAState(self._graph, threads)
+			self._states[threads] = dfa_state
+
+		return dfa_state
+
+	def get_start_state(self):
+		"""
+		:return: The state every evaluation starts from
+		:rtype : DFAState
+		"""
+		return self._start_state
+
+	def get_evictions(self):
+		"""
+		:return: The amount of times the cache grew past its bound and was dropped
+		:rtype : int
+		"""
+		return self._evictions
+
+	def get_states_count(self):
+		"""
+		:return: The amount of currently cached states
+		:rtype : int
+		"""
+		return len(self._states)
+
+	def advance(self, dfa_state, obj, variables_frame):
+		"""
+		:param dfa_state: The current state
+		:type  dfa_state: DFAState
+		:param obj: The object to be consumed
+		:type  obj: any
+		:param variables_frame: The frame passed to the evaluated actions
+		:type  variables_frame: VariablesFrame
+		:return: The next state, None if the cache blew up (the caller should keep on simulating the graph)
+		:rtype : DFAState
+		"""
+		return self.transition(dfa_state, dfa_state.evaluate(obj, variables_frame))
+
+	def transition(self, dfa_state, outcomes):
+		"""
+		:param dfa_state: The current state
+		:type  dfa_state: DFAState
+		:param outcomes: The actions outcomes of the consumed object (see DFAState.evaluate)
+		:type  outcomes: tuple of bool
+		:return: The next state, None if the cache blew up (the caller should keep on simulating the graph)
+		:rtype : DFAState
+		"""
+		next_state = dfa_state.get_transition(outcomes)
+		if next_state is not None:
+			return next_state
+
+		next_threads = dfa_state.next_threads(outcomes)
+		with self._lock:
+			if next_threads not in self._states and len(self._states) >= self._max_states:
+				self._evictions += 1
+				self._reset()
+				return None
+
+			next_state = self._get_state(next_threads)
+			dfa_state.set_transition(outcomes, next_state)
+
+		return next_state
+
+
+def _chunked(iterable, chunksize):
+	"""
+	:param iterable: The items to split
+	:type  iterable: iterable
+	:param chunksize: The maximal amount of items in a chunk
+	:type  chunksize: int
+	:return: The items, in consecutive lists of chunksize items (the last one may be shorter)
+	:rtype : iterator of list
+	"""
+	iterator = iter(iterable)
+	while True:
+		chunk = list(itertools.islice(iterator, chunksize))
+		if 0 == len(chunk): return
+
+		yield chunk
+
+
+# The machine checking sequences in a worker process of EvaluationMachine.iter_check_many (loaded once per worker)
+G_WORKER_MACHINE = None
+
+
+def _load_worker_machine(machine_pickle):
+	"""
+	Initialize a worker process, loading the machine its tasks check sequences against
+	:param machine_pickle: The pickled machine
+	:type  machine_pickle: bytes
+	"""
+	global G_WORKER_MACHINE
+	G_WORKER_MACHINE = pickle.loads(machine_pickle)
+
+
+def _check_worker_chunk(indexed_sequences):
+	"""
+	:param indexed_sequences: Sequences of objects to check, with their index
+	:type  indexed_sequences: list of tuple of (int, sequencable)
+	:return: Wether each of the sequences satisfies the worker machine, with its index
+	:rtype : list of tuple of (int, bool)
+	"""
+	return G_WORKER_MACHINE._check_chunk(indexed_sequences)
+
+
+def _length_bounds(regex_descriptions):
+	"""
+	:param regex_descriptions: A sequence of regex elements
+	:type  regex_descriptions: list of RegexDescription
+	:return: The minimal and maximal amount of objects consumed by the elements (None for no maximum)
+	:rtype : tuple of (int, int)
+	"""
+	min_length, max_length = 0, 0
+	for description in regex_descriptions:
+		if isinstance(description, Range):
+			sub_min_length, sub_max_length = _length_bounds(description.get_sub_elements())
+			min_length += description._min_count * sub_min_length
+
+			if 0 == sub_max_length or 0 == description._max_count:
+				continue
+
+			if max_length is None or sub_max_length is None or description._max_count is None:
+				max_length = None
+			else:
+				max_length += description._max_count * sub_max_length
+
+		elif isinstance(description, Either):
+			alternative_bounds = [_length_bounds(alternative) for alternative in description.get_alternatives()]
+			min_length += min(bounds[0] for bounds in alternative_bounds)
+
+			if max_length is None or any(bounds[1] is None for bounds in alternative_bounds):
+				max_length = None
+			else:
+				max_length += max(bounds[1] for bounds in alternative_bounds)
+
+		elif description.is_consuming():
+			min_length += 1
+			max_length = None if max_length is None else max_length + 1
+
+	return min_length, max_length
+
+
+def _required_types(regex_descriptions, repeats, required_types):
+	"""
+	Count the objects of every type required by the mandatory type checks of the given elements
+	:param regex_descriptions: A sequence of regex elements
+	:type  regex_descriptions: list of RegexDescription
+	:param repeats: The minimal amount of times the elements are repeated
+	:type  repeats: int
+	:param required_types: The counted objects, by type (updated in place)
+	:type  required_types: dict
+	"""
+	for description in regex_descriptions:
+		if isinstance(description, Range):
+			if 0 != description._min_count:
+				_required_types(description.get_sub_elements(), repeats * description._min_count, required_types)
+
+		elif isinstance(description, Either):
+			# Only the types required by every alternative are required by the either
+			alternative_types = []
+			for alternative in description.get_alternatives():
+				alternative_types.append({})
+				_required_types(alternative, repeats, alternative_types[-1])
+
+			for required_type in set(alternative_types[0]).intersection(*alternative_types[1:]):
+				required_types[required_type] = required_types.get(required_type, 0) + min(types[required_type] for types in alternative_types)
+
+		elif isinstance(description, Check) and type(description).perform is Check.perform and \
+				description._type is not None and description.is_consuming():
+			required_types[description._type] = required_types.get(description._type, 0) + repeats
+
+
+class SequencePrefilter(object):
+	"""
+	Cheap necessary conditions of satisfying a pattern, computed once per machine
+	(sequences of an impossible length, or lacking objects of the types its mandatory checks require,
+	are rejected in a single pass without evaluating any branch)
+	"""
+	def __init__(self, regex_descriptions):
+		"""
+		:param regex_descriptions: The regex elements the sequences should satisfy
+		:type  regex_descriptions: list of RegexDescription
+		"""
+		self._min_length, self._max_length = _length_bounds(regex_descriptions)
+		self._required_types = {}
+		_required_types(regex_descriptions, 1, self._required_types)
+
+	def extend(self, regex_descriptions):
+		"""
+		:param regex_descriptions: Regex elements appended to the pattern
+		:type  regex_descriptions: list of RegexDescription
+		:return: The conditions of the pattern followed by the appended elements (this prefilter is left as is)
+		:rtype : SequencePrefilter
+		"""
+		prefilter = SequencePrefilter.__new__(SequencePrefilter)
+		prefilter._min_length, prefilter._max_length = _add_bounds((self._min_length, self._max_length), _length_bounds(regex_descriptions))
+		prefilter._required_types = dict(self._required_types)
+		_required_types(regex_descriptions, 1, prefilter._required_types)
+		return prefilter
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "SequencePrefilter(min_length={}, max_length={}, required_types={})".format(self._min_length, self._max_length, self._required_types)
+
+	def get_length_bounds(self):
+		"""
+		:return: The minimal and maximal length of a satisfying sequence (None for no maximum)
+		:rtype : tuple of (int, int)
+		"""
+		return self._min_length, self._max_length
+
+	def get_required_types(self):
+		"""
+		:return: The minimal amount of objects of every type, required in a satisfying sequence
+		:rtype : dict
+		"""
+		return dict(self._required_types)
+
+	def is_trivial(self):
+		"""
+		:return: Wether every sequence passes the filter
+		:rtype : bool
+		"""
+		return 0 == self._min_length and self._max_length is None and 0 == len(self._required_types)
+
+	def reject(self, sequence, consume_all=True):
+		"""
+		:param sequence: The sequence of objects to check
+		:type  sequence: sequencable
+		:param consume_all: Wether the whole sequence should satisfy the pattern (otherwise only a prefix of it)
+		:type  consume_all: bool
+		:return: The failure record of a sequence that can't satisfy the pattern, None if it may satisfy it
+		:rtype : tuple of (str, any, str, any, any)
+		:note  : Sequences without a length, or that can only be iterated once, are never rejected
+		"""
+		if not hasattr(sequence, "__len__") or iter(sequence) is sequence:
+			return None
+
+		length = len(sequence)
+		if length < self._min_length or (consume_all and self._max_length is not None and length > self._max_length):
+			return (FAILURE_SEQUENCE_LENGTH, self, None, (self._min_length, self._max_length), length)
+
+		if 0 == len(self._required_types):
+			return None
+
+		# isinstance also accepts objects by their __class__ (mocks and proxies), which may differ from their type
+		type_counts = collections.Counter((type(obj), obj.__class__) for obj in sequence)
+		for required_type, required_count in self._required_types.items():
+			count = sum(
+				type_count for (obj_type, obj_class), type_count in type_counts.items()
+				if issubclass(obj_type, required_type) or issubclass(obj_class, required_type)
+			)
+			if count < required_count:
+				return (FAILURE_MISSING_TYPE, self, required_type, required_count, count)
+
+		return None
+
+
+class EvaluationStats(object):
+	"""
+	The work done by evaluations, collected when passed to EvaluationMachine.check
+	(accumulates over all the evaluations it is passed to, should not be shared between concurrent evaluations)
+	"""
+	def __init__(self):
+		"""
+		"""
+		self.steps = 0
+		self.branches_pushed = 0
+		self.peak_branches = 0
+		self.frame_copies = 0
+		self.range_allocations = 0
+		self.predicate_time = 0.0
+		self._state_counts = collections.Counter()
+		self._state_predicate_times = collections.Counter()
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "EvaluationStats(steps={}, branches_pushed={}, peak_branches={}, frame_copies={}, range_allocations={}, predicate_time={:.6f})".format(
+			self.steps, self.branches_pushed, self.peak_branches, self.frame_copies, self.range_allocations, self.predicate_time
+		)
+
+	def record_visit(self, state):
+		"""
+		:param state: A graph state evaluated by a branch
+		:type  state: MachineState
+		"""
+		self._state_counts[state.get_index()] += 1
+
+	def record_branches(self, state, count):
+		"""
+		:param state: The graph state the branches were created from
+		:type  state: MachineState
+		:param count: The amount of created branches
+		:type  count: int
+		"""
+		self.branches_pushed += count
+		if isinstance(state, RangeState):
+			self.range_allocations += count
+
+	def record_predicate_time(self, state, elapsed):
+		"""
+		:param state: The action state whose predicate was called, None if unknown
+		:type  state: ActionState
+		:param elapsed: The seconds spent in the predicate
+		:type  elapsed: float
+		"""
+		self.predicate_time += elapsed
+		if state is not None:
+			self._state_predicate_times[state.get_index()] += elapsed
+
+	def get_state_counts(self):
+		"""
+		:return: The amount of times every graph state was evaluated, by state index
+		:rtype : dict of (int, int)
+		"""
+		return dict(self._state_counts)
+
+	def get_predicate_times(self):
+		"""
+		:return: The seconds spent in the predicate of every action state, by state index
+		:rtype : dict of (int, float)
+		"""
+		return dict(self._state_predicate_times)
+
+
+class EvaluationContext(object):
+	"""
+	The state of a single evaluation, kept apart from the (immutable) machine
+	so a machine can evaluate sequences from multiple threads at once
+	"""
+	def __init__(self, memoize=True, diagnostics=True, max_steps=None, max_branches=None, deadline=None, stats=None, tracer=None):
+		"""
+		:param memoize: Wether to cache pure action outcomes per sequence position
+		:type  memoize: bool
+		:param diagnostics: Wether to track failure details
+		:type  diagnostics: bool
+		:param max_steps: The maximal amount of evaluation steps, None for no limit
+		:type  max_steps: int
+		:param max_branches: The maximal amount of pending branches, None for no limit
+		:type  max_branches: int
+		:param deadline: The time.monotonic() time the evaluation should end by, None for no limit
+		:type  deadline: float
+		:param stats: Collects the work done by the evaluation, None for not collecting it
+		:type  stats: EvaluationStats
+		:param tracer: Called with every evaluated state, its sequence index and its counters, None for no tracing
+		:type  tracer: function
+		"""
+		self.diagnostics = diagnostics
+		self.memo = PredicateMemo() if memoize else None
+		self.max_index = 0
+		self.failure = None
+		self.pruned_branches = 0
+
+		self.stats = stats
+		self.tracer = tracer
+		self.traced = stats is not None or tracer is not None
+
+		# The engines check this single flag per step, so budgets, stats and tracing cost nothing when all disabled
+		self.monitored = self.traced or max_steps is not None or max_branches is not None or deadline is not None
+		self.steps = 0
+		self.peak_branches = 0
+		self._max_steps = max_steps
+		self._max_branches = max_branches
+		self._deadline = deadline
+		self._next_deadline_check = 0
+
+		# Don't report failures recorded by previous evaluations of this thread
+		_clear_last_failure_error()
+
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "EvaluationContext(max_index={}, failure={})".format(self.max_index, self.failure)
+
+	def record_failure(self):
+		"""
+		Keep the last failure record as the reason of the current evaluation failure
+		"""
+		if self.diagnostics:
+			self.failure = _get_last_failure_error()
+
+	def charge(self, branches, seq_index, steps=1):
+		"""
+		Account for evaluation work (only called for monitored evaluations)
+		:param branches: The current amount of pending branches
+		:type  branches: int
+		:param seq_index: The sequence index the work was done at
+		:type  seq_index: int
+		:param steps: The amount of evaluation steps taken
+		:type  steps: int
+		:raise EvaluationBudgetExceeded: If a budget of the evaluation was exceeded
+		"""
+		self.steps += steps
+		if branches > self.peak_branches: self.peak_branches = branches
+		if seq_index > self.max_index: self.max_index = seq_index
+
+		if self.stats is not None:
+			self.stats.steps += steps
+			if branches > self.stats.peak_branches: self.stats.peak_branches = branches
+
+		if self._max_steps is not None and self.steps > self._max_steps:
+			raise EvaluationBudgetExceeded(BUDGET_STEPS, self._max_steps, self.max_index, self.steps, self.peak_branches)
+
+		if self._max_branches is not None and self.peak_branches > self._max_branches:
+			raise EvaluationBudgetExceeded(BUDGET_BRANCHES, self._max_branches, self.max_index, self.steps, self.peak_branches)
+
+		# Reading the clock is costlier than a step, it is only read every DEADLINE_CHECK_INTERVAL steps
+		if self._deadline is not None and self.steps >= self._next_deadline_check:
+			self._next_deadline_check = self.steps + DEADLINE_CHECK_INTERVAL
+			if time.monotonic() > self._deadline:
+				raise EvaluationBudgetExceeded(BUDGET_DEADLINE, self._deadline, self.max_index, self.steps, self.peak_branches)
+
+	def visit(self, state, seq_index, counters):
+		"""
+		Record the evaluation of a state (only called for traced evaluations)
+		:param state: The evaluated state (a DFAState for the dfa engine, None for the final state)
+		:type  state: MachineState
+		:param seq_index: The sequence index of the evaluated object
+		:type  seq_index: int
+		:param counters: The range repetition counters of the evaluated branch
+		:type  counters: tuple
+		"""
+		if self.stats is not None and isinstance(state, MachineState):
+			self.stats.record_visit(state)
+
+		if self.tracer is not None:
+			self.tracer(state, seq_index, counters)
+
+
+class EvaluationMachine(object):
+	"""
+	The state machine describing the given object regex
+	(immutable once built, all the evaluation-time data is kept in an EvaluationContext)
+	"""
+	def __init__(self, regex_descriptions, engine=ENGINE_AUTO, dfa_max_states=DFA_MAX_STATES, memoize=True, diagnostics=True, optimize=False, prefilter=True):
+		"""
+		:param regex_descriptions: The description of all the machine regex elements
+		:type  regex_descriptions: list
+		:param engine: The evaluation engine used for checking sequences (one of ENGINES, or ENGINE_AUTO)
+		:type  engine: str
+		:note  engine: The nfa and dfa engines fall back to backtracking for descriptions using variables
+		:param dfa_max_states: The maximal amount of states cached by the dfa engine
+		:type  dfa_max_states: int
+		:param memoize: Wether the backtracking engine should cache pure action outcomes per sequence position
+		:type  memoize: bool
+		:param diagnostics: Wether to track failure details (see last_failure_details)
+		:type  diagnostics: bool
+		:param optimize: Wether to rewrite the descriptions with a PatternOptimizer before building the machine
+		:type  optimize: bool or iterable of str
+		:note  optimize: True enables all the OPTIMIZATION_PASSES, an iterable enables only the given ones
+		:param prefilter: Wether to reject sequences failing the cheap SequencePrefilter conditions before evaluating them
+		:type  prefilter: bool
+		"""
+		if engine != ENGINE_AUTO and engine not in ENGINES:
+			raise ValueError("Unknown evaluation engine {}, expected one of: {}".format(engine, ", ".join((ENGINE_AUTO, ) + ENGINES)))
+
+		self._optimization_report = None
+		if optimize:
+			optimizer = PatternOptimizer(OPTIMIZATION_PASSES if optimize is True else optimize)
+			regex_descriptions, self._optimization_report = optimizer.optimize(regex_descriptions)
+
+		self._descriptions = tuple(regex_descriptions)
+		self._diagnostics = diagnostics
+		self._graph = StateGraph(regex_descriptions, diagnostics=diagnostics)
+		self._uses_variables = uses_variables(regex_descriptions)
+
+		self._requested_engine = engine
+		self._dfa_max_states = dfa_max_states
+		self._engine = self._resolve_engine()
+		self._dfa = LazyDFA(self._graph, dfa_max_states) if self._engine == ENGINE_DFA else None
+		self._memoize = memoize
+
+		self._prefilter_enabled = prefilter
+		self._prefilter = SequencePrefilter(self._descriptions)
+		self._use_prefilter = prefilter and not self._prefilter.is_trivial()
+
+		# The context of the last evaluation of every thread, for error details
+		self._last_contexts = threading.local()
+
+	def __getstate__(self):
+		"""
+		:return: The picklable state of the machine (without the contexts of past evaluations)
+		:rtype : dict
+		"""
+		state = self.__dict__.copy()
+		del state["_last_contexts"]
+		return state
+
+	def __setstate__(self, state):
+		"""
+		:param state: A state returned by __getstate__
+		:type  state: dict
+		"""
+		self.__dict__.update(state)
+		self._last_contexts = threading.local()
+
+	def _resolve_engine(self):
+		"""
+		:return: The engine able to check sequences of the machine graph, closest to the requested one
+		:rtype : str
+		"""
+		engine = self._requested_engine
+
+		# The backtracking engine may explore a branch per repetition count of a counting range, the nfa engine merges them
+		if engine == ENGINE_AUTO:
+			engine = ENGINE_NFA if self._graph.has_counting_ranges() and not self._uses_variables else ENGINE_BACKTRACKING
+
+		if engine == ENGINE_DFA and not self._graph.is_deterministic_closure():
+			engine = ENGINE_NFA
+
+		if engine in (ENGINE_NFA, ENGINE_DFA) and self._uses_variables:
+			engine = ENGINE_BACKTRACKING
+
+		return engine
+
+	def copy(self):
+		"""
+		:return: A machine sharing the compiled graph and dfa cache of this one, with its own evaluation contexts
+		:rtype : EvaluationMachine
+		"""
+		machine = EvaluationMachine.__new__(EvaluationMachine)
+		machine.__setstate__(self.__getstate__())
+		return machine
+
+	def to_table(self):
+		"""
+		:return: The flattened graph of the machine (see StateGraph.to_table), with a picklable state of the rest of the machine
+		:rtype : tuple of (list of int, dict)
+		"""
+		table, graph_state = self._graph.to_table()
+		state = self.__getstate__()
+		state["_graph"] = graph_state
+
+		# The dfa states are built again on demand
+		state["_dfa"] = None
+		return table, state
+
+	@staticmethod
+	def from_table(table, state):
+		"""
+		:param table: A table returned by to_table
+		:type  table: sequence of int
+		:param state: The state returned with the table
+		:type  state: dict
+		:return: The flattened machine
+		:rtype : EvaluationMachine
+		"""
+		machine = EvaluationMachine.__new__(EvaluationMachine)
+		machine.__setstate__(dict(state, _graph=StateGraph.from_table(table, state["_graph"])))
+		if machine._engine == ENGINE_DFA:
+			machine._dfa = LazyDFA(machine._graph, machine._dfa_max_states)
+
+		return machine
+
+	def can_extend(self):
+		"""
+		:return: Wether regex elements can be appended to the machine without building it again (see extend)
+		:rtype : bool
+		"""
+		return self._optimization_report is None
+
+	def extend(self, regex_descriptions):
+		"""
+		Build the machine of the descriptions of this one followed by the appended regex elements, building states only
+		for them instead of compiling the whole graph again
+		(the states are copied before being linked to the appended ones, so the graph of this machine - shared with its
+		copies, running evaluations and matchers - never changes)
+		:param regex_descriptions: The appended regex elements
+		:type  regex_descriptions: list of RegexDescription
+		:return: The extended machine
+		:rtype : EvaluationMachine
+		:raise ValueError: If the machine was built from optimized descriptions (see can_extend)
+		"""
+		if not self.can_extend():
+			raise ValueError("Can't extend a machine built from optimized descriptions")
+
+		regex_descriptions = tuple(regex_descriptions)
+		machine = EvaluationMachine.__new__(EvaluationMachine)
+		machine.__setstate__(self.__getstate__())
+
+		machine._graph = self._graph.copy()
+		machine._graph.extend(regex_descriptions)
+		machine._descriptions = self._descriptions + regex_descriptions
+		machine._uses_variables = self._uses_variables or uses_variables(regex_descriptions)
+
+		# The cached dfa states hold threads of the graph before it was extended
+		machine._engine = machine._resolve_engine()
+		machine._dfa = LazyDFA(machine._graph, self._dfa_max_states) if machine._engine == ENGINE_DFA else None
+
+		machine._prefilter = self._prefilter.extend(regex_descriptions)
+		machine._use_prefilter = self._prefilter_enabled and not machine._prefilter.is_trivial()
+		return machine
+
+	def get_engine(self):
+		"""
+		:return: The evaluation engine actually used for checking sequences
+		:rtype : str
+		"""
+		return self._engine
+
+	def get_descriptions(self):
+		"""
+		:return: The regex elements the machine was built from (after optimization)
+		:rtype : tuple of RegexDescription
+		"""
+		return self._descriptions
+
+	def get_optimization_report(self):
+		"""
+		:return: The rewrites applied to the descriptions, None if the machine was built without optimizing
+		:rtype : OptimizationReport
+		"""
+		return self._optimization_report
+
+	def analyze(self):
+		"""
+		:return: The ambiguous constructs of the machine descriptions, with the worst-case complexity of its engine
+		:rtype : PatternAnalysis
+		"""
+		return PatternAnalysis(self._descriptions, self._engine)
+
+	def get_prefilter(self):
+		"""
+		:return: The cheap necessary conditions of satisfying the machine
+		:rtype : SequencePrefilter
+		"""
+		return self._prefilter
+
+	def to_dot(self, stats=None):
+		"""
+		:param stats: Evaluation stats annotating the states with their evaluation counts, None for no annotations
+		:type  stats: EvaluationStats
+		:return: The state graph of the machine in the Graphviz DOT format
+		:rtype : str
+		"""
+		return self._graph.to_dot(stats)
+
+	def check(self, sequence, consume_all=True, max_steps=None, max_branches=None, deadline=None, stats=None, tracer=None):
+		"""
+		:param sequence: The sequence of object to check
+		:type  sequence: sequencable
+		:param max_steps: The maximal amount of evaluation steps (branches explored, or threads advanced by the nfa engine)
+		:type  max_steps: int
+		:param max_branches: The maximal amount of pending branches (live threads for the nfa and dfa engines)
+		:type  max_branches: int
+		:param deadline: The time.monotonic() time the evaluation should end by
+		:type  deadline: float
+		:note  : The budgets are unlimited by default
+		:param stats: Collects the work done by the evaluation (see to_dot)
+		:type  stats: EvaluationStats
+		:param tracer: Called with every evaluated state, its sequence index and its range counters
+		:type  tracer: function
+		:note  tracer: The dfa engine passes its DFAState (without counters) once per object
+		:return: Wether the given sequence satisfies the machine
+		:rtype : bool
+		:raise EvaluationBudgetExceeded: If the evaluation exceeded one of its budgets
+		"""
+		context = EvaluationContext(self._memoize, self._diagnostics, max_steps, max_branches, deadline, stats, tracer)
+		self._last_contexts.context = context
+
+		if self._use_prefilter:
+			rejection = self._prefilter.reject(sequence, consume_all)
+			if rejection is not None:
+				if self._diagnostics: context.failure = rejection
+				return False
+
+		if self._engine == ENGINE_DFA:
+			return self._check_dfa(context, sequence, consume_all)
+
+		if self._engine == ENGINE_NFA:
+			return self._check_nfa(context, self._graph.get_start_threads(), enumerate(sequence), consume_all)
+
+		return self._check_backtracking(context, sequence, consume_all)
+
+	def check_many(self, sequences, executor=None, max_workers=None, processes=None, chunksize=1):
+		"""
+		Check multiple sequences concurrently on a thread pool, or on a process pool
+		:param sequences: The sequences of objects to check
+		:type  sequences: iterable of sequencable
+		:param executor: The executor running the checks, None for a new thread pool
+		:type  executor: concurrent.futures.Executor
+		:param max_workers: The amount of threads of a new thread pool (ignored if an executor is given)
+		:type  max_workers: int
+		:param processes: The amount of worker processes of a new process pool, None for checking on threads
+		:type  processes: int
+		:note  processes: The machine and the sequences must be picklable (see iter_check_many)
+		:param chunksize: The amount of sequences sent to a worker at once
+		:type  chunksize: int
+		:return: Wether each of the sequences satisfies the machine, in the order of the sequences
+		:rtype : list of bool
+		"""
+		return list(self.iter_check_many(sequences, executor, max_workers, processes, chunksize))
+
+	def iter_check_many(self, sequences, executor=None, max_workers=None, processes=None, chunksize=1, ordered=True):
+		"""
+		Check multiple sequences concurrently, streaming back the results as they are ready
+		(only a bounded amount of chunks is in flight at once, so sequences may be generated lazily)
+		:param sequences: The sequences of objects to check
+		:type  sequences: iterable of sequencable
+		:param executor: The executor running the checks, None for a new thread pool (ignored if processes is given)
+		:type  executor: concurrent.futures.Executor
+		:param max_workers: The amount of threads of a new thread pool (ignored if an executor is given)
+		:type  max_workers: int
+		:param processes: The amount of worker processes of a new process pool, None for checking on threads
+		:type  processes: int
+		:note  processes: The machine is pickled once and loaded once by every worker, LambdaCheck functions
+		                  must therefore be importable (module level functions, not lambdas or local functions)
+		:param chunksize: The amount of sequences sent to a worker at once
+		:type  chunksize: int
+		:param ordered: Wether to yield the results in the order of the sequences, or as soon as they are ready
+		:type  ordered: bool
+		:return: Wether each of the sequences satisfies the machine if ordered,
+		         otherwise (sequence index, result) pairs in completion order
+		:rtype : iterator of bool, or iterator of tuple of (int, bool)
+		"""
+		if chunksize < 1:
+			raise ValueError("chunksize must be positive, got {}".format(chunksize))
+
+		if processes is not None:
+			# Fails here, before starting any worker, if the machine can't be pickled
+			machine_pickle = pickle.dumps(self, pickle.HIGHEST_PROTOCOL)
+			pool = concurrent.futures.ProcessPoolExecutor(processes, initializer=_load_worker_machine, initargs=(machine_pickle,))
+			check_chunk = _check_worker_chunk
+			workers = processes
+		else:
+			pool = executor if executor is not None else concurrent.futures.ThreadPoolExecutor(max_workers)
+			check_chunk = self._check_chunk
+			workers = max_workers if max_workers is not None else (os.cpu_count() or 1)
+
+		chunks = _chunked(enumerate(sequences), chunksize)
+		max_in_flight = 2 * workers
+		in_flight = collections.deque()
+
+		try:
+			for chunk in itertools.islice(chunks, max_in_flight):
+				in_flight.append(pool.submit(check_chunk, chunk))
+
+			while 0 != len(in_flight):
+				if ordered:
+					done = [in_flight.popleft()]
+				else:
+					done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+					for future in done:
+						in_flight.remove(future)
+
+				for future in done:
+					for index, result in future.result():
+						yield result if ordered else (index, result)
+
+				for chunk in itertools.islice(chunks, len(done)):
+					in_flight.append(pool.submit(check_chunk, chunk))
+		finally:
+			for future in in_flight:
+				future.cancel()
+
+			if pool is not executor:
+				pool.shutdown()
+
+	def _check_chunk(self, indexed_sequences):
+		"""
+		:param indexed_sequences: Sequences of objects to check, with their index
+		:type  indexed_sequences: list of tuple of (int, sequencable)
+		:return: Wether each of the sequences satisfies the machine, with its index
+		:rtype : list of tuple of (int, bool)
+		"""
+		return [(index, self.check(sequence)) for index, sequence in indexed_sequences]
+
+	def _last_context(self):
+		"""
+		:return: The context of the last evaluation made by the current thread
+		:rtype : EvaluationContext
+		"""
+		return getattr(self._last_contexts, "context", None)
+
+	def get_memo(self):
+		"""
+		:return: The predicate memo of the last backtracking evaluation (of the current thread), holding its hit counters
+		:rtype : PredicateMemo
+		"""
+		context = self._last_context()
+		return None if context is None else context.memo
+
+	def get_pruned_branches(self):
+		"""
+		:return: The amount of branches the last backtracking evaluation (of the current thread) dropped,
+		         as they couldn't consume exactly the objects left
+		:rtype : int
+		"""
+		context = self._last_context()
+		return 0 if context is None else context.pruned_branches
+
+	def get_dfa(self):
+		"""
+		:return: The lazy DFA used by the dfa engine, None for other engines
+		:rtype : LazyDFA
+		"""
+		return self._dfa
+
+	def _check_dfa(self, context, sequence, consume_all):
+		"""
+		Walk the lazily built DFA, evaluating each distinct action once per object
+		(falls back to simulating the graph if the DFA cache blows up)
+		:param context: The state of the current evaluation
+		:type  context: EvaluationContext
+		:param sequence: The sequence of object to check
+		:type  sequence: iterable
+		:return: Wether the given sequence satisfies the machine
+		:rtype : bool
+		"""
+		variables_frame = VariablesFrame()
+		dfa_state = self._dfa.get_start_state()
+
+		# The last state some thread failed on, with the object it failed on (the failure reason is recorded lazily)
+		failed_step = None
+
+		indexed_objects = enumerate(sequence)
+		for seq_index, evaluated_object in indexed_objects:
+			context.max_index = seq_index
+			if not consume_all and dfa_state.is_accepting(): return True
+
+			# A deterministic state takes a single step per object, standing for all its threads
+			if context.monitored:
+				context.charge(len(dfa_state.get_threads()), seq_index)
+				if context.traced: self._trace_dfa_state(context, dfa_state, seq_index)
+
+			if context.stats is None:
+				outcomes = dfa_state.evaluate(evaluated_object, variables_frame)
+			else:
+				started = time.perf_counter()
+				outcomes = dfa_state.evaluate(evaluated_object, variables_frame)
+				context.stats.record_predicate_time(None, time.perf_counter() - started)
+
+			if context.diagnostics and False in outcomes: failed_step = (dfa_state, evaluated_object)
+
+			next_state = self._dfa.transition(dfa_state, outcomes)
+			if next_state is None:
+				if failed_step is not None: failed_step[0].record_failure(failed_step[1], variables_frame)
+				threads = list(dfa_state.get_threads())
+				return self._check_nfa(context, threads, itertools.chain([(seq_index, evaluated_object)], indexed_objects), consume_all)
+
+			if next_state.is_dead() and not next_state.is_accepting():
+				self._record_dfa_failure(context, failed_step, variables_frame)
+				return False
+
+			dfa_state = next_state
+
+		if not dfa_state.is_accepting():
+			self._record_dfa_failure(context, failed_step, variables_frame)
+
+		return dfa_state.is_accepting()
+
+	@staticmethod
+	def _record_dfa_failure(context, failed_step, variables_frame):
+		"""
+		Record the failure reason of a dfa evaluation, as the last action failing on the sequence objects
+		:param context: The state of the current evaluation
+		:type  context: EvaluationContext
+		:param failed_step: The last state some thread failed on, with the object it failed on (None if none failed)
+		:type  failed_step: tuple of (DFAState, any)
+		:param variables_frame: The frame passed to the evaluated actions
+		:type  variables_frame: VariablesFrame
+		"""
+		if context.diagnostics and failed_step is not None:
+			failed_step[0].record_failure(failed_step[1], variables_frame)
+
+		context.record_failure()
+
+	@staticmethod
+	def _trace_dfa_state(context, dfa_state, seq_index):
+		"""
+		Record the evaluation of a deterministic state, as the evaluation of every action state it stands for
+		:param context: The state of the current evaluation
+		:type  context: EvaluationContext
+		:param dfa_state: The deterministic state evaluating the object
+		:type  dfa_state: DFAState
+		:param seq_index: The sequence index of the evaluated object
+		:type  seq_index: int
+		"""
+		if context.stats is not None:
+			for state, _, _ in dfa_state.get_action_threads():
+				context.stats.record_visit(state)
+
+		if context.tracer is not None:
+			context.tracer(dfa_state, seq_index, None)
+
+	def _check_nfa(self, context, threads, indexed_objects, consume_all):
+		"""
+		Evaluate all the live branches together, one sequence object at a time
+		(identical branches are merged, bounding the work per object by the machine size)
+		:param context: The state of the current evaluation
+		:type  context: EvaluationContext
+		:param threads: The initial live threads
+		:type  threads: list of tuple of (MachineState, tuple of int, any)
+		:param indexed_objects: The objects left to check, with their sequence index
+		:type  indexed_objects: iterable of tuple of (int, any)
+		:return: Wether the given sequence satisfies the machine
+		:rtype : bool
+		"""
+		variables_frame = VariablesFrame()
+
+		for seq_index, evaluated_object in indexed_objects:
+			context.max_index = seq_index
+			if context.monitored: context.charge(len(threads), seq_index, len(threads))
+
+			threads, matched_tags = self._graph.advance(threads, evaluated_object, variables_frame, context=context if context.traced else None)
+
+			if not consume_all and 0 != len(matched_tags): return True
+
+			if 0 == len(threads):
+				context.record_failure()
+				return False
+
+		_, matched_tags = self._graph.advance(threads, None, variables_frame, at_end=True, context=context if context.traced else None)
+		if 0 == len(matched_tags):
+			context.record_failure()
+
+		return 0 != len(matched_tags)
+
+	def _check_backtracking(self, context, sequence, consume_all):
+		"""
+		Walk the static state graph depth first, backtracking on every failure
+		(a branch is the state it stands on, its range counters, its sequence index and its variables frame)
+		:param context: The state of the current evaluation
+		:type  context: EvaluationContext
+		:param sequence: The sequence of object to check
+		:type  sequence: sequencable
+		:return: Wether the given sequence satisfies the machine
+		:rtype : bool
+		"""
+		memo = context.memo
+		diagnostics = context.diagnostics
+		stats = context.stats
+		sequence_length = len(sequence)
+
+		# Branches reaching the same state, counters, index and frame have the same outcome, only the first is explored
+		visited = set()
+
+		# The failure reason kept is the last one of the furthest index a predicate failed on, like in the other engines
+		failure_index = -1
+
+		# TODO: Insert parralelism to the branches evaluation
+		branch_stack = [(self._graph.get_start_state(), self._graph.initial_counters(), 0, VariablesFrame())]
+
+		while 0 != len(branch_stack):
+			branch = branch_stack.pop()
+			state, counters, seq_index, variables_frame = branch
+
+			if context.monitored:
+				context.charge(len(branch_stack) + 1, seq_index)
+				if context.traced: context.visit(state, seq_index, counters)
+
+			# Check for reaching the end of the state machine
+			if state is None:
+				if not consume_all or seq_index == sequence_length: return True
+				# The first object left over is the furthest index reached by the branch
+				if diagnostics and seq_index > context.max_index: context.max_index = seq_index
+				continue
+
+			if branch in visited: continue
+			visited.add(branch)
+
+			# Drop branches that can't consume exactly the objects left
+			if consume_all:
+				min_remaining, max_remaining = state.remaining_bounds(counters)
+				remaining = sequence_length - seq_index
+				if remaining < min_remaining or (max_remaining is not None and remaining > max_remaining):
+					# When recording failure reasons, only the ones that can't get further than the furthest failure,
+					# so the reason matches the other engines, which evaluate every branch
+					reach = sequence_length - 1 if max_remaining is None else min(seq_index + max_remaining, sequence_length - 1)
+					if not diagnostics or reach <= failure_index:
+						context.pruned_branches += 1
+						continue
+
+			# Keeping track of max index reached for error report
+			if diagnostics and seq_index > context.max_index: context.max_index = seq_index
+
+			evaluated_object = None if seq_index >= sequence_length else sequence[seq_index]
+
+			if not isinstance(state, ActionState):
+				next_object = G_END_OF_SEQUENCE if seq_index >= sequence_length else evaluated_object
+
+				# Push the less preferred transitions first, so the preferred one is explored first
+				transitions = state.transitions(counters, next_object, variables_frame)
+				if stats is not None: stats.record_branches(state, len(transitions))
+
+				for next_state, next_counters, _ in reversed(transitions):
+					branch_stack.append((next_state, next_counters, seq_index, variables_frame))
+				continue
+
+			# There is nothing left to consume past the end of the sequence
+			consuming = state.is_consuming()
+			if consuming and seq_index >= sequence_length: continue
+
+			# Evaluate current branch state
+			if stats is not None: started = time.perf_counter()
+
+			if memo is None:
+				success = state.get_predicate()(evaluated_object, variables_frame)
+			else:
+				memo.seek(seq_index)
+				success = memo.perform(state.get_action(), state.get_predicate(), evaluated_object, variables_frame)
+
+			if stats is not None: stats.record_predicate_time(state, time.perf_counter() - started)
+
+			# Var-write actions create a new frame, sharing the unchanged variables with the current one
+			new_var_frame = variables_frame.commit_changes()
+			if stats is not None and new_var_frame is not variables_frame: stats.frame_copies += 1
+
+			if not success:
+				# Document max index failure reason
+				if diagnostics and seq_index >= failure_index:
+					failure_index = seq_index
+					context.record_failure()
+				continue
+
+			if stats is not None: stats.record_branches(state, 1)
+			branch_stack.append((state.get_forward_state(), counters, seq_index + 1 if consuming else seq_index, new_var_frame))
+
+		# Branches waiting past the end of the sequence report its last object, like in the other engines
+		if context.max_index >= sequence_length: context.max_index = max(sequence_length - 1, 0)
+
+		return False
+
+	def last_failure(self):
 		"""
-		self._forward_node = forward_node
+		:return: The structured reason of the last evaluation failure (of the current thread), None if unknown
+		:rtype : EvaluationFailure
+		"""
+		context = self._last_context()
+		if context is None or context.failure is None:
+			return None
+
+		return EvaluationFailure(*context.failure)
 
-	def get_forward_node(self):
+	def last_failure_details(self):
 		"""
-		:return: The next node for the evaluation
-		:rtype : EvaluationNode
+		:return: The maximum index reached of the last evaluated sequence with the last failure reason
+		:rtype : tuple of (int, str)
+		:note  : Both are None when the machine was built without diagnostics
+		:note  : Refers to the last evaluation made by the current thread
 		"""
-		return self._forward_node
+		if not self._diagnostics:
+			return (None, None)
+
+		context = self._last_context()
+		failure = self.last_failure()
+		return (0 if context is None else context.max_index, None if failure is None else failure.render())
 
-	def evaluate(self, obj, variables_frame):
+	def get_graph(self):
 		"""
-		:param obj: The object to be evaluated
-		:type  obj: any
-		:param variables_frame: The variables frame of the currently evaluated branch
-		:type  variables_frame: VariablesFrame
-		:return: Wether the object is consumed for the current evaluation
-		:rtype : bool
+		:return: The static state graph of the machine
+		:rtype : StateGraph
 		"""
-		raise NotImplementedError()
+		return self._graph
 
-	def decide_nexts(self):
+	def search(self, sequence, position=0):
 		"""
-		Get all the possible next states for the regex state machine
-		:return: All the next possible states
-		:rtype : list of EvaluationNode
+		Find the first sub-sequence satisfying the machine
+		(leftmost, preferring more repetitions in ranges - similar to re.search)
+		:param sequence: The sequence of objects to search
+		:type  sequence: sequencable
+		:param position: The index to start searching from
+		:type  position: int
+		:return: The (start, end) span of the first match, None if there is no match
+		:rtype : tuple of (int, int)
 		"""
-		raise NotImplementedError()
+		if self._uses_variables:
+			raise ValueError("Searching isn't supported for descriptions using variables")
+
+		variables_frame = VariablesFrame()
+		start_state = self._graph.get_start_state()
+		initial_counters = self._graph.initial_counters()
+
+		threads = []
+		match = None
+
+		# A single pass over the sequence, a new thread (tagged with its start index) is seeded at every position
+		# with the lowest preference, so a thread never has to be re-run from a later offset
+		seq_index = position
+		while True:
+			if match is None:
+				threads.append((start_state, initial_counters, seq_index))
+
+			if 0 == len(threads): break
+
+			at_end = seq_index >= len(sequence)
+			evaluated_object = None if at_end else sequence[seq_index]
+			threads, matched_tags = self._graph.advance(threads, evaluated_object, variables_frame, at_end=at_end, stop_on_match=True)
+
+			# Threads that are less preferred than the matching one were dropped, the rest may still find a better match
+			if 0 != len(matched_tags):
+				match = (matched_tags[0], seq_index)
+
+			if at_end: break
+			seq_index += 1
+
+		return match
+
+	def finditer(self, sequence):
+		"""
+		:param sequence: The sequence of objects to search
+		:type  sequence: sequencable
+		:return: The spans of all the non-overlapping matches in the sequence
+		:rtype : iterator of tuple of (int, int)
+		"""
+		if self._uses_variables:
+			raise ValueError("Searching isn't supported for descriptions using variables")
+
+		variables_frame = VariablesFrame()
+		start_state = self._graph.get_start_state()
+		initial_counters = self._graph.initial_counters()
+
+		# A single pass over the sequence, running a search (see search) per pending match - every search starts at the end
+		# of the match its previous one found so far, and is started again whenever that match changes (always ending
+		# at the current index). A search is done once its match is found and none of its threads may find a better one
+		# The searches are [start index, threads, match] lists, by their order
+		searches = {0: [0, [], None]}
+		first_search = last_search = 0
+
+		# The searches having threads, the others only wait for the searches before them to be done
+		live_searches = []
+
+		seq_index = 0
+		while True:
+			at_end = seq_index >= len(sequence)
+			evaluated_object = None if at_end else sequence[seq_index]
+
+			stepped_searches = live_searches if live_searches and live_searches[-1] == last_search else live_searches + [last_search]
+			step = 0
+			while step < len(stepped_searches):
+				search_order = stepped_searches[step]
+				step += 1
+
+				search = searches[search_order]
+				start, threads, match = search
+				if match is None and seq_index >= start:
+					threads.append((start_state, initial_counters, seq_index))
+
+				if 0 == len(threads): continue
+
+				search[1], matched_tags = self._graph.advance(threads, evaluated_object, variables_frame, at_end=at_end, stop_on_match=True)
+				if 0 != len(matched_tags):
+					search[2] = (matched_tags[0], seq_index)
+
+					# The later searches started from the previous match end
+					for dropped_order in range(search_order + 1, last_search + 1):
+						del searches[dropped_order]
+
+					last_search = search_order + 1
+					searches[last_search] = [seq_index if seq_index > matched_tags[0] else seq_index + 1, [], None]
+					stepped_searches = stepped_searches[:step] + [last_search]
+
+			# Threads identical to threads of an earlier search have the same future, so only the earlier one is kept
+			# (if it matches, the later searches are started again anyway) - bounding the work per object by the machine size
+			live_searches = []
+			seen = set()
+			for search_order in stepped_searches:
+				search = searches[search_order]
+				if 0 != len(live_searches):
+					search[1] = [thread for thread in search[1] if (thread[0], thread[1]) not in seen]
+				if 0 == len(search[1]): continue
+
+				seen.update((state, counters) for state, counters, _ in search[1])
+				live_searches.append(search_order)
+
+			while first_search in searches and searches[first_search][2] is not None and (at_end or 0 == len(searches[first_search][1])):
+				yield searches.pop(first_search)[2]
+				first_search += 1
+
+			if at_end: return
+			seq_index += 1
+
+	def matcher(self):
+		"""
+		:return: A push-mode matcher, checking a sequence fed one object at a time
+		:rtype : Matcher
+		"""
+		if self._uses_variables:
+			raise ValueError("Streaming evaluation isn't supported for descriptions using variables")
 
+		return Matcher(self)
 
-class ActionNode(EvaluationNode):
+
+class Matcher(object):
 	"""
-	A state in the regex state machine representing an underlying EvaluationAction
+	Checks a sequence pushed one object at a time, holding only the live threads in memory
+	(the sequence is never indexed, so it may be an unbounded stream)
 	"""
-	def __init__(self, action, forward_node=None):
+	def __init__(self, machine):
 		"""
-		:param action: The underlying action to be transformed into a state
-		:type  action: EvaluationAction
-		:param forward_node: The next node in the state machine
-		:type  forward_node: EvaluationNode
+		:param machine: The machine the fed sequence is checked against
+		:type  machine: EvaluationMachine
 		"""
-		super(ActionNode, self).__init__(forward_node)
+		self._graph = machine.get_graph()
+		self._dfa = machine.get_dfa()
+		self._variables_frame = VariablesFrame()
 
-		self._action = action
-		self._action_success = False
+		self._dfa_state = None if self._dfa is None else self._dfa.get_start_state()
+		self._threads = None if self._dfa is not None else self._graph.get_start_threads()
+
+		self._position = 0
+		self._finished = False
 
 	def __repr__(self):
 		"""
 		:return: Textual representation of the object
 		:rtype : str
 		"""
-		return "ActionNode({})".format(self._action)
+		return "Matcher(position={}, alive={})".format(self._position, self.is_alive())
 
-	def evaluate(self, obj, variables_frame):
+	def get_position(self):
 		"""
-		:param obj: The object to be evaluated
+		:return: The amount of objects fed so far
+		:rtype : int
+		"""
+		return self._position
+
+	def is_alive(self):
+		"""
+		:return: Wether the fed objects may still be the prefix of a satisfying sequence
+		:rtype : bool
+		"""
+		if self._dfa_state is not None:
+			return not self._dfa_state.is_dead() or self._dfa_state.is_accepting()
+
+		return 0 != len(self._threads)
+
+	def feed(self, obj):
+		"""
+		:param obj: The next object of the checked sequence
 		:type  obj: any
-		:param variables_frame: The variables frame of the currently evaluated branch
-		:type  variables_frame: VariablesFrame
-		:return: Wether the object is consumed for the current evaluation
+		:return: Wether the fed objects may still be the prefix of a satisfying sequence
 		:rtype : bool
 		"""
-		self._action_success = self._action.perform(obj, variables_frame)
-		return self._action.is_consuming()
+		if self._finished:
+			raise ValueError("Can't feed a finished matcher")
+
+		self._position += 1
+
+		if self._dfa_state is not None:
+			next_state = self._dfa.advance(self._dfa_state, obj, self._variables_frame)
+			if next_state is not None:
+				self._dfa_state = next_state
+				return self.is_alive()
 
-	def decide_nexts(self):
+			# The DFA cache blew up, keep on simulating the graph from the current threads
+			self._threads = list(self._dfa_state.get_threads())
+			self._dfa_state = None
+
+		if 0 != len(self._threads):
+			self._threads, _ = self._graph.advance(self._threads, obj, self._variables_frame)
+
+		return self.is_alive()
+
+	def feed_many(self, objects):
 		"""
-		Get all the possible next states for the regex state machine
-		:return: All the next possible states
-		:rtype : list of EvaluationNode
+		:param objects: The next objects of the checked sequence
+		:type  objects: iterable
+		:return: Wether the fed objects may still be the prefix of a satisfying sequence
+		:rtype : bool
+		:note  : Stops consuming the given objects once the matcher is no longer alive
 		"""
-		return [] if not self._action_success else [self.get_forward_node()]
+		for obj in objects:
+			if not self.feed(obj):
+				return False
 
+		return self.is_alive()
 
-class RangeNode(EvaluationNode):
-	"""
-	A state in the regex state machine representing an underlying range of repeats
-	"""
-	class RangeManagementNode(EvaluationNode):
+	def finish(self):
 		"""
-		# TODO: This is a rather quick solution for the stateful range problem, think of a more elegant one
-		# refer to EvaluationMachine.check NOTE for more detail about this problem
-		A stateful management node, used to keep track of the 
-		needs to be created seperately for every branch (for keeping the stateful data)
+		Mark the end of the checked sequence
+		:return: Wether the fed sequence satisfies the machine
+		:rtype : bool
 		"""
-		def __init__(self, min_visits, max_visits, inner_node=None, outer_node=None):
-			"""
-			:param min_visits: The minimal visits through this node until it can advance to the forward node
-			:type  min_visits: int
-			:param max_visits: The maximal visits through this node until it can advance to the forward node
-			:type  max_visits: int
-			:param inner_node: The node representing the inner range part, eventually leading back to this node
-			:type  inner_node: EvaluationNode
-			:param outer_node: The node representing the regex-element after the range specifier
-			:type  outer_node: EvaluationNode
-			"""
-			super(RangeNode.RangeManagementNode, self).__init__(outer_node)
+		self._finished = True
 
-			self._visits = 0
+		if self._dfa_state is not None:
+			return self._dfa_state.is_accepting()
 
-			self._min_visits = min_visits
-			self._max_visits = max_visits
+		_, matched_tags = self._graph.advance(self._threads, None, self._variables_frame, at_end=True)
+		return 0 != len(matched_tags)
 
-			self._inner_node = inner_node
-			self._outer_node = outer_node
 
-		def __repr__(self):
-			"""
-			:return: Textual representation of the object
-			:rtype : str
-			"""
-			return "RangeManagement(min={}, max={}, count={})".format(self._min_visits, self._max_visits, self._visits)
+def _machine_cache_key(regex_descriptions, options):
+	"""
+	:param regex_descriptions: The description of all the machine regex elements
+	:type  regex_descriptions: list of RegexDescription
+	:param options: The rest of the EvaluationMachine parameters
+	:type  options: tuple
+	:return: The structural key of a machine, None if the machine can't be cached
+	:rtype : tuple
+	"""
+	if not _is_structural(regex_descriptions):
+		return None
 
-		def evaluate(self, obj, variables_frame):
-			"""
-			:param obj: The object to be evaluated
-			:type  obj: any
-			:param variables_frame: The variables frame of the currently evaluated branch
-			:type  variables_frame: VariablesFrame
-			:return: Wether the object is consumed for the current evaluation
-			:rtype : bool
-			"""
-			self._visits += 1
-			return False
+	engine, dfa_max_states, memoize, diagnostics, optimize, prefilter = options
+	key = (
+		tuple(description.structure_key() for description in regex_descriptions),
+		engine, dfa_max_states, memoize, diagnostics, optimize if isinstance(optimize, bool) else tuple(optimize), prefilter
+	)
 
-		def decide_nexts(self):
-			"""
-			Get all the possible next states for the regex state machine
-			:return: All the next possible states
-			:rtype : list of EvaluationNode
-			"""
-			next_states = []
-			effective_visits = self._visits - 1
-
-			if self._max_visits is None:
-				next_states.append(self._inner_node)
-			else:
-				if effective_visits < self._max_visits: # Note that theres no need for <=, as subsequent returns would fail
-					next_states.append(self._inner_node)
-				if self._min_visits <= effective_visits and effective_visits <= self._max_visits:
-					next_states.append(self._outer_node)
+	try:
+		hash(key)
+	except TypeError:
+		# Unhashable attribute values, can't be compared structurally
+		return None
 
-			if len(next_states) == 0:
-				_set_last_failure_error("Range visits count requirement not met")
+	return key
 
-			return next_states
 
-	def __init__(self, repeat_identifier, forward_node=None):
+class MachineCache(object):
+	"""
+	A least recently used cache of compiled machines, keyed on the structure of their descriptions and their parameters
+	(evaluations of structurally identical descriptions share a single compiled graph and dfa cache)
+	"""
+	def __init__(self, max_size=MACHINE_CACHE_SIZE):
 		"""
-		:param repeat_identifier: The range node descriptor
-		:type  repeat_identifier: RegexDescription
-		:param forward_node: The node representing the regex-element after the range specifier
-		:type  forward_node: EvaluationNode
+		:param max_size: The maximal amount of cached machines, 0 for not caching any
+		:type  max_size: int
 		"""
-		super(RangeNode, self).__init__(forward_node)
-		self._repeat_identifier = repeat_identifier
+		self._max_size = max_size
+		self._hits = 0
+		self._misses = 0
+
+		# Every entry keeps the descriptions it was built from alive, so identity based structure keys stay unique
+		self._entries = collections.OrderedDict()
+		self._lock = threading.Lock()
 
 	def __repr__(self):
 		"""
 		:return: Textual representation of the object
 		:rtype : str
 		"""
-		return "RangeNode(min={}, max={})".format(self._repeat_identifier._min_count, self._repeat_identifier._max_count)
+		return "MachineCache(size={}, max_size={}, hits={}, misses={})".format(len(self), self._max_size, self._hits, self._misses)
 
-	def evaluate(self, obj, variables_frame):
+	def __len__(self):
 		"""
-		:param obj: The object to be evaluated
-		:type  obj: any
-		:param variables_frame: The variables frame of the currently evaluated branch
-		:type  variables_frame: VariablesFrame
-		:return: Wether the object is consumed for the current evaluation
-		:rtype : bool
+		:return: The amount of cached machines
+		:rtype : int
 		"""
-		return False
+		return len(self._entries)
+
+	def get_stats(self):
+		"""
+		:return: The amount of machines found in the cache, and the amount built since it was created
+		:rtype : tuple of (int, int)
+		"""
+		return self._hits, self._misses
+
+	def set_max_size(self, max_size):
+		"""
+		:param max_size: The maximal amount of cached machines, 0 for not caching any
+		:type  max_size: int
+		"""
+		with self._lock:
+			self._max_size = max_size
+			self._evict()
+
+	def clear(self):
+		"""
+		Drop all the cached machines
+		"""
+		with self._lock:
+			self._entries.clear()
 
-	def _create_range_branch(self):
+	def _evict(self):
 		"""
-		:return: A Head node of a clean range branch
-		:rtype : RangeManagementNode
+		Drop the least recently used machines exceeding the cache size
 		"""
-		# Build the range branch underlying sub nodes
-		sub_nodes = []
-		for sub_identifier in self._repeat_identifier.get_sub_elements():
-			sub_nodes.append(build_node(sub_identifier))
+		while len(self._entries) > self._max_size:
+			self._entries.popitem(last=False)
 
-		for i in range(len(sub_nodes) - 1):
-			sub_nodes[i].set_forward_node(sub_nodes[i+1])
+	def lookup(self, regex_descriptions, engine=ENGINE_AUTO, dfa_max_states=DFA_MAX_STATES, memoize=True, diagnostics=True, optimize=False, prefilter=True):
+		"""
+		:return: A copy of the cached machine of the given descriptions, None if it isn't cached
+		:rtype : EvaluationMachine
+		:note  : See EvaluationMachine for the parameters
+		"""
+		key = _machine_cache_key(regex_descriptions, (engine, dfa_max_states, memoize, diagnostics, optimize, prefilter))
+		return None if key is None else self._lookup(key)
 
-		# Create the branch specific management node
-		branch_head = self.RangeManagementNode(self._repeat_identifier._min_count, self._repeat_identifier._max_count, sub_nodes[0], self._forward_node)
-		sub_nodes[-1].set_forward_node(branch_head)
+	def _lookup(self, key):
+		"""
+		:param key: The structural key of a machine
+		:type  key: tuple
+		:return: A copy of the cached machine, None if it isn't cached
+		:rtype : EvaluationMachine
+		"""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None:
+				return None
 
-		return branch_head
+			self._entries.move_to_end(key)
+			self._hits += 1
+			return entry[1].copy()
 
-	def decide_nexts(self):
+	def get_machine(self, regex_descriptions, engine=ENGINE_AUTO, dfa_max_states=DFA_MAX_STATES, memoize=True, diagnostics=True, optimize=False, prefilter=True):
 		"""
-		Get all the possible next states for the regex state machine
-		:return: All the next possible states
-		:rtype : list of EvaluationNode
+		:return: A copy of the cached machine of the given descriptions, built and cached if it isn't cached yet
+		:rtype : EvaluationMachine
+		:note  : See EvaluationMachine for the parameters
+		:note  : Machines of descriptions that can't be compared structurally are built without caching them
 		"""
-		return [self._create_range_branch()]
+		options = (engine, dfa_max_states, memoize, diagnostics, optimize, prefilter)
+		key = _machine_cache_key(regex_descriptions, options)
+		if key is None:
+			return EvaluationMachine(regex_descriptions, *options)
+
+		machine = self._lookup(key)
+		if machine is not None:
+			return machine
+
+		# Built without holding the lock, a machine built concurrently by another thread is replaced
+		machine = EvaluationMachine(regex_descriptions, *options)
+		with self._lock:
+			self._misses += 1
+			if 0 == self._max_size:
+				return machine
 
+			self._entries[key] = (tuple(regex_descriptions), machine)
+			self._entries.move_to_end(key)
+			self._evict()
 
-def build_node(regex_description):
+		return machine.copy()
+
+
+# The machines of the evaluations created with cache=True
+G_MACHINE_CACHE = MachineCache()
+
+
+def _write_machine_file(file_path, table, state):
 	"""
-	Handles the creation of individual states
-	:param regex_description: The description of the evaluation node
-	:type  regex_description: RegexDescription
-	:return: Nodes created from this regex_description
+	:param file_path: The path of the written file
+	:type  file_path: str
+	:param table: The flattened graph of the machine (see EvaluationMachine.to_table)
+	:type  table: list of int
+	:param state: The picklable state of the rest of the machine
+	:type  state: dict
+	:raise pickle.PicklingError: If the state references objects that can't be pickled (like lambdas)
 	"""
-	if not isinstance(regex_description, RegexDescription):
-		raise TypeError("node builder needs to get a regex description")
+	# 32 bit fields unless a count doesn't fit in them
+	fits_int32 = 0 == len(table) or (min(table) >= -2 ** 31 and max(table) < 2 ** 31)
+	table = array.array("i" if fits_int32 else "q", table)
+	state_pickle = pickle.dumps(state, protocol=pickle.HIGHEST_PROTOCOL)
 
-	# Handle EvaluationAction descriptions
-	if isinstance(regex_description, EvaluationAction):
-		result = ActionNode(regex_description)
+	with open(file_path, "wb") as machine_file:
+		machine_file.write(_MACHINE_FILE_HEADER.pack(
+			MACHINE_FILE_MAGIC, MACHINE_FILE_VERSION, table.typecode.encode(), b"<" if sys.byteorder == "little" else b">",
+			len(table), len(state_pickle)
+		))
+		table.tofile(machine_file)
+		machine_file.write(state_pickle)
 
-	# Handle Range descriptions
-	if isinstance(regex_description, Range):
-		result = RangeNode(regex_description)
 
-	return result
+def _read_machine_file(file_path):
+	"""
+	:param file_path: The path of a file written by _write_machine_file
+	:type  file_path: str
+	:return: The flattened graph of the machine, with the state of the rest of the machine
+	:rtype : tuple of (array.array, dict)
+	:raise ValueError: If the file isn't a dumped machine of a supported version
+	"""
+	with open(file_path, "rb") as machine_file:
+		header = machine_file.read(_MACHINE_FILE_HEADER.size)
+		if len(header) < _MACHINE_FILE_HEADER.size:
+			raise ValueError("{} isn't a dumped regcheck machine".format(file_path))
+
+		magic, version, typecode, byteorder, table_length, state_length = _MACHINE_FILE_HEADER.unpack(header)
+		if magic != MACHINE_FILE_MAGIC:
+			raise ValueError("{} isn't a dumped regcheck machine".format(file_path))
 
+		if version != MACHINE_FILE_VERSION:
+			raise ValueError("{} is a dumped regcheck machine of version {}, expected version {}".format(file_path, version, MACHINE_FILE_VERSION))
 
-class EvaluationMachine(object):
+		# Every state is built from the table, so it is read whole - straight into the array, without an intermediate copy
+		table = array.array(typecode.decode())
+		try:
+			table.fromfile(machine_file, table_length)
+		except EOFError:
+			raise ValueError("{} is a truncated regcheck machine".format(file_path))
+
+		if byteorder != (b"<" if sys.byteorder == "little" else b">"):
+			table.byteswap()
+
+		state_pickle = machine_file.read(state_length)
+		if len(state_pickle) < state_length:
+			raise ValueError("{} is a truncated regcheck machine".format(file_path))
+
+		state = pickle.loads(state_pickle)
+
+	return table, state
+
+
+class Evaluation(object):
 	"""
-	The state machine describing the given object regex
+	An object sequence regular expression test
 	"""
-	def __init__(self, regex_descriptions):
+	def __init__(self, *regex_descriptions, engine=ENGINE_AUTO, dfa_max_states=DFA_MAX_STATES, memoize=True, diagnostics=True, optimize=False, prefilter=True, cache=True):
 		"""
-		:param regex_descriptions: The description of all the machine regex elements
-		:type  regex_descriptions: list
+		:param regex_descriptions: The regex elements the checked sequences should satisfy
+		:type  regex_descriptions: list of RegexDescription
+		:param engine: The evaluation engine used for checking sequences (one of ENGINES, or ENGINE_AUTO)
+		:type  engine: str
+		:param dfa_max_states: The maximal amount of states cached by the dfa engine
+		:type  dfa_max_states: int
+		:param memoize: Wether the backtracking engine should cache pure action outcomes per sequence position
+		:type  memoize: bool
+		:param diagnostics: Wether to track failure details (see last_failure_details)
+		:type  diagnostics: bool
+		:param optimize: Wether to rewrite the regex elements into cheaper equivalent ones (see PatternOptimizer)
+		:type  optimize: bool or iterable of str
+		:param prefilter: Wether to reject sequences of impossible lengths or lacking required types before evaluating them
+		:type  prefilter: bool
+		:param cache: Wether to share the compiled machine of structurally identical evaluations (see G_MACHINE_CACHE)
+		:type  cache: bool
+		:note  cache: Failure records and analysis issues may refer to the identical descriptions of another evaluation
 		"""
-		nodes = []
-		for description in regex_descriptions:
-			nodes.append(build_node(description))
+		if len(regex_descriptions) == 0:
+			raise ValueError("Can't have an empty evaluation")
 
-		for index in range(len(nodes) - 1):
-			nodes[index].set_forward_node(nodes[index + 1])
+		self._descriptions = list(regex_descriptions)
+		self._options = (engine, dfa_max_states, memoize, diagnostics, optimize, prefilter)
+		self._cache = cache
 
-		# Use None to represent the final node
-		self._final_node = None
+		# The descriptions appended since the machine was built, and the lock guarding adding them to the machine
+		self._appended = []
+		self._lock = threading.Lock()
 
-		nodes[-1].set_forward_node(self._final_node)
+		self._machine = G_MACHINE_CACHE.get_machine(self._descriptions, *self._options) if cache else EvaluationMachine(self._descriptions, *self._options)
 
-		self._nodes = nodes
-		self._start_node = nodes[0]
+	def __repr__(self):
+		"""
+		:return: Textual representation of the object
+		:rtype : str
+		"""
+		return "Evaluation({})".format(tuple(self._descriptions))
 
-		# Error details
-		self._last_max_index = 0
-		self._last_failure_reason = None
+	def __getstate__(self):
+		"""
+		:return: The picklable state of the evaluation (without its lock)
+		:rtype : dict
+		"""
+		state = self.__dict__.copy()
+		del state["_lock"]
+		return state
 
-	def check(self, sequence, consume_all=True):
+	def __setstate__(self, state):
 		"""
-		:param sequence: The sequence of object to check
-		:type  sequence: sequencable
-		:return: Wether the given sequence satisfies the machine
-		:rtype : bool
+		:param state: A state returned by __getstate__
+		:type  state: dict
+		"""
+		self.__dict__.update(state)
+		self._lock = threading.Lock()
+
+	def append(self, regex_description):
+		"""
+		:param regex_description: Description of the next regex element
+		:type  regex_description: RegexDescription
+		:note  : The machine is extended with the appended elements when it is next used (see EvaluationMachine.extend),
+		         it is only rebuilt if it was optimized
 		"""
-		self._last_max_index = 0
-		self._last_failure_reason = None
+		with self._lock:
+			self._descriptions.append(regex_description)
+			self._appended.append(regex_description)
 
-		branch_stack = []
+	def get_descriptions(self):
+		"""
+		:return: The regex elements of the evaluation
+		:rtype : tuple of RegexDescription
+		"""
+		return tuple(self._descriptions)
 
-		# TODO: Insert parralelism to the branches evaluation
-		branch_stack.append((self._start_node, 0, VariablesFrame()))
+	def _get_machine(self):
+		"""
+		:return: The machine of the evaluation, extended (or rebuilt) if elements were appended
+		:rtype : EvaluationMachine
+		"""
+		if 0 == len(self._appended):
+			return self._machine
 
-		while 0 != len(branch_stack):
-			current_node, seq_index, variables_frame = branch_stack.pop()
+		with self._lock:
+			if 0 != len(self._appended):
+				if self._machine.can_extend():
+					# The previous machine is left as is, for the matchers and evaluations still using it
+					self._machine = self._machine.extend(self._appended)
+				else:
+					machine = G_MACHINE_CACHE.lookup(self._descriptions, *self._options) if self._cache else None
+					self._machine = machine if machine is not None else EvaluationMachine(self._descriptions, *self._options)
 
-			# Keeping track of max index reached for error report
-			if seq_index > self._last_max_index: self._last_max_index = seq_index
+				self._appended = []
 
-			# Evaluate current branch state
-			evaluated_object = None if seq_index >= len(sequence) else sequence[seq_index]
-			consume_obj = current_node.evaluate(evaluated_object, variables_frame)
-			new_index = seq_index + 1 if consume_obj else seq_index
+		return self._machine
 
-			next_nodes = current_node.decide_nexts()
+	def dump(self, file_path):
+		"""
+		Write the compiled (and optimized) machine of the evaluation to a compact binary file, loaded by Evaluation.load
+		without building the machine again
+		:param file_path: The path of the written file
+		:type  file_path: str
+		:raise pickle.PicklingError: If the descriptions can't be pickled (LambdaCheck functions must be importable)
+		:note  : The types and functions the descriptions reference are loaded by reference (imported), like in pickle
+		"""
+		table, machine_state = self._get_machine().to_table()
+		evaluation_state = self.__getstate__()
+		del evaluation_state["_machine"]
 
-			# Document max index failure reason
-			if len(next_nodes) == 0 and seq_index == self._last_max_index:
-				self._last_failure_reason = _get_last_failure_error()
+		_write_machine_file(file_path, table, {"machine": machine_state, "evaluation": evaluation_state})
 
-			for next_node in next_nodes:
-				# Check for reaching the end of the state machine
-				if next_node is self._final_node:
-						if not consume_all or new_index == len(sequence): return True
-				else:
-					# Create a new variable frame on var-write actions
-					new_var_frame = variables_frame if variables_frame.pending_changes_count() == 0 else copy.deepcopy(variables_frame)
-					new_var_frame.apply_changes()
+	@staticmethod
+	def load(file_path):
+		"""
+		:param file_path: The path of a file written by Evaluation.dump
+		:type  file_path: str
+		:return: The dumped evaluation
+		:rtype : Evaluation
+		:raise ValueError: If the file isn't a dumped evaluation of a supported version
+		:note  : Only load files from trusted sources, like pickle they may reference any importable object
+		"""
+		# Loading creates many long lived objects at once, which would trigger repeated full collections
+		gc_enabled = gc.isenabled()
+		gc.disable()
+		try:
+			table, state = _read_machine_file(file_path)
 
-					# TODO: Think of a more elegant solution to the stateful range problem
-					branch_stack.append((next_node, new_index, new_var_frame))
+			evaluation = Evaluation.__new__(Evaluation)
+			evaluation.__setstate__(dict(state["evaluation"], _machine=EvaluationMachine.from_table(table, state["machine"])))
+		finally:
+			if gc_enabled:
+				gc.enable()
 
-		return False
+		return evaluation
+
+	def get_optimization_report(self):
+		"""
+		:return: The rewrites applied to the regex elements, None if the evaluation isn't optimized
+		:rtype : OptimizationReport
+		"""
+		return self._get_machine().get_optimization_report()
+
+	def analyze(self):
+		"""
+		Statically detect ambiguous constructs, that may make checking a sequence take polynomial or exponential time
+		:return: The ambiguous constructs, with the worst-case complexity of checking a sequence
+		:rtype : PatternAnalysis
+		"""
+		return self._get_machine().analyze()
+
+	def to_dot(self, stats=None):
+		"""
+		:param stats: Evaluation stats annotating the states with their evaluation counts, None for no annotations
+		:type  stats: EvaluationStats
+		:return: The state graph of the evaluation in the Graphviz DOT format
+		:rtype : str
+		"""
+		return self._get_machine().to_dot(stats)
+
+	def check(self, sequence, max_steps=None, max_branches=None, deadline=None, stats=None, tracer=None):
+		"""
+		:param sequence: A sequence of tested objects
+		:type  sequence: list
+		:param max_steps: The maximal amount of evaluation steps, None for no limit
+		:type  max_steps: int
+		:param max_branches: The maximal amount of pending branches, None for no limit
+		:type  max_branches: int
+		:param deadline: The time.monotonic() time the evaluation should end by, None for no limit
+		:type  deadline: float
+		:param stats: Collects the work done by the evaluation, None for not collecting it
+		:type  stats: EvaluationStats
+		:param tracer: Called with every evaluated state, its sequence index and its range counters, None for no tracing
+		:type  tracer: function
+		:return: Wether the sequence satisfies the conditions described by the regex elements
+		:rtype : bool
+		:raise EvaluationBudgetExceeded: If the evaluation exceeded one of its budgets (see EvaluationMachine.check)
+		"""
+		return self._get_machine().check(sequence, max_steps=max_steps, max_branches=max_branches, deadline=deadline, stats=stats, tracer=tracer)
+
+	def check_many(self, sequences, executor=None, max_workers=None, processes=None, chunksize=1):
+		"""
+		:param sequences: Sequences of tested objects, checked concurrently on a thread pool (or a process pool)
+		:type  sequences: iterable of list
+		:param executor: The executor running the checks, None for a new thread pool
+		:type  executor: concurrent.futures.Executor
+		:param max_workers: The amount of threads of a new thread pool (ignored if an executor is given)
+		:type  max_workers: int
+		:param processes: The amount of worker processes of a new process pool, None for checking on threads
+		:type  processes: int
+		:param chunksize: The amount of sequences sent to a worker at once
+		:type  chunksize: int
+		:return: Wether each of the sequences satisfies the regex elements, in the order of the sequences
+		:rtype : list of bool
+		"""
+		return self._get_machine().check_many(sequences, executor, max_workers, processes, chunksize)
+
+	def iter_check_many(self, sequences, executor=None, max_workers=None, processes=None, chunksize=1, ordered=True):
+		"""
+		:param sequences: Sequences of tested objects, checked concurrently on a thread pool (or a process pool)
+		:type  sequences: iterable of list
+		:param ordered: Wether to yield the results in the order of the sequences, or as soon as they are ready
+		:type  ordered: bool
+		:return: Wether each of the sequences satisfies the regex elements if ordered,
+		         otherwise (sequence index, result) pairs in completion order
+		:rtype : iterator of bool, or iterator of tuple of (int, bool)
+		:note  : See EvaluationMachine.iter_check_many for the rest of the parameters
+		"""
+		return self._get_machine().iter_check_many(sequences, executor, max_workers, processes, chunksize, ordered)
 
 	def last_failure_details(self):
 		"""
-		:return: The maximum index reached of the last evaluated sequence with the last failure reason
+		:return: The maximum index reached by the last check (of the current thread), with the reason it failed there
 		:rtype : tuple of (int, str)
 		"""
-		return (self._last_max_index, self._last_failure_reason)
+		return self._machine.last_failure_details()
 
+	def search(self, sequence):
+		"""
+		:param sequence: A sequence of tested objects
+		:type  sequence: list
+		:return: The (start, end) span of the first sub-sequence satisfying the regex elements, None if there is none
+		:rtype : tuple of (int, int)
+		:note  : Not supported for descriptions using variables
+		"""
+		return self._get_machine().search(sequence)
 
-class Evaluation(object):
+	def finditer(self, sequence):
+		"""
+		:param sequence: A sequence of tested objects
+		:type  sequence: list
+		:return: The (start, end) spans of all the non-overlapping sub-sequences satisfying the regex elements
+		:rtype : iterator of tuple of (int, int)
+		:note  : Not supported for descriptions using variables
+		"""
+		return self._get_machine().finditer(sequence)
+
+	def matcher(self):
+		"""
+		:return: A push-mode matcher, checking a sequence fed one object at a time
+		:rtype : Matcher
+		:note  : Not supported for descriptions using variables
+		"""
+		return self._get_machine().matcher()
+
+
+class EvaluationSet(object):
 	"""
-	An object sequence regular expression test
+	A collection of evaluations, all checked together in a single pass over a sequence
+	(similar to RE2's RegexSet)
 	"""
-	def __init__(self, *regex_descriptions):
+	def __init__(self, *evaluations, dfa_max_states=DFA_MAX_STATES):
 		"""
-		:param:
+		:param evaluations: The evaluations to check sequences against
+		:type  evaluations: list of Evaluation
+		:param dfa_max_states: The maximal amount of states cached by the combined dfa
+		:type  dfa_max_states: int
 		"""
-		if len(regex_descriptions) == 0:
-			raise ValueError("Can't have an empty evaluation")
+		if len(evaluations) == 0:
+			raise ValueError("Can't have an empty evaluation set")
+
+		self._evaluations = evaluations
+
+		# All the evaluations are merged into a single graph, structurally identical actions are evaluated once per object
+		self._graph = StateGraph(share_actions=True)
+		self._separate_indexes = []
+
+		for index, evaluation in enumerate(evaluations):
+			descriptions = evaluation.get_descriptions()
+			if uses_variables(descriptions) or not StateGraph(descriptions).is_deterministic_closure():
+				self._separate_indexes.append(index)
+			else:
+				self._graph.add_root(descriptions, index)
 
-		self._descriptions = regex_descriptions
-		self._changed = False
-		self._machine = EvaluationMachine(regex_descriptions)
+		self._dfa = LazyDFA(self._graph, dfa_max_states) if 0 != len(self._graph.get_start_threads()) else None
 
 	def __repr__(self):
 		"""
 		:return: Textual representation of the object
 		:rtype : str
 		"""
-		return "Evaluation({})".format(self._descriptions)
+		return "EvaluationSet({})".format(self._evaluations)
 
-	def append(self, regex_description):
+	def __len__(self):
 		"""
-		:param regex_description: Description of the next regex element
-		:type  regex_description: RegexDescription
+		:return: The amount of evaluations in the set
+		:rtype : int
 		"""
-		self._descriptions.append(regex_description)
-		self._changed = True
+		return len(self._evaluations)
 
 	def check(self, sequence):
 		"""
 		:param sequence: A sequence of tested objects
 		:type  sequence: list
-		:return: Wether the sequence satisfies the conditions described by the regex elements
-		:rtype : bool
+		:return: The indexes of the evaluations satisfied by the sequence, in ascending order
+		:rtype : list of int
+		:note  : Evaluations using variables are checked separately, requiring the sequence to be indexable
+		"""
+		matched = set() if self._dfa is None else self._check_combined(sequence)
+
+		for index in self._separate_indexes:
+			if self._evaluations[index].check(sequence):
+				matched.add(index)
+
+		return sorted(matched)
+
+	def _check_combined(self, sequence):
+		"""
+		:param sequence: A sequence of tested objects
+		:type  sequence: iterable
+		:return: The indexes of the merged evaluations satisfied by the sequence
+		:rtype : set of int
 		"""
-		if self._changed:
-			self._machine = EvaluationMachine(self._descriptions)
-			self._changed = False
+		variables_frame = VariablesFrame()
+		dfa_state = self._dfa.get_start_state()
+
+		objects = iter(sequence)
+		for evaluated_object in objects:
+			if dfa_state.is_dead(): return set()
+
+			next_state = self._dfa.advance(dfa_state, evaluated_object, variables_frame)
+			if next_state is None:
+				# The DFA cache blew up, keep on simulating the graph from the current threads
+				threads = list(dfa_state.get_threads())
+				for remaining_object in itertools.chain([evaluated_object], objects):
+					threads, _ = self._graph.advance(threads, remaining_object, variables_frame)
+					if 0 == len(threads): return set()
+
+				_, matched_tags = self._graph.advance(threads, None, variables_frame, at_end=True)
+				return set(matched_tags)
+
+			dfa_state = next_state
 
-		return self._machine.check(sequence)
+		return set(dfa_state.get_matched_tags())
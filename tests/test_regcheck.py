@@ -1,5 +1,10 @@
 # -*- coding: utf-8 -*-
 
+import concurrent.futures
+import pickle
+import time
+from unittest import mock
+
 import pytest
 
 from regcheck import *
@@ -15,7 +20,7 @@ class AttributeTestingClass(object):
     class for storing attributes and testing them against regcheck
     """
     def __init__(self, **kwargs):
-        for key, value in kwargs:
+        for key, value in kwargs.items():
             setattr(self, key, value)
 
 
@@ -58,3 +63,983 @@ def test_sanity():
             assert evaluation.check(sequence)
         else:
             assert not evaluation.check(sequence)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_engines_agree(engine):
+    """
+    Test that every engine accepts the same sequences, including unbounded ranges
+    """
+    evaluation = Evaluation(
+        Check(ClassA),
+        RegexAsterix(Check(ClassB), Possible(ClassA)),
+        RegexPlus(Check(ClassA, attribute1=1)),
+        engine=engine
+    )
+
+    assert evaluation.check([ClassA(), ClassA(attribute1=1)])
+    assert evaluation.check([ClassA(), ClassB(), ClassA(), ClassB(), ClassA(attribute1=1)])
+    assert not evaluation.check([ClassA(), ClassB()])
+    assert not evaluation.check([ClassA(), ClassA(attribute1=1), ClassB()])
+
+
+def test_nfa_nested_ranges():
+    """
+    Test that the nfa engine handles ambiguous nested ranges in linear time
+    """
+    evaluation = Evaluation(
+        RegexAsterix(RegexAsterix(Check(ClassA)), Range(1, 3, Check())),
+        Check(ClassB),
+        engine=ENGINE_NFA
+    )
+
+    assert not evaluation.check([ClassA()] * 2000)
+    assert evaluation.check([ClassA()] * 2000 + [ClassB()])
+
+
+def test_nfa_variables_fallback():
+    """
+    Test that descriptions using variables fall back to the backtracking engine
+    """
+    variable = Variable()
+    evaluation = Evaluation(
+        Check(ClassA, attribute1=variable.set()),
+        Check(ClassB, attribute1=variable.get()),
+        engine=ENGINE_NFA
+    )
+
+    assert evaluation._machine.get_engine() == ENGINE_BACKTRACKING
+    assert evaluation.check([ClassA(attribute1=3), ClassB(attribute1=3)])
+    assert not evaluation.check([ClassA(attribute1=3), ClassB(attribute1=4)])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_top_level_variable_check(engine):
+    """
+    Test checking objects against a variable directly (not through an attribute)
+    """
+    variable = Variable()
+    evaluation = Evaluation(variable.set(), Check(), variable.get(), engine=engine)
+    first = ClassA()
+
+    assert evaluation.check([first, first])
+    assert not evaluation.check([first, ClassA()])
+    assert variable.get().is_consuming()
+
+
+def test_dfa_cache_eviction():
+    """
+    Test that the dfa engine keeps on checking correctly once its cache is evicted
+    """
+    evaluation = Evaluation(
+        Range(0, 20, Check(ClassA)),
+        Range(0, 20, Check()),
+        Check(ClassB),
+        engine=ENGINE_DFA,
+        dfa_max_states=4
+    )
+    sequence = [ClassA()] * 30 + [ClassB()]
+
+    assert evaluation.check(sequence)
+    assert not evaluation.check(sequence[:-1])
+    assert evaluation._machine.get_dfa().get_evictions() > 0
+    assert evaluation._machine.get_dfa().get_states_count() <= 4
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_matcher_streaming(engine):
+    """
+    Test feeding a generator to a push-mode matcher
+    """
+    evaluation = Evaluation(RegexPlus(Check(ClassA)), Check(ClassB), engine=engine)
+
+    matcher = evaluation.matcher()
+    assert matcher.feed_many(ClassA() for _ in range(1000))
+    assert not matcher.finish()
+
+    matcher = evaluation.matcher()
+    assert matcher.feed_many(ClassA() for _ in range(1000))
+    assert matcher.feed(ClassB())
+    assert matcher.finish()
+    assert matcher.get_position() == 1001
+
+    matcher = evaluation.matcher()
+    assert not matcher.feed(ClassB())
+    assert not matcher.finish()
+
+    variable = Variable()
+    with pytest.raises(ValueError):
+        Evaluation(variable.set(), Check(), engine=engine).matcher()
+
+
+def test_search_and_finditer():
+    """
+    Test finding satisfying sub-sequences anywhere in a sequence
+    """
+    evaluation = Evaluation(Check(ClassA), RegexAsterix(Check(ClassB)))
+    sequence = [ClassB(), ClassA(), ClassB(), ClassB(), ClassB(), ClassA(), ClassA(), ClassB()]
+
+    assert evaluation.search(sequence) == (1, 5)
+    assert evaluation.search([ClassB()] * 10) is None
+    assert list(evaluation.finditer(sequence)) == [(1, 5), (5, 6), (6, 8)]
+
+    # Matches start as early as possible, even when a later start would be longer
+    evaluation = Evaluation(Range(1, 2, Check(ClassB)), Possible(ClassA))
+    assert evaluation.search([ClassA(), ClassB(), ClassB(), ClassA()]) == (1, 4)
+    assert list(evaluation.finditer([ClassB(), ClassB(), ClassB()])) == [(0, 2), (2, 3)]
+
+
+@pytest.mark.parametrize("engine", ENGINES[1:])
+def test_finditer_long_sequence(engine):
+    """
+    Test finding all the matches of a long sequence in a single pass, while a preferred branch outlives every match
+    """
+    evaluation = Evaluation(Check(ClassA), Either([RegexAsterix(Check()), Check(ClassA, attribute1=1)], [Check(ClassB)]), engine=engine)
+    sequence = [ClassA(), ClassB()] * 20000
+
+    started = time.perf_counter()
+    assert list(evaluation.finditer(sequence)) == [(index, index + 2) for index in range(0, len(sequence), 2)]
+    assert time.perf_counter() - started < 10
+
+    # Once the preferred branch matches, it replaces all the matches found after its start
+    assert list(evaluation.finditer(sequence[:100] + [ClassA(attribute1=1)])) == [(0, 101)]
+
+
+def test_evaluation_set():
+    """
+    Test checking many evaluations together, sharing identical checks
+    """
+    variable = Variable()
+    evaluation_set = EvaluationSet(
+        Evaluation(RegexPlus(Check(ClassA))),
+        Evaluation(Check(ClassA), RegexAsterix(Check())),
+        Evaluation(RegexAsterix(Check()), Check(ClassB)),
+        Evaluation(Check(ClassA, attribute1=variable.set()), Check(ClassA, attribute1=variable.get())),
+        dfa_max_states=8
+    )
+
+    assert evaluation_set.check([ClassA(attribute1=1), ClassA(attribute1=1)]) == [0, 1, 3]
+    assert evaluation_set.check([ClassA(attribute1=1), ClassA(attribute1=2)]) == [0, 1]
+    assert evaluation_set.check([ClassA(), ClassB()]) == [1, 2]
+    assert evaluation_set.check([ClassB(), ClassA()]) == []
+
+    for count in range(20):
+        assert evaluation_set.check([ClassA()] * count + [ClassB()]) == ([1, 2] if count else [2])
+
+    # Structurally identical checks are merged into a single action
+    actions = set(id(state.get_action()) for state in evaluation_set._graph.get_states() if isinstance(state, ActionState))
+    assert len(actions) == 3
+
+
+class Threshold(Check):
+    """
+    A check subclass with state its structure key doesn't include
+    """
+    def __init__(self, minimum):
+        super(Threshold, self).__init__(ClassA)
+        self.minimum = minimum
+
+    def perform(self, obj, variables_frame=None):
+        return isinstance(obj, ClassA) and obj.attribute1 >= self.minimum
+
+
+def test_evaluation_set_subclass_checks():
+    """
+    Test Check subclasses aren't merged with each other by their (inherited) structure key
+    """
+    evaluation_set = EvaluationSet(Evaluation(Threshold(1)), Evaluation(Threshold(5)))
+    assert evaluation_set.check([ClassA(attribute1=3)]) == [0]
+    assert evaluation_set.check([ClassA(attribute1=5)]) == [0, 1]
+
+
+def test_backtracking_memo():
+    """
+    Test that pure actions are performed once per sequence position by the backtracking engine
+    """
+    calls = []
+
+    def is_class_a(obj, variables_frame):
+        calls.append(obj)
+        return isinstance(obj, ClassA)
+
+    evaluation = Evaluation(
+        RegexAsterix(Range(1, 2, LambdaCheck(is_class_a, pure=True))),
+        Check(ClassB),
+        prefilter=False
+    )
+    sequence = [ClassA()] * 12
+
+    # At most once for every object (branches that can't consume the objects left aren't evaluated)
+    assert not evaluation.check(sequence)
+    assert len(calls) <= len(sequence)
+    assert evaluation._machine.get_memo().get_hits() > 0
+
+    del calls[:]
+    evaluation = Evaluation(RegexAsterix(Range(1, 2, LambdaCheck(is_class_a))), Check(ClassB), prefilter=False)
+    assert not evaluation.check(sequence)
+    assert len(calls) > len(sequence)
+
+
+def test_memo_without_diagnostics():
+    """
+    Test that memoized actions perform the compiled predicate, recording no failures without diagnostics
+    """
+    evaluation = Evaluation(RegexAsterix(Range(1, 2, Check(ClassA))), Check(ClassB), diagnostics=False, prefilter=False)
+    G_EVALUATION_THREAD_STATE.last_failure = None
+
+    assert not evaluation.check([ClassA()] * 4 + [ClassA(attribute1=1)])
+    assert evaluation._machine.get_memo().get_hits() > 0
+    assert G_EVALUATION_THREAD_STATE.last_failure is None
+
+
+class IsVariableValue(Check):
+    """
+    A check subclass reading a variable, so its outcome isn't cached
+    """
+    def __init__(self, variable):
+        super(IsVariableValue, self).__init__()
+        self.variable = variable
+
+    def perform(self, obj, variables_frame=None):
+        return variables_frame.has_variable(self.variable) and variables_frame.get_var_value(self.variable) is obj
+
+
+def test_memo_skips_subclass_checks():
+    """
+    Test that Check subclasses overriding perform aren't considered pure (reading variables)
+    """
+    variable = Variable()
+    evaluation = Evaluation(
+        Check(ClassA, attribute1=variable.set()), Range(0, 1, variable.set(), mode=RANGE_LAZY), IsVariableValue(variable)
+    )
+    sequence = [ClassA(attribute1=1), ClassA(attribute1=2)]
+
+    assert not IsVariableValue(variable).is_pure()
+    assert evaluation.check(sequence)
+    assert Evaluation(*evaluation.get_descriptions(), memoize=False).check(sequence)
+
+
+def test_compiled_check():
+    """
+    Test the specialised check predicates against the different requirement kinds
+    """
+    check = Check(ClassA, attribute1=1, attribute2="asdf", attribute3=Check(ClassB, attribute1=2))
+    predicate = check.compile()
+
+    assert predicate(ClassA(attribute1=1, attribute2="asdf", attribute3=ClassB(attribute1=2)), None)
+    assert not predicate(ClassB(attribute1=1, attribute2="asdf", attribute3=ClassB(attribute1=2)), None)
+    assert not predicate(ClassA(attribute1=1, attribute2="asdf"), None)
+    assert not predicate(ClassA(attribute1=1, attribute2="qwer", attribute3=ClassB(attribute1=2)), None)
+    assert not predicate(ClassA(attribute1=1, attribute2="asdf", attribute3=ClassB(attribute1=3)), None)
+
+    assert Check().compile()(None, None)
+    assert Check(attribute1=1).compile()(ClassB(attribute1=1), None)
+    assert not Check(attribute1=1).compile()(ClassB(), None)
+
+    evaluation = Evaluation(Check(ClassA, attribute1=1, attribute2=2))
+    assert not evaluation.check([ClassA(attribute1=1, attribute2=3)])
+    assert "attribute2" in evaluation.last_failure_details()[1]
+
+    class OddCheck(Check):
+        def perform(self, obj, variables_frame=None):
+            return super(OddCheck, self).perform(obj, variables_frame) and obj.attribute1 % 2 == 1
+
+    assert OddCheck(ClassA).compile()(ClassA(attribute1=3), None)
+    assert not OddCheck(ClassA).compile()(ClassA(attribute1=4), None)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_failure_details(engine):
+    """
+    Test the structured failure records, and disabling them
+    """
+    evaluation = Evaluation(Check(ClassA), Check(ClassB, attribute1=2), engine=engine)
+
+    assert not evaluation.check([ClassA(), ClassB(attribute1=3)])
+    failure = evaluation._machine.last_failure()
+    assert failure.code == FAILURE_ATTRIBUTE_MISMATCH
+    assert (failure.attribute, failure.expected, failure.actual) == ("attribute1", 2, 3)
+    assert evaluation.last_failure_details() == (1, "Object attribute attribute1 value not matched - expected: 2, got 3")
+
+    assert not evaluation.check([ClassB(), ClassA()])
+    assert evaluation._machine.last_failure().code == FAILURE_WRONG_TYPE
+
+    evaluation = Evaluation(Check(ClassA), Check(ClassB, attribute1=2), engine=engine, diagnostics=False)
+    assert not evaluation.check([ClassA(), ClassB(attribute1=3)])
+    assert evaluation.last_failure_details() == (None, None)
+
+
+def test_failure_details_match_across_engines():
+    """
+    Test all the engines report the same failure for range based patterns
+    """
+    sequence = [ClassA(), ClassA(), ClassA(), ClassA(), ClassB(), ClassA()]
+    patterns = [
+        (Range(2, 4, Check(ClassA)), Check(ClassB)),
+        (Range(2, 3, Check(ClassA)), Check(ClassB)),
+        (RegexAsterix(Check(ClassA)), Check(ClassB), Check(ClassB)),
+        (Range(1, 10, Check(ClassA)), Check(ClassB, attribute1=1), Check(ClassA)),
+    ]
+    for pattern in patterns:
+        failures = []
+        for engine in ENGINES:
+            evaluation = Evaluation(*pattern, engine=engine, prefilter=False)
+            assert not evaluation.check(sequence)
+            failures.append(evaluation.last_failure_details())
+
+        assert failures[0][1] is not None
+        assert failures.count(failures[0]) == len(ENGINES), failures
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_check_many_threads(engine):
+    """
+    Test sharing an evaluation between threads
+    """
+    evaluation = Evaluation(Check(ClassA), Range(0, 3, Check(ClassB)), Check(ClassA), engine=engine)
+    sequences = [[ClassA()] + [ClassB()] * (index % 6) + [ClassA()] for index in range(200)]
+
+    assert evaluation.check_many(sequences, max_workers=8) == [index % 6 <= 3 for index in range(200)]
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=4) as executor:
+        assert evaluation.check_many(sequences[:6], executor=executor) == [True] * 4 + [False] * 2
+
+
+def is_class_b(obj, variables_frame):
+    return isinstance(obj, ClassB)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_check_many_processes(engine):
+    """
+    Test pickling evaluations and checking sequences on worker processes
+    """
+    evaluation = Evaluation(Check(ClassA), Range(0, 3, LambdaCheck(is_class_b, pure=True)), Check(ClassA), engine=engine)
+    sequences = [[ClassA()] + [ClassB()] * (index % 6) + [ClassA()] for index in range(60)]
+    expected = [index % 6 <= 3 for index in range(60)]
+
+    loaded = pickle.loads(pickle.dumps(evaluation))
+    assert [loaded.check(sequence) for sequence in sequences] == expected
+
+    assert evaluation.check_many(sequences, processes=2, chunksize=7) == expected
+    assert sorted(evaluation.iter_check_many(sequences, processes=2, chunksize=7, ordered=False)) == list(enumerate(expected))
+
+    # Large graphs are pickled without recursing through their states
+    long_evaluation = Evaluation(*[Check(ClassA)] * 5000, engine=engine)
+    assert pickle.loads(pickle.dumps(long_evaluation)).check([ClassA()] * 5000)
+
+    with pytest.raises(pickle.PicklingError):
+        Evaluation(LambdaCheck(lambda obj, variables_frame: True)).check_many(sequences, processes=2)
+
+
+def test_variables_frame_sharing():
+    """
+    Test that setting variables leaves the original frames unchanged, without copying the stored values
+    """
+    variables = [Variable() for _ in range(20)]
+    captured = ClassA(attribute1=[1, 2, 3])
+
+    frames = [VariablesFrame()]
+    for index, variable in enumerate(variables):
+        frames.append(frames[-1].set_var_value(variable, captured if index == 0 else index))
+
+    assert not frames[0].has_variable(variables[0])
+    assert frames[-1].get_var_value(variables[0]) is captured
+    for index, frame in enumerate(frames):
+        assert [frame.has_variable(variable) for variable in variables] == [position < index for position in range(20)]
+
+    overriden = frames[-1].set_var_value(variables[5], "changed")
+    assert overriden.get_var_value(variables[5]) == "changed"
+    assert frames[-1].get_var_value(variables[5]) == 5
+
+    # Branches capturing different objects don't see each other's values
+    variable = Variable()
+    evaluation = Evaluation(
+        Range(0, None, Check(ClassB)), Check(ClassA, attribute1=variable.set()), Range(0, None, Check()), Check(ClassB, attribute1=variable.get())
+    )
+    assert evaluation.check([ClassB(), ClassA(attribute1=1), ClassA(attribute1=2), ClassB(attribute1=1)])
+    assert not evaluation.check([ClassB(), ClassA(attribute1=1), ClassA(attribute1=2), ClassB(attribute1=3)])
+
+
+def test_backtracking_static_graph():
+    """
+    Test the backtracking engine on nested ranges, walking the machine graph without rebuilding it
+    """
+    evaluation = Evaluation(RegexAsterix(RegexAsterix(Check(ClassA))), Check(ClassB))
+    states = list(evaluation._machine.get_graph().get_states())
+
+    assert not evaluation.check([ClassA()] * 500)
+    assert evaluation.check([ClassA()] * 500 + [ClassB()])
+    assert evaluation._machine.get_graph().get_states() == states
+
+    variable = Variable()
+    evaluation = Evaluation(
+        Range(1, 3, Range(2, 2, Check(ClassA, attribute1=variable.set()))), Check(ClassB, attribute1=variable.get())
+    )
+    sequence = [ClassA(attribute1=index) for index in range(4)]
+    assert evaluation.check(sequence + [ClassB(attribute1=3)])
+    assert not evaluation.check(sequence + [ClassB(attribute1=2)])
+    assert not evaluation.check(sequence[:3] + [ClassB(attribute1=2)])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_counting_ranges(engine):
+    """
+    Test that large bounded ranges of a single check are tracked as merged counting sets
+    """
+    evaluation = Evaluation(RegexAsterix(Check()), Range(100, 300, Check(ClassA)), Check(ClassB), engine=engine)
+    range_states = [state for state in evaluation._machine.get_graph().get_states() if isinstance(state, RangeState)]
+    assert [state.is_counting() for state in range_states] == [True, False]
+    range_state = range_states[0]
+
+    assert evaluation.check([ClassB()] * 10 + [ClassA()] * 500 + [ClassB()])
+    assert evaluation.check([ClassA()] * 100 + [ClassB()])
+    assert not evaluation.check([ClassA()] * 99 + [ClassB()])
+    assert not evaluation.check([ClassA()] * 500)
+
+    if engine != ENGINE_BACKTRACKING:
+        # All the threads waiting on the range are merged into a single one
+        threads, _ = evaluation._machine.get_graph().advance(evaluation._machine.get_graph().get_start_threads(), ClassA(), VariablesFrame())
+        for _ in range(500):
+            threads, _ = evaluation._machine.get_graph().advance(threads, ClassA(), VariablesFrame())
+        assert len([thread for thread in threads if thread[0] is range_state]) == 1
+
+    evaluation = Evaluation(Repeat(10, Check(ClassA)), Range(8, None, Check(ClassB)), engine=engine)
+    assert evaluation.check([ClassA()] * 10 + [ClassB()] * 8)
+    assert evaluation.check([ClassA()] * 10 + [ClassB()] * 80)
+    assert not evaluation.check([ClassA()] * 10 + [ClassB()] * 7)
+    assert not evaluation.check([ClassA()] * 11 + [ClassB()] * 8)
+
+
+def test_default_engine_counting_ranges():
+    """
+    Test that the default engine checks ambiguous large bounded ranges in linear time
+    """
+    evaluation = Evaluation(RegexAsterix(Check()), Range(100, 5000, Check(ClassA)), Check(ClassB))
+    assert evaluation._machine.get_engine() == ENGINE_NFA
+
+    started = time.perf_counter()
+    assert not evaluation.check([ClassA()] * 3000 + [ClassB(), ClassA()])
+    assert evaluation.check([ClassA()] * 3000 + [ClassB()])
+    assert time.perf_counter() - started < 5
+
+    # Unless the backtracking engine is requested, or variables are used
+    assert Evaluation(Range(100, 5000, Check(ClassA)), engine=ENGINE_BACKTRACKING)._machine.get_engine() == ENGINE_BACKTRACKING
+    variable = Variable()
+    evaluation = Evaluation(Check(ClassA, attribute1=variable.set()), Range(100, 5000, Check(ClassA, attribute1=variable.get())))
+    assert evaluation._machine.get_engine() == ENGINE_BACKTRACKING
+    assert Evaluation(RegexAsterix(Check(ClassA)), Check(ClassB))._machine.get_engine() == ENGINE_BACKTRACKING
+
+    with pytest.raises(ValueError):
+        Evaluation(Check(ClassA), engine="regex")
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_sibling_ranges_share_counters(engine):
+    """
+    Test that the range counters of a branch grow with the nesting of the ranges, not with their amount
+    """
+    evaluation = Evaluation(
+        *[Range(0, 3, Check(ClassA)) for _ in range(3000)] + [Range(1, 2, Check(ClassB)), Range(8, 20, Range(0, 1, Check(ClassB)))],
+        engine=engine
+    )
+    assert len(evaluation._machine.get_graph().initial_counters()) == 2
+
+    start = time.monotonic()
+    assert evaluation.check([ClassA()] * 10 + [ClassB()] * 9)
+    assert evaluation.check([ClassB()])
+    assert not evaluation.check([ClassA()] * 10 + [ClassB()] * 23)
+    assert time.monotonic() - start < 10
+
+
+def test_pattern_optimizer():
+    """
+    Test the pattern optimizer rewrites, and that optimized evaluations agree with the original ones
+    """
+    check_a = Check(ClassA, attribute1=1)
+    descriptions = (
+        Repeat(1, Check(ClassB)),
+        Range(2, 3, Range(1, 2, Check(ClassA, attribute1=1))),
+        Range(1, 4, check_a),
+        Range(0, 2, Range(3, 3, Check(ClassB))),
+        RegexAsterix(Check(ClassB))
+    )
+    optimized, report = PatternOptimizer().optimize(descriptions)
+
+    assert report.count(OPTIMIZE_COLLAPSE_SINGLE_REPEATS) == 1
+    assert report.count(OPTIMIZE_FLATTEN_RANGES) == 1
+    assert report.count(OPTIMIZE_MERGE_RANGES) == 1
+    assert report.count(OPTIMIZE_DEDUPLICATE_CHECKS) == 2
+    assert len(optimized) == 4
+    assert (optimized[1]._min_count, optimized[1]._max_count) == (3, 10)
+    assert optimized[3].get_sub_elements()[0] is optimized[0]
+
+    # Range(0, 2, Range(3, 3, X)) allows 0, 3 or 6 repetitions, which isn't a single range
+    assert isinstance(optimized[2].get_sub_elements()[0], Range)
+
+    _, report = PatternOptimizer([OPTIMIZE_MERGE_RANGES]).optimize(descriptions)
+    assert report.count() == 0
+
+    with pytest.raises(ValueError):
+        PatternOptimizer(["unknown"])
+
+    plain = Evaluation(*descriptions)
+    optimized_evaluation = Evaluation(*descriptions, optimize=True)
+    assert optimized_evaluation.get_optimization_report().count() == 5
+    assert plain.get_optimization_report() is None
+
+    for b_count in range(9):
+        for a_count in range(12):
+            sequence = [ClassB()] + [ClassA(attribute1=1)] * a_count + [ClassB()] * b_count
+            assert plain.check(sequence) == optimized_evaluation.check(sequence)
+
+
+def test_pattern_optimizer_subclass_checks():
+    """
+    Test Check subclasses aren't deduplicated, merged or hoisted by their (inherited) structure key
+    """
+    patterns = [
+        ((Threshold(1), Threshold(5)), [ClassA(attribute1=3), ClassA(attribute1=3)]),
+        ((RegexPlus(Threshold(1)), RegexPlus(Threshold(5))), [ClassA(attribute1=3), ClassA(attribute1=3)]),
+        ((Either([Threshold(1), Check(ClassA)], [Threshold(5), Check(ClassB)]), ), [ClassA(attribute1=3), ClassB()]),
+    ]
+
+    for descriptions, sequence in patterns:
+        assert not Evaluation(*descriptions).check(sequence)
+        assert not Evaluation(*descriptions, optimize=True).check(sequence)
+
+    assert 0 == Evaluation(Threshold(1), Threshold(5), optimize=True).get_optimization_report().count()
+
+
+def test_analyze():
+    """
+    Test the static detection of ambiguous patterns
+    """
+    analysis = Evaluation(Check(ClassA), RegexAsterix(Check(ClassB)), Check(ClassA)).analyze()
+    assert analysis.get_ambiguity() == COMPLEXITY_LINEAR and analysis.is_safe()
+    assert analysis.get_issues() == []
+
+    inner = RegexPlus(Check())
+    outer = RegexAsterix(inner)
+    analysis = Evaluation(outer, Check(ClassB)).analyze()
+    assert analysis.get_ambiguity() == COMPLEXITY_EXPONENTIAL
+    assert analysis.get_issues() == [(AMBIGUITY_NESTED_RANGES, COMPLEXITY_EXPONENTIAL, None, (outer, inner))]
+    # Identical branches are merged, unless told apart by variables
+    assert analysis.get_complexity() == COMPLEXITY_LINEAR
+
+    # The rest of the outer range tells the repetitions apart
+    assert Evaluation(RegexAsterix(RegexPlus(Check(ClassA)), Check(ClassB))).analyze().get_ambiguity() == COMPLEXITY_LINEAR
+
+    first, second = RegexAsterix(Check()), RegexAsterix(Check(ClassA))
+    analysis = Evaluation(first, Possible(ClassB), second, Check(ClassB)).analyze()
+    assert analysis.get_ambiguity() == COMPLEXITY_POLYNOMIAL and analysis.get_degree() == 2
+    assert analysis.get_issues() == [(AMBIGUITY_ADJACENT_RANGES, COMPLEXITY_POLYNOMIAL, 2, (first, second))]
+
+    assert Evaluation(RegexAsterix(Check(ClassA)), RegexAsterix(Check(ClassB))).analyze().get_issues() == []
+
+    # Branches told apart by range counters aren't merged by the backtracking engine
+    first, second = RegexAsterix(Check()), Range(100, 5000, Check(ClassA))
+    analysis = Evaluation(first, second, Check(ClassB), engine=ENGINE_BACKTRACKING).analyze()
+    assert analysis.get_issues() == [(AMBIGUITY_ADJACENT_RANGES, COMPLEXITY_POLYNOMIAL, 2, (first, second))]
+    assert analysis.get_complexity() == COMPLEXITY_POLYNOMIAL and not analysis.is_safe()
+    assert analysis.get_recommended_engine() == ENGINE_NFA
+    analysis = Evaluation(first, second, Check(ClassB), engine=ENGINE_NFA).analyze()
+    assert analysis.is_safe() and analysis.get_recommended_engine() is None
+    # The default engine checks patterns with counting ranges by the nfa engine
+    analysis = Evaluation(first, second, Check(ClassB)).analyze()
+    assert analysis.is_safe() and analysis.get_recommended_engine() is None
+    assert Evaluation(RegexAsterix(Check()), Range(0, 3, Check(ClassA)), Check(ClassB)).analyze().get_issues() == []
+
+    variable = Variable()
+    analysis = Evaluation(RegexAsterix(RegexPlus(Check(attribute1=variable.set()))), Check(ClassB, attribute1=variable.get())).analyze()
+    assert analysis.get_complexity() == COMPLEXITY_EXPONENTIAL and not analysis.is_safe()
+    assert analysis.get_recommended_engine() is None
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_prefilter(engine):
+    """
+    Test rejecting sequences of impossible lengths or lacking required types before evaluating them
+    """
+    calls = []
+
+    def record(obj, variables_frame):
+        calls.append(obj)
+        return True
+
+    evaluation = Evaluation(
+        LambdaCheck(record), Repeat(2, Check(ClassA)), Range(0, 3, Check(ClassB)), Possible(ClassB), Check(AttributeTestingClass),
+        engine=engine
+    )
+    assert evaluation._machine.get_prefilter().get_length_bounds() == (4, 8)
+    assert evaluation._machine.get_prefilter().get_required_types() == {ClassA: 2, AttributeTestingClass: 1}
+
+    assert evaluation.check([ClassB(), ClassA(), ClassA(), ClassB()])
+    assert len(calls) == 1
+
+    for sequence in ([ClassB(), ClassA(), ClassA()], [ClassB(), ClassA(), ClassA()] + [ClassB()] * 6, [ClassB()] * 5, [ClassA()] + [ClassB()] * 4):
+        assert not evaluation.check(sequence)
+    assert len(calls) == 1
+    assert evaluation._machine.last_failure().code == FAILURE_MISSING_TYPE
+
+    # Subclasses satisfy their base types requirements
+    assert evaluation.check([ClassB(), ClassA(), ClassA(), ClassA()])
+
+    # As do objects claiming the type by their __class__
+    prefilter = Evaluation(Check(ClassA), Check(ClassB), engine=engine)._machine.get_prefilter()
+    assert prefilter.reject([mock.Mock(spec=ClassA), mock.Mock(spec=ClassB)]) is None
+    assert prefilter.reject([mock.Mock(spec=ClassA), mock.Mock()])[0] == FAILURE_MISSING_TYPE
+
+    del calls[:]
+    assert not Evaluation(LambdaCheck(record), Check(ClassA), prefilter=False, engine=engine).check([ClassB(), ClassB()])
+    assert len(calls) == 1
+
+    assert Evaluation(RegexAsterix(Check()), engine=engine)._machine.get_prefilter().is_trivial()
+
+
+def test_backtracking_length_pruning():
+    """
+    Test dropping backtracking branches that can't consume exactly the objects left
+    """
+    evaluation = Evaluation(Range(0, 5, Check()), Range(2, 4, Check(ClassA)), Check(ClassB), prefilter=False, diagnostics=False)
+    graph = evaluation._machine.get_graph()
+    assert graph.get_start_state().remaining_bounds(graph.initial_counters()) == (3, 10)
+
+    assert evaluation.check([ClassB()] * 3 + [ClassA()] * 3 + [ClassB()])
+    assert evaluation._machine.get_pruned_branches() > 0
+
+    assert not evaluation.check([ClassA()] * 11)
+    assert evaluation._machine.get_pruned_branches() == 1
+
+    # Branches on the furthest index reached are still evaluated with diagnostics, to record the failure reason
+    failures = []
+    for engine in ENGINES:
+        evaluation = Evaluation(Range(2, 5, Check(ClassA)), Check(AttributeTestingClass), prefilter=False, engine=engine)
+        assert not evaluation.check([ClassA(), AttributeTestingClass()])
+        failures.append(evaluation.last_failure_details())
+
+    assert failures[0][0] == 1 and failures[0][1].startswith("Wrong type")
+    assert all(failure == failures[0] for failure in failures)
+
+    evaluation = Evaluation(RegexAsterix(Repeat(2, Check(ClassA)), Check(ClassB)), prefilter=False)
+    for count in range(8):
+        assert evaluation.check([ClassA(), ClassA(), ClassB()] * count)
+        assert not evaluation.check([ClassA(), ClassA(), ClassB()] * count + [ClassA()])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_either(engine):
+    """
+    Test alternative sequences, and that only the alternatives the evaluated object may satisfy are followed
+    """
+    either = Either([Check(ClassA), Check()], Check(ClassB, attribute1=1), [Check(ClassB), Check(ClassB)], RegexPlus(Check(int)))
+    evaluation = Evaluation(RegexAsterix(either), Check(AttributeTestingClass), engine=engine)
+
+    assert evaluation.check([ClassA(), ClassB(), ClassB(attribute1=1), ClassB(), ClassB(), 1, 2, AttributeTestingClass()])
+    assert not evaluation.check([ClassB(), ClassA(), ClassA()])
+    assert not evaluation.check([ClassA(), ClassB()])
+
+    either_state = [state for state in evaluation._machine.get_graph().get_states() if isinstance(state, EitherState)][0]
+    assert either_state.candidate_alternatives(ClassA()) == (0, )
+    assert either_state.candidate_alternatives(ClassB()) == (1, 2)
+    assert either_state.candidate_alternatives(True) == (3, )
+    assert either_state.candidate_alternatives("text") == ()
+
+    # Objects claiming a type by their __class__ follow its alternatives, as isinstance accepts them
+    assert either_state.candidate_alternatives(mock.Mock(spec=ClassB)) == (1, 2)
+    for prefilter in (True, False):
+        evaluation_of_mocks = Evaluation(Either(Check(ClassA), Check(ClassB)), Check(ClassA), engine=engine, prefilter=prefilter)
+        assert evaluation_of_mocks.check([mock.Mock(spec=ClassA), mock.Mock(spec=ClassA)])
+        assert evaluation_of_mocks.check([mock.Mock(spec=ClassB), ClassA()])
+        assert not evaluation_of_mocks.check([mock.Mock(spec=ClassA), mock.Mock(spec=ClassB)])
+
+    assert Evaluation(Either(Possible(ClassA), Check(ClassB)), Check(ClassB), engine=engine).check([ClassB()])
+    assert pickle.loads(pickle.dumps(evaluation._machine)).check([ClassB(attribute1=1), AttributeTestingClass()])
+
+    assert evaluation._machine.get_prefilter().get_length_bounds() == (1, None)
+    assert SequencePrefilter([Either([Check(ClassA), Check(ClassB)], [Check(ClassA), Repeat(2, Check())])]).get_length_bounds() == (2, 3)
+
+    with pytest.raises(ValueError):
+        Either()
+
+    with pytest.raises(ValueError):
+        Either(Check(), [])
+
+
+def test_either_optimize_and_analyze():
+    """
+    Test hoisting the shared prefix of alternatives, and detecting repeated overlapping alternatives
+    """
+    either = Either([Check(ClassA), Check(ClassB), Check(ClassA)], [Check(ClassA), Check(ClassB), Check(ClassB)])
+    optimized, report = PatternOptimizer([OPTIMIZE_HOIST_PREFIXES]).optimize([either])
+    assert report.count(OPTIMIZE_HOIST_PREFIXES) == 1
+    assert len(optimized) == 3 and isinstance(optimized[2], Either)
+    assert optimized[2].get_alternatives() == ((either.get_alternatives()[0][2], ), (either.get_alternatives()[1][2], ))
+
+    # An alternative is never emptied
+    _, report = PatternOptimizer().optimize([Either(Check(ClassA), [Check(ClassA), Check(ClassB)])])
+    assert report.count(OPTIMIZE_HOIST_PREFIXES) == 0
+
+    overlapping = Either(Check(), Check(ClassA))
+    repeated = RegexAsterix(overlapping)
+    analysis = Evaluation(repeated, Check(ClassB)).analyze()
+    assert analysis.get_issues() == [(AMBIGUITY_OVERLAPPING_ALTERNATIVES, COMPLEXITY_EXPONENTIAL, None, (repeated, overlapping))]
+
+    assert Evaluation(RegexAsterix(Either(Check(ClassA), Check(ClassB)))).analyze().is_safe()
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_range_modes(engine):
+    """
+    Test lazy ranges preferring to leave, and possessive ranges never giving back a repetition
+    """
+    possessive = Evaluation(RegexAsterix(Check(ClassA), mode=RANGE_POSSESSIVE), Check(ClassA), engine=engine)
+    assert not possessive.check([ClassA(), ClassA()])
+    assert Evaluation(RegexAsterix(Check(ClassA), mode=RANGE_POSSESSIVE), Check(ClassB), engine=engine).check([ClassA(), ClassA(), ClassB()])
+    assert Evaluation(Range(1, 2, Check(), mode=RANGE_POSSESSIVE), Check(), engine=engine).check([None, None, None])
+    assert not Evaluation(Range(1, 3, Check(), mode=RANGE_POSSESSIVE), Check(), engine=engine).check([None, None, None])
+    assert pickle.loads(pickle.dumps(possessive._machine)).check([ClassA()]) is False
+
+    lazy = Evaluation(RegexPlus(Check(ClassA), mode=RANGE_LAZY), Possible(ClassA), engine=engine)
+    assert lazy.check([ClassA()] * 3)
+    if engine != ENGINE_BACKTRACKING:
+        assert lazy.search([ClassA()] * 3) == (0, 2)
+        assert Evaluation(RegexPlus(Check(ClassA)), Possible(ClassA), engine=engine).search([ClassA()] * 3) == (0, 3)
+
+    # Possessive ranges can't be shared or merged with the ranges following them
+    first = RegexAsterix(Check(), mode=RANGE_POSSESSIVE)
+    assert Evaluation(first, RegexAsterix(Check())).analyze().is_safe()
+    _, report = PatternOptimizer().optimize([first, RegexAsterix(Check(), mode=RANGE_POSSESSIVE)])
+    assert report.count(OPTIMIZE_MERGE_RANGES) == 0
+
+    with pytest.raises(ValueError):
+        Range(0, 1, Check(), mode="unknown")
+
+    with pytest.raises(ValueError):
+        RegexPlus(Check(), Check(), mode=RANGE_POSSESSIVE)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_evaluation_budgets(engine):
+    """
+    Test aborting evaluations exceeding their step, branch or time budgets
+    """
+    evaluation = Evaluation(RegexAsterix(Check()), Check(ClassB), engine=engine, prefilter=False)
+    sequence = [ClassA()] * 100
+
+    with pytest.raises(EvaluationBudgetExceeded) as exceeded:
+        evaluation.check(sequence, max_steps=10)
+    assert exceeded.value.budget == BUDGET_STEPS
+    assert exceeded.value.steps > 10 and 0 < exceeded.value.max_index <= 10
+
+    restored = pickle.loads(pickle.dumps(exceeded.value))
+    assert (restored.budget, restored.steps, restored.max_index) == (exceeded.value.budget, exceeded.value.steps, exceeded.value.max_index)
+
+    with pytest.raises(EvaluationBudgetExceeded) as exceeded:
+        evaluation.check(sequence, deadline=time.monotonic() - 1)
+    assert exceeded.value.budget == BUDGET_DEADLINE
+
+    with pytest.raises(EvaluationBudgetExceeded) as exceeded:
+        Evaluation(Either(Check(), [Check(), Check()]), RegexAsterix(Check()), engine=engine).check(sequence, max_branches=1)
+    assert exceeded.value.budget == BUDGET_BRANCHES and exceeded.value.branches == 2
+
+    assert not evaluation.check(sequence, max_steps=100000, max_branches=1000, deadline=time.monotonic() + 60)
+    assert evaluation.check(sequence + [ClassB()], max_steps=100000)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_stats_and_tracing(engine):
+    """
+    Test collecting evaluation stats, tracing the evaluated states and exporting the annotated graph
+    """
+    evaluation = Evaluation(RegexAsterix(Either(Check(ClassA), Check(ClassB))), Check(ClassB), engine=engine)
+    stats = EvaluationStats()
+    traced = []
+
+    assert evaluation.check([ClassA(), ClassB(), ClassA(), ClassB()], stats=stats, tracer=lambda *step: traced.append(step))
+    assert stats.steps > 0 and stats.peak_branches > 0
+    assert 0 != len(traced) and stats.predicate_time >= 0
+
+    graph = evaluation._machine.get_graph()
+    action_hits = sum(count for index, count in stats.get_state_counts().items() if isinstance(graph.get_states()[index], ActionState))
+    assert action_hits >= 4
+
+    dot = evaluation.to_dot(stats)
+    assert dot.startswith("digraph regcheck {") and dot.endswith("}")
+    assert "hits: " in dot and "repeat" in dot and "-> final" in dot
+
+    # Stats accumulate over evaluations
+    steps = stats.steps
+    assert not evaluation.check([ClassB(), ClassA()], stats=stats)
+    assert stats.steps > steps
+
+    if engine != ENGINE_DFA:
+        assert stats.branches_pushed > 0 and stats.range_allocations > 0
+
+    variable = Variable()
+    stats = EvaluationStats()
+    assert Evaluation(Check(attribute1=variable.set()), Check(attribute1=variable.get())).check([ClassA(attribute1=1), ClassB(attribute1=1)], stats=stats)
+    assert stats.frame_copies == 1
+
+
+def test_slotted_objects():
+    """
+    Test descriptions, graph states and variable frames carry no per-instance dict, and still pickle
+    """
+    variable = Variable()
+    descriptions = (Check(ClassA, attribute1=variable.set()), RegexAsterix(Either(Check(ClassB), LambdaCheck(is_class_b))), Check(attribute1=variable.get()))
+    evaluation = Evaluation(*descriptions)
+    evaluation.check([ClassA(attribute1=1), ClassB(attribute1=1)])
+
+    graph_states = evaluation._machine.get_graph().get_states()
+    for obj in descriptions + tuple(descriptions[1].get_sub_elements()) + (variable, VariablesFrame()) + tuple(graph_states):
+        assert not hasattr(obj, "__dict__"), obj
+
+    loaded = pickle.loads(pickle.dumps(evaluation))
+    assert loaded.check([ClassA(attribute1=2), ClassB(), ClassA(attribute1=2)])
+    assert not loaded.check([ClassA(attribute1=2), ClassB(), ClassA(attribute1=3)])
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_append(engine):
+    """
+    Test appending elements to an evaluation extends a copy of its machine instead of rebuilding it
+    """
+    descriptions = (Check(ClassA), RegexAsterix(Check(ClassB)), Either(Check(ClassA), Range(2, 2, Check(ClassB))), Check(ClassA))
+    sequences = [[ClassA(), ClassB(), ClassA(), ClassA()], [ClassA(), ClassB(), ClassB(), ClassA()], [ClassA(), ClassA()], [ClassA(), ClassB(), ClassA()]]
+    expected = [Evaluation(*descriptions, engine=engine, cache=False).check(sequence) for sequence in sequences]
+
+    evaluation = Evaluation(*descriptions[:1], engine=engine, cache=False)
+    assert evaluation.check([ClassA()])
+    graph = evaluation._get_machine().get_graph()
+
+    for description in descriptions[1:]:
+        evaluation.append(description)
+
+    assert [evaluation.check(sequence) for sequence in sequences] == expected
+    assert evaluation._get_machine().get_graph().get_states()[0].get_action() is graph.get_states()[0].get_action()
+    assert evaluation.get_descriptions() == descriptions
+
+    # The graph of the previous machine is left as is, for the matchers still feeding it
+    assert 1 == len(graph.get_states()) and graph.get_states()[0].get_forward_state() is None
+    evaluation = Evaluation(Check(ClassA), Check(ClassA), engine=engine)
+    matcher = evaluation.matcher()
+    matcher.feed(ClassA())
+    evaluation.append(Check(ClassB))
+    assert evaluation.check([ClassA(), ClassA(), ClassB()])
+    matcher.feed(ClassA())
+    assert matcher.finish()
+    assert Evaluation(Check(ClassA), Check(ClassA), engine=engine).check([ClassA(), ClassA()])
+
+    # Appending to a shared machine builds a new one, leaving the other evaluations intact
+    shared = Evaluation(Check(ClassA), engine=engine)
+    other = Evaluation(Check(ClassA), engine=engine)
+    shared.append(Check(ClassB))
+    assert shared.check([ClassA(), ClassB()]) and not shared.check([ClassA()])
+    assert other.check([ClassA()]) and not other.check([ClassA(), ClassB()])
+
+    # Appending variables falls back to the backtracking engine
+    variable = Variable()
+    evaluation = Evaluation(Check(attribute1=variable.set()), engine=engine, cache=False)
+    evaluation.append(Check(attribute1=variable.get()))
+    assert evaluation.check([ClassA(attribute1=1), ClassB(attribute1=1)])
+    assert not evaluation.check([ClassA(attribute1=1), ClassB(attribute1=2)])
+    assert evaluation._get_machine().get_engine() == ENGINE_BACKTRACKING
+
+
+def test_machine_cache():
+    """
+    Test structurally identical evaluations share a cached machine
+    """
+    cache = MachineCache(max_size=2)
+    machine = cache.get_machine([Check(ClassA, attribute1=1), RegexAsterix(Check(ClassB))])
+    same = cache.get_machine([Check(ClassA, attribute1=1), RegexAsterix(Check(ClassB))])
+    assert machine.get_graph() is same.get_graph() and machine is not same
+    assert cache.get_stats() == (1, 1)
+    assert machine.can_extend() and machine.extend([Check(ClassB)]).get_graph() is not machine.get_graph()
+
+    # Equal values of different types, parameters and lambda purity are told apart
+    assert cache.get_machine([Check(ClassA, attribute1=True), RegexAsterix(Check(ClassB))]).get_graph() is not machine.get_graph()
+    assert cache.get_machine([Check(ClassA, attribute1=1), RegexAsterix(Check(ClassB))], engine=ENGINE_NFA).get_graph() is not machine.get_graph()
+    assert cache.lookup([LambdaCheck(is_class_b)]) is None
+    cache.get_machine([LambdaCheck(is_class_b)])
+    assert cache.lookup([LambdaCheck(is_class_b, pure=True)]) is None
+
+    # The least recently used machines are evicted
+    assert len(cache) == 2
+    assert cache.lookup([Check(ClassA, attribute1=1), RegexAsterix(Check(ClassB))]) is None
+
+    # Subclasses and unhashable values aren't cached
+    class CustomCheck(Check):
+        pass
+
+    assert cache.lookup([CustomCheck(ClassA)]) is None
+    assert cache.get_machine([CustomCheck(ClassA)]).can_extend()
+    assert cache.get_machine([Check(attribute1=[1])]).check([ClassA(attribute1=[1])])
+    assert len(cache) == 2
+
+    # Evaluations keep their own failure details
+    first = Evaluation(Check(ClassA), Check(ClassB, attribute1=1))
+    second = Evaluation(Check(ClassA), Check(ClassB, attribute1=1))
+    assert first._machine.get_graph() is second._machine.get_graph()
+    assert not first.check([ClassA(), ClassB(attribute1=2)]) and second.check([ClassA(), ClassB(attribute1=1)])
+    assert first.last_failure_details()[0] == 1
+
+    cache.clear()
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_dump_and_load(engine, tmp_path):
+    """
+    Test dumping evaluations to a binary file and loading them without building their machine
+    """
+    evaluation = Evaluation(
+        Check(ClassA), Range(0, 3, LambdaCheck(is_class_b, pure=True)), RegexAsterix(Either(Check(ClassA, attribute1=1), Check(ClassB))),
+        Range(0, 20, Check(ClassB)), Check(ClassA), engine=engine, optimize=True
+    )
+    sequences = [[ClassA()] + [ClassB()] * (index % 6) + [ClassA(attribute1=index % 2)] * (index % 3) + [ClassA()] for index in range(30)]
+
+    path = str(tmp_path / "evaluation.rgcm")
+    evaluation.dump(path)
+    loaded = Evaluation.load(path)
+
+    assert [loaded.check(sequence) for sequence in sequences] == [evaluation.check(sequence) for sequence in sequences]
+    assert [description.structure_key() for description in loaded.get_descriptions()] == [description.structure_key() for description in evaluation.get_descriptions()]
+    assert loaded.get_optimization_report() is not None
+    assert loaded._get_machine().get_engine() == evaluation._get_machine().get_engine()
+    assert loaded.to_dot() == evaluation.to_dot()
+
+    # A loaded optimized machine is rebuilt when elements are appended
+    assert not loaded._get_machine().can_extend()
+    loaded.append(Check(ClassB))
+    assert loaded.check([ClassA(), ClassA(), ClassB()]) and not loaded.check([ClassA(), ClassA()])
+
+    # A loaded machine of non-optimized descriptions is extended
+    Evaluation(Check(ClassA), RegexAsterix(Check(ClassB)), engine=engine).dump(path)
+    loaded = Evaluation.load(path)
+    machine = loaded._get_machine()
+    assert machine.can_extend()
+    loaded.append(Check(ClassA))
+    assert len(loaded._get_machine().get_graph().get_states()) == len(machine.get_graph().get_states()) + 1
+    assert machine.check([ClassA(), ClassB()])
+    assert loaded.check([ClassA(), ClassB(), ClassA()]) and not loaded.check([ClassA(), ClassB()])
+
+    # Truncated files are rejected, in the table or in the state
+    evaluation.dump(path)
+    with open(path, "rb") as machine_file:
+        content = machine_file.read()
+    for truncated in (content[:40], content[:-1]):
+        with open(path, "wb") as machine_file:
+            machine_file.write(truncated)
+        with pytest.raises(ValueError):
+            Evaluation.load(path)
+
+    with open(path, "wb") as machine_file:
+        machine_file.write(b"not a machine")
+
+    with pytest.raises(ValueError):
+        Evaluation.load(path)
+
+    with pytest.raises(pickle.PicklingError):
+        Evaluation(LambdaCheck(lambda obj, variables_frame: True)).dump(path)